@@ -435,6 +435,26 @@ class PoliticsWarAPI:
             logger.warning(f"Alliance data not found for ID {alliance_id}. Response: {response}")
         return None
     
+    async def get_top_alliances(self, limit: int = 100, scope: str = "alliance_scope") -> Optional[List[Dict]]:
+        """Get the top alliances by score with their official rank."""
+        query = f"""{{
+            alliances(first: {limit}, orderBy: {{column: SCORE, order: DESC}}) {{
+                data {{
+                    id
+                    name
+                    score
+                    rank
+                }}
+            }}
+        }}"""
+        
+        response = await self._make_graphql_request(query, scope=scope)
+        if response and response.get("data", {}).get("alliances", {}).get("data"):
+            return response["data"]["alliances"]["data"]
+        else:
+            logger.warning(f"Top alliances not found. Response: {response}")
+        return None
+    
     async def get_alliance_members(self, alliance_id: int, scope: str = "alliance_scope") -> Optional[List[Dict]]:
         """Get alliance members."""
         # Use string formatting like the old implementation
@@ -471,6 +491,7 @@ class PoliticsWarAPI:
                     missiles
                     nukes
                     projects
+                    project_bits
                     vmode
                     beige_turns
                     color
@@ -541,6 +562,248 @@ class PoliticsWarAPI:
             logger.warning(f"🌐 No alliance members found in response")
             return None
     
+    async def get_nations_military(self, nation_ids: List[int], scope: str = "everything_scope") -> Optional[Dict[str, Dict]]:
+        """Get score and military for a few nations (e.g. enemies to counter), keyed by nation ID."""
+        query = f"""{{
+            nations(id: [{', '.join(str(int(nation_id)) for nation_id in nation_ids)}], first: {len(nation_ids)}) {{
+                data {{
+                    id
+                    nation_name
+                    leader_name
+                    alliance_id
+                    score
+                    soldiers
+                    tanks
+                    aircraft
+                    ships
+                    missiles
+                    nukes
+                    beige_turns
+                    vmode
+                }}
+            }}
+        }}"""
+        
+        response = await self._make_graphql_request(query, scope=scope)
+        if response and "data" in response and response["data"].get("nations") is not None:
+            return {str(nation["id"]): nation for nation in response["data"]["nations"].get("data") or []}
+        logger.warning(f"Could not fetch military for nations {nation_ids}. Response: {response}")
+        return None
+    
+    async def get_alliance_activity(self, alliance_id: int, scope: str = "alliance_scope") -> Optional[List[Dict]]:
+        """Get just the fields the activity audit needs for every alliance member (no cities or wars)."""
+        query = f"""{{
+            nations(first:500, vmode: false, alliance_id:{alliance_id}) {{
+                data {{
+                    id
+                    nation_name
+                    leader_name
+                    alliance_position
+                    last_active
+                    defensive_wars_count
+                    discord
+                }}
+            }}
+        }}"""
+        
+        response = await self._make_graphql_request(query, scope=scope)
+        if response and response.get("data", {}).get("nations", {}).get("data"):
+            return response["data"]["nations"]["data"]
+        else:
+            logger.warning(f"No alliance activity found for alliance {alliance_id}")
+        return None
+    
+    async def get_wars_since(self, min_id: int, first: int = 100, scope: str = "everything_scope") -> Optional[List[Dict]]:
+        """Get wars with an ID of at least `min_id`, oldest first. Used by the war monitor."""
+        query = f"""{{
+            wars(min_id: {int(min_id)}, orderBy: {{column: ID, order: ASC}}, first: {int(first)}) {{
+                data {{
+                    id
+                    date
+                    war_type
+                    reason
+                    att_id
+                    def_id
+                    att_alliance_id
+                    def_alliance_id
+                    attacker {{
+                        id
+                        leader_name
+                        nation_name
+                        alliance {{
+                            id
+                            name
+                        }}
+                    }}
+                    defender {{
+                        id
+                        leader_name
+                        nation_name
+                        alliance {{
+                            id
+                            name
+                        }}
+                    }}
+                }}
+            }}
+        }}"""
+        
+        response = await self._make_graphql_request(query, scope=scope)
+        if response and "data" in response and response["data"].get("wars") is not None:
+            return response["data"]["wars"].get("data") or []
+        logger.warning(f"Could not fetch wars since {min_id}. Response: {response}")
+        return None
+    
+    async def get_latest_war_id(self, scope: str = "everything_scope") -> Optional[int]:
+        """Get the ID of the most recently declared war."""
+        query = """{
+            wars(orderBy: {column: ID, order: DESC}, first: 1) {
+                data {
+                    id
+                }
+            }
+        }"""
+        
+        response = await self._make_graphql_request(query, scope=scope)
+        wars = (response or {}).get("data", {}).get("wars", {}).get("data") or []
+        if wars:
+            return int(wars[0]["id"])
+        logger.warning(f"Could not fetch latest war ID. Response: {response}")
+        return None
+
+    async def get_active_wars(self, alliance_id: int = None, war_ids: List[int] = None,
+                              scope: str = "everything_scope") -> Optional[List[Dict]]:
+        """Get the live state of active wars for an alliance, or of specific wars by ID."""
+        if war_ids:
+            war_filter = f"id: [{', '.join(str(int(war_id)) for war_id in war_ids)}]"
+        else:
+            war_filter = f"alliance_id: [{int(alliance_id)}], active: true"
+        query = f"""{{
+            wars({war_filter}, first: 1000) {{
+                data {{
+                    id
+                    date
+                    war_type
+                    reason
+                    att_id
+                    def_id
+                    att_alliance_id
+                    def_alliance_id
+                    turns_left
+                    att_points
+                    def_points
+                    att_resistance
+                    def_resistance
+                    att_fortify
+                    def_fortify
+                    groundcontrol
+                    airsuperiority
+                    navalblockade
+                    attacker {{
+                        id
+                        nation_name
+                        leader_name
+                    }}
+                    defender {{
+                        id
+                        nation_name
+                        leader_name
+                    }}
+                }}
+            }}
+        }}"""
+
+        response = await self._make_graphql_request(query, scope=scope)
+        if response and "data" in response and response["data"].get("wars") is not None:
+            return response["data"]["wars"].get("data") or []
+        logger.warning(f"Could not fetch active wars ({war_filter}). Response: {response}")
+        return None
+
+    async def get_war_attacks_since(self, min_id: int, first: int = 500, scope: str = "everything_scope") -> Optional[List[Dict]]:
+        """Get war attacks with an ID of at least `min_id`, oldest first. Used by the war state tracker."""
+        query = f"""{{
+            warattacks(min_id: {int(min_id)}, orderBy: {{column: ID, order: ASC}}, first: {int(first)}) {{
+                data {{
+                    id
+                    date
+                    war_id
+                    att_id
+                    def_id
+                    type
+                    victor
+                    success
+                    resistance_eliminated
+                    infra_destroyed
+                    money_looted
+                    food_looted
+                    coal_looted
+                    oil_looted
+                    uranium_looted
+                    lead_looted
+                    iron_looted
+                    bauxite_looted
+                    gasoline_looted
+                    munitions_looted
+                    steel_looted
+                    aluminum_looted
+                }}
+            }}
+        }}"""
+
+        response = await self._make_graphql_request(query, scope=scope)
+        if response and "data" in response and response["data"].get("warattacks") is not None:
+            return response["data"]["warattacks"].get("data") or []
+        logger.warning(f"Could not fetch war attacks since {min_id}. Response: {response}")
+        return None
+
+    async def get_latest_war_attack_id(self, scope: str = "everything_scope") -> Optional[int]:
+        """Get the ID of the most recent war attack."""
+        query = """{
+            warattacks(orderBy: {column: ID, order: DESC}, first: 1) {
+                data {
+                    id
+                }
+            }
+        }"""
+
+        response = await self._make_graphql_request(query, scope=scope)
+        attacks = (response or {}).get("data", {}).get("warattacks", {}).get("data") or []
+        if attacks:
+            return int(attacks[0]["id"])
+        logger.warning(f"Could not fetch latest war attack ID. Response: {response}")
+        return None
+
+    async def subscribe_channel(self, model: str, event: str = "create", scope: str = "everything_scope") -> Optional[str]:
+        """Create a push subscription for a model event (e.g. war/create) and return its channel name."""
+        api_key = key_manager.get_key(scope)
+        url = f"{config.WAR_FEED_SUBSCRIBE_URL}/{model}/{event}?api_key={api_key}"
+        try:
+            async with aiohttp.ClientSession(timeout=self.timeout) as session:
+                async with session.get(url) as response:
+                    if response.status != 200:
+                        logger.warning(f"Subscription to {model}/{event} failed with status: {response.status}")
+                        return None
+                    key_manager.increment_usage(api_key)
+                    data = await response.json(content_type=None)
+                    return data.get("channel")
+        except Exception as e:
+            logger.warning(f"Error subscribing to {model}/{event}: {e}")
+            return None
+    
+    async def authorize_channel(self, socket_id: str, channel: str) -> Optional[str]:
+        """Get the auth signature needed to join a private subscription channel on the push socket."""
+        try:
+            async with aiohttp.ClientSession(timeout=self.timeout) as session:
+                async with session.post(config.WAR_FEED_AUTH_URL, data={"socket_id": socket_id, "channel_name": channel}) as response:
+                    if response.status != 200:
+                        logger.warning(f"Channel authorization failed with status: {response.status}")
+                        return None
+                    data = await response.json(content_type=None)
+                    return data.get("auth")
+        except Exception as e:
+            logger.warning(f"Error authorizing channel {channel}: {e}")
+            return None
+    
     async def get_war_data(self, war_id: int, scope: str = "everything_scope") -> Optional[Dict]:
         """Get war data by ID."""
         query = """
@@ -0,0 +1,546 @@
+"""
+Combined audit logic that runs every audit over a single alliance snapshot.
+"""
+
+import discord
+import time
+from typing import Callable, List, Dict, Optional, Tuple
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from utils.logging import get_logger
+from utils.pagination import ActivityPaginator
+from utils.helpers import create_embed
+from services.warchest_service import WarchestService
+from services.audit_result_store import audit_result_store
+from services.audit_fingerprint_store import audit_fingerprint_store
+from services.activity_tracker import activity_tracker
+from models.project import decode_project_bitsets
+from config import Config
+
+from . import activity, warchest, spies, projects, bloc, military, mmr, deposit
+
+config = Config()
+
+logger = get_logger('audit.all')
+
+# Raiders are audited for projects up to this city count (same as /audit projects)
+PROJECT_AUDIT_MAX_CITIES = 15
+
+# Warchest city cap used by scheduled runs (same as the /audit default)
+DEFAULT_MAX_CITIES = 100
+
+# Streaming audits report back after this many re-checked members
+STREAM_CHUNK_SIZE = 10
+
+# Member details are fetched (and audited) this many nations at a time
+DETAIL_CHUNK_SIZE = 50
+
+# Minimum seconds between streaming edits of the audit message
+RESULTS_EDIT_INTERVAL = 2.0
+
+# (key, label, summary header, formatter, username lookup) in report order
+AUDIT_REGISTRY = [
+    ('activity', 'Activity', 'Need To Login', activity.format_activity_violation, activity.get_discord_username_with_fallback),
+    ('warchest', 'Warchest', 'Need To Build Warchest', warchest.format_warchest_violation, warchest.get_discord_username_with_fallback),
+    ('spies', 'Spies', 'Need To Buy Spies', spies.format_spies_violation, spies.get_discord_username_with_fallback),
+    ('projects', 'Projects', 'Need To Build Projects', projects.format_violation, projects.get_discord_username_with_fallback),
+    ('bloc', 'Bloc', 'Need To Change Color', bloc.format_bloc_violation, bloc.get_discord_username_with_fallback),
+    ('military', 'Military', 'Need To Buy Their Military', military.format_military_violation, military.get_discord_username_with_fallback),
+    ('mmr', 'MMR', 'Need To Fix MMR', mmr.format_mmr_violation, mmr.get_discord_username_with_fallback),
+    ('deposit', 'Deposit', 'Need To Deposit', deposit.format_deposit_violation, deposit.get_discord_username_with_fallback),
+]
+
+AUDIT_TYPES = [key for key, *_ in AUDIT_REGISTRY]
+LABELS = {key: label for key, label, *_ in AUDIT_REGISTRY}
+FORMATTERS = {key: formatter for key, _, _, formatter, _ in AUDIT_REGISTRY}
+USERNAME_LOOKUPS = {key: get_username for key, _, _, _, get_username in AUDIT_REGISTRY}
+
+def get_city_count(member: Dict) -> int:
+    """Get a member's city count whether cities is a list or a number."""
+    cities_data = member.get("cities", 0)
+    if isinstance(cities_data, list):
+        return len(cities_data)
+    return cities_data or 0
+
+async def load_yesterday_data() -> Optional[Dict]:
+    """Load yesterday's CSV data for the spies and military comparisons."""
+    try:
+        from services.raid_cache_service import RaidCacheService
+        async with RaidCacheService() as raid_cache:
+            return raid_cache.load_yesterday_nations_cache()
+    except Exception as e:
+        logger.warning(f"Could not load yesterday's data for combined audit: {e}")
+        return None
+
+async def build_audit_snapshot(alliance_service, nation_service, alliance_id: int = None,
+                               yesterday_data: Optional[Dict] = None, fetch_details: bool = True) -> Optional[Dict]:
+    """Fetch everything the audits need in one pass: members, detailed nation data, alliance color and yesterday's data.
+
+    Defaults to our own alliance. Pass `yesterday_data` when building several snapshots so it is only loaded once,
+    and `fetch_details=False` to leave nations_data empty for run_chunked_checks to fetch.
+    """
+    alliance_id = alliance_id or config.ALLIANCE_ID
+    members = await alliance_service.get_alliance_members(alliance_id)
+    if not members:
+        return None
+
+    filtered_members = [m for m in members if m.get("alliance_position", "") != "APPLICANT"]
+
+    # Get detailed nation data for all members in a single batch
+    nations_data = {}
+    if fetch_details:
+        nation_ids = [str(member.get("id", 0)) for member in filtered_members]
+        nations_data = await alliance_service.get_member_nations_data(alliance_id, nation_ids) or {}
+
+    # Alliance color is only needed by the bloc audit
+    alliance_color = ""
+    alliance_name = str(alliance_id)
+    try:
+        alliance_data = await alliance_service.get_alliance(alliance_id)
+        if alliance_data:
+            alliance_name = alliance_data.name or alliance_name
+            if alliance_data.color:
+                alliance_color = alliance_data.color.lower()
+    except Exception as e:
+        logger.error(f"Error fetching alliance data: {e}")
+
+    if yesterday_data is None:
+        yesterday_data = await load_yesterday_data()
+
+    return {
+        'alliance_id': alliance_id,
+        'alliance_name': alliance_name,
+        'members': filtered_members,
+        'nations_data': nations_data,
+        'projects': decode_project_bitsets(nations_data),
+        'alliance_color': alliance_color,
+        'yesterday_data': yesterday_data
+    }
+
+async def build_activity_snapshot() -> Optional[Dict]:
+    """Snapshot for an activity-only run, answered from the activity tracker instead of the full member batch."""
+    members = await activity_tracker.get_members()
+    if not members:
+        return None
+    return {
+        'alliance_id': config.ALLIANCE_ID,
+        'alliance_name': str(config.ALLIANCE_ID),
+        'members': [m for m in members if m.get("alliance_position", "") != "APPLICANT"],
+        'nations_data': {},
+        'projects': {},
+        'alliance_color': "",
+        'yesterday_data': None
+    }
+
+RESOURCE_FIELDS = ('money', 'coal', 'oil', 'uranium', 'iron', 'bauxite', 'lead', 'gasoline',
+                   'munitions', 'steel', 'aluminum', 'food', 'credits')
+UNIT_FIELDS = ('soldiers', 'tanks', 'aircraft', 'ships')
+PROJECT_FIELDS = ('project_bits', 'projects', 'turns_since_last_project', 'military_research', 'activity_center',
+                  'propaganda_bureau', 'central_intelligence_agency', 'research_and_development_center',
+                  'pirate_economy', 'advanced_pirate_economy')
+
+def is_audited(key: str, member: Dict, nation_data: Optional[Dict], context: Dict) -> bool:
+    """Whether a member is in scope for an audit (same filters as the standalone audits)."""
+    if key == 'activity':
+        return True
+    if key == 'bloc':
+        return bool(context['alliance_color'])
+    if not nation_data:
+        return False
+    if key == 'warchest':
+        return 0 < get_city_count(member) <= context['max_cities']
+    if key == 'projects':
+        return get_city_count(member) <= PROJECT_AUDIT_MAX_CITIES
+    return True
+
+def audit_inputs(key: str, member: Dict, nation_data: Optional[Dict], context: Dict) -> Optional[list]:
+    """Values an audit's verdict and display depend on, or None if the verdict can't be reused."""
+    if key == 'activity':
+        return None  # Depends on the current time
+    nation_data = nation_data or {}
+    yesterday = (context['yesterday_data'] or {}).get(str(member.get('id', 0)), {})
+    # Everything shown in the formatted entry
+    inputs = [member.get('nation_name'), member.get('leader_name'), get_city_count(member),
+              context['usernames'][key](member, context['cache_service'])]
+
+    if key == 'bloc':
+        inputs += [member.get('color'), context['alliance_color']]
+    elif key == 'spies':
+        inputs += [nation_data.get('spies')] + [nation_data.get(f) for f in PROJECT_FIELDS] + [yesterday.get('spies')]
+    elif key == 'projects':
+        inputs += [nation_data.get(f) for f in PROJECT_FIELDS]
+    elif key == 'military':
+        inputs += [nation_data.get(f) for f in UNIT_FIELDS] + [nation_data.get('military_research'), nation_data.get('cities')]
+        inputs += [yesterday.get(f) for f in UNIT_FIELDS]
+    elif key == 'mmr':
+        inputs += [nation_data.get('cities')]
+    elif key in ('warchest', 'deposit'):
+        # City age feeds the warchest formula, so these verdicts also expire daily
+        inputs += [nation_data.get(f) for f in RESOURCE_FIELDS] + [nation_data.get(f) for f in UNIT_FIELDS]
+        inputs += [nation_data.get('cities'), nation_data.get('propaganda_bureau'), context['today']]
+        if key == 'warchest':
+            inputs.append(context['max_cities'])
+    return inputs
+
+async def check_member(key: str, member: Dict, nation_data: Optional[Dict], context: Dict,
+                       warchest_result: Tuple = None) -> Optional[Dict]:
+    """Run one audit checker for one member."""
+    cache_service = context['cache_service']
+    if key == 'activity':
+        activity_member = {**member, **nation_data} if nation_data else member
+        return activity.check_activity_compliance(activity_member, cache_service, context['current_time'])
+    if key == 'bloc':
+        return await bloc.check_bloc_compliance(member, context['alliance_color'], cache_service)
+    if key == 'warchest':
+        return await warchest.check_warchest_compliance(member, nation_data, context['warchest_service'], cache_service, warchest_result)
+    if key == 'projects':
+        return await projects.check_project_compliance(member, nation_data, cache_service,
+                                                       context['projects'].get(str(member.get('id', 0))))
+    if key == 'spies':
+        return await spies.check_spies_compliance(member, nation_data, cache_service, context['yesterday_data'],
+                                                  context['projects'].get(str(member.get('id', 0))))
+    if key == 'military':
+        return await military.check_military_compliance(member, nation_data, cache_service, context['yesterday_data'])
+    if key == 'mmr':
+        return await mmr.check_mmr_compliance(member, nation_data, cache_service)
+    if key == 'deposit':
+        return await deposit.check_deposit_compliance(member, nation_data, cache_service, warchest_result)
+    return None
+
+def serialize_violation(key: str, violation: Dict, cache_service) -> Dict:
+    """Turn a checker result into a plain entry that can be stored and rendered later."""
+    member = violation['member']
+    return {
+        'nation_id': str(member.get('id', '')),
+        'username': USERNAME_LOOKUPS[key](member, cache_service),
+        'formatted': FORMATTERS[key](violation),
+        'error': 'error' in violation
+    }
+
+async def run_all_checks(snapshot: Dict, cache_service, max_cities: int, audit_types: List[str] = None,
+                         use_fingerprints: bool = True, on_entries: Callable = None,
+                         chunk_size: int = STREAM_CHUNK_SIZE, prune_fingerprints: bool = True) -> Dict[str, List[Dict]]:
+    """Run the selected audits (all by default) over the snapshot and return serialized entries.
+
+    Members whose audit inputs are unchanged since the last run reuse their stored verdict
+    instead of being re-checked. If given, `await on_entries(new_entries, evaluated, total)` is
+    called with (audit type, entry) pairs as reused verdicts are found and after every chunk of
+    re-checked members, so callers can stream results. Runs over several alliances should pass
+    `prune_fingerprints=False` so one alliance doesn't drop the others' stored verdicts.
+    """
+    enabled = [key for key in AUDIT_TYPES if key in set(audit_types or AUDIT_TYPES)]
+    nations_data = snapshot['nations_data']
+    context = {
+        'cache_service': cache_service,
+        'alliance_color': snapshot['alliance_color'],
+        'yesterday_data': snapshot['yesterday_data'],
+        'projects': snapshot.get('projects') or decode_project_bitsets(nations_data),
+        'max_cities': max_cities,
+        'current_time': time.time(),
+        'today': time.strftime('%Y-%m-%d', time.gmtime()),
+        'warchest_service': WarchestService(),
+        'usernames': USERNAME_LOOKUPS
+    }
+
+    # Pass 1: reuse verdicts for members whose fingerprint is unchanged
+    entries = {key: [None] * len(snapshot['members']) for key in enabled}
+    pending = []  # (key, index, member, nation_data, fingerprint)
+    for key in enabled:
+        audited_ids = []
+        for index, member in enumerate(snapshot['members']):
+            nation_id = str(member.get("id", 0))
+            nation_data = nations_data.get(nation_id)
+            if not is_audited(key, member, nation_data, context):
+                continue
+            audited_ids.append(nation_id)
+
+            fingerprint = None
+            if use_fingerprints:
+                inputs = audit_inputs(key, member, nation_data, context)
+                if inputs is not None:
+                    fingerprint = audit_fingerprint_store.fingerprint(inputs)
+                    hit, entry = audit_fingerprint_store.lookup(key, nation_id, fingerprint)
+                    if hit:
+                        entries[key][index] = entry
+                        continue
+            pending.append((key, index, member, nation_data, fingerprint))
+        if use_fingerprints and prune_fingerprints:
+            audit_fingerprint_store.prune(key, audited_ids)
+
+    total_members = len(snapshot['members'])
+    if on_entries:
+        pending_indexes = {index for _, index, _, _, _ in pending}
+        reused = [(key, entry) for key in enabled for entry in entries[key] if entry]
+        await on_entries(reused, total_members - len(pending_indexes), total_members)
+
+    # Warchest requirements feed both the warchest and deposit audits, so compute them once in a batch
+    warchest_ids = list(dict.fromkeys(str(member.get("id", 0)) for key, _, member, _, _ in pending
+                                      if key in ('warchest', 'deposit')))
+    batch = context['warchest_service'].calculate_warchest_batch([nations_data[nation_id] for nation_id in warchest_ids])
+    warchest_results = dict(zip(warchest_ids, batch))
+
+    # Pass 2: check everyone whose inputs changed, a chunk of members at a time
+    pending.sort(key=lambda item: item[1])
+    chunk_entries = []
+    chunk_members = set()
+    evaluated = total_members - len({index for _, index, _, _, _ in pending})
+    for position, (key, index, member, nation_data, fingerprint) in enumerate(pending):
+        nation_id = str(member.get("id", 0))
+        violation = await check_member(key, member, nation_data, context, warchest_results.get(nation_id))
+        entry = serialize_violation(key, violation, cache_service) if violation else None
+        entries[key][index] = entry
+        if fingerprint is not None:
+            audit_fingerprint_store.put(key, nation_id, fingerprint, entry)
+
+        if on_entries:
+            if entry:
+                chunk_entries.append((key, entry))
+            chunk_members.add(index)
+            is_last = position == len(pending) - 1
+            if is_last or (len(chunk_members) >= chunk_size and pending[position + 1][1] != index):
+                evaluated += len(chunk_members)
+                await on_entries(chunk_entries, evaluated, total_members)
+                chunk_entries = []
+                chunk_members = set()
+
+    if use_fingerprints:
+        audit_fingerprint_store.save()
+        logger.info(f"Audit fingerprints: {len(pending)} checks run, stats {audit_fingerprint_store.get_stats()}")
+
+    return {key: [entry for entry in entries[key] if entry] for key in enabled}
+
+async def run_chunked_checks(snapshot: Dict, alliance_service, cache_service, max_cities: int,
+                             audit_types: List[str] = None, on_entries: Callable = None,
+                             chunk_size: int = DETAIL_CHUNK_SIZE) -> Tuple[Dict[str, List[Dict]], int]:
+    """Fetch member details a chunk of IDs at a time and audit each chunk as it arrives.
+
+    Returns the results and how many members' details could not be fetched. Those members still
+    get the audits that need no details (activity, bloc), and chunks that did arrive are kept.
+    """
+    enabled = [key for key in AUDIT_TYPES if key in set(audit_types or AUDIT_TYPES)]
+    members_by_id = {str(member.get("id", 0)): member for member in snapshot['members']}
+    total_members = len(members_by_id)
+    results = {key: [] for key in enabled}
+    evaluated = 0
+    failed = 0
+
+    async for nation_ids, nations_data in alliance_service.iter_member_nations_data(
+            snapshot['alliance_id'], list(members_by_id), chunk_size):
+        if nations_data is None:
+            failed += len(nation_ids)
+            logger.warning(f"Could not fetch details for {len(nation_ids)} members, auditing them without")
+        chunk = {**snapshot, 'members': [members_by_id[nation_id] for nation_id in nation_ids],
+                 'nations_data': nations_data or {}, 'projects': None}
+
+        chunk_on_entries = None
+        if on_entries:
+            async def chunk_on_entries(new_entries, chunk_evaluated, _chunk_total, offset=evaluated):
+                await on_entries(new_entries, offset + chunk_evaluated, total_members, failed)
+
+        chunk_results = await run_all_checks(chunk, cache_service, max_cities, enabled,
+                                             on_entries=chunk_on_entries, prune_fingerprints=False)
+        for key, entries in chunk_results.items():
+            results[key].extend(entries)
+        evaluated += len(chunk['members'])
+
+    # Only a complete run knows who is no longer a member
+    if not failed:
+        for key in enabled:
+            audit_fingerprint_store.prune(key, members_by_id)
+        audit_fingerprint_store.save()
+    return results, failed
+
+async def collect_audit_results(alliance_service, nation_service, cache_service, audit_types: List[str] = None,
+                                max_cities: int = DEFAULT_MAX_CITIES,
+                                on_entries: Callable = None) -> Optional[Tuple[Dict[str, List[Dict]], int]]:
+    """Return serialized results for the selected audits and how many members' details couldn't be fetched.
+
+    Returns None if members are unavailable. Member details are fetched and audited in chunks, so
+    `await on_entries(new_entries, evaluated, total[, failed])` sees results while later chunks load.
+    """
+    if audit_types == ['activity']:
+        snapshot = await build_activity_snapshot()
+    else:
+        snapshot = await build_audit_snapshot(alliance_service, nation_service, fetch_details=False)
+    if not snapshot or not snapshot['members']:
+        return None
+
+    logger.info(f"Running audits {', '.join(audit_types or AUDIT_TYPES)} for {len(snapshot['members'])} members")
+    if audit_types == ['activity']:
+        # Activity needs no member details, so nothing can fail
+        results = await run_all_checks(snapshot, cache_service, max_cities, audit_types, on_entries=on_entries)
+        return results, 0
+    return await run_chunked_checks(snapshot, alliance_service, cache_service, max_cities, audit_types, on_entries)
+
+def build_summary_messages(results: Dict[str, List[Dict]], limit: int = 1900) -> List[str]:
+    """Build the violator code blocks, split to stay under Discord's message limit."""
+    sections = []
+    for key, label, header, *_ in AUDIT_REGISTRY:
+        violators = [f"@{entry['username']}" for entry in results.get(key, []) if not entry.get('error')]
+        if violators:
+            sections.append(f"### The Following People {header}\n{' '.join(violators)}")
+
+    messages = []
+    current = ""
+    for section in sections:
+        if current and len(current) + len(section) + 1 > limit:
+            messages.append(f"```{current}```")
+            current = ""
+        current = f"{current}\n{section}" if current else section
+    if current:
+        messages.append(f"```{current}```")
+    return messages
+
+def format_entry(key: str, entry: Dict, combined: bool) -> str:
+    """Paginator text for a stored entry, tagged with its audit when several audits share the grid."""
+    return f"**[{LABELS[key]}]**\n{entry['formatted']}" if combined else entry['formatted']
+
+async def stream_audit_results(interaction: discord.Interaction, alliance_service, nation_service, cache_service,
+                               audit_types: List[str], max_cities: int = DEFAULT_MAX_CITIES
+                               ) -> Optional[Tuple[Dict[str, List[Dict]], int, ActivityPaginator]]:
+    """Run audits while growing a paginator on the original response as chunks of members are fetched and evaluated.
+
+    Returns the results, how many members' details couldn't be fetched and the paginator (for
+    send_audit_results to finalize), or None if members are unavailable.
+    """
+    combined = len(audit_types) > 1
+    paginator = ActivityPaginator([], status="Fetching alliance members...")
+    last_render = 0.0
+    first_page_shown = False
+
+    async def render(force: bool = False):
+        nonlocal last_render
+        now = time.monotonic()
+        if not force and now - last_render < RESULTS_EDIT_INTERVAL:
+            return
+        last_render = now
+        try:
+            await interaction.edit_original_response(embed=paginator.get_embed(), view=paginator)
+        except Exception as e:
+            # A failed progress edit shouldn't abort the audit, the final render will retry
+            logger.warning(f"Could not update streaming audit results: {e}")
+
+    async def on_entries(new_entries: List[Tuple[str, Dict]], evaluated: int, total: int, failed: int = 0):
+        nonlocal first_page_shown
+        paginator.add_results([format_entry(key, entry, combined) for key, entry in new_entries])
+        paginator.status = f"Evaluated {evaluated}/{total} members..."
+        if failed:
+            paginator.status += f" (details unavailable for {failed})"
+        # Show the first page as soon as it fills, then throttle edits
+        force = not first_page_shown and paginator.first_page_full
+        first_page_shown = first_page_shown or force
+        await render(force)
+
+    await render(force=True)
+    collected = await collect_audit_results(alliance_service, nation_service, cache_service, audit_types,
+                                            max_cities, on_entries=on_entries)
+    if collected is None:
+        await interaction.edit_original_response(content="Could not fetch alliance members.", embed=None, view=None)
+        return None
+    results, failed = collected
+    return results, failed, paginator
+
+async def send_audit_results(interaction: discord.Interaction, results: Dict[str, List[Dict]], timestamp: float = None,
+                             failed: int = 0, paginator: ActivityPaginator = None):
+    """Render serialized audit results as the paginated report plus violator code blocks.
+
+    `failed` is how many members' details couldn't be fetched; the report then says it is partial.
+    A streaming run's `paginator` is finalized in place, keeping the page being viewed.
+    """
+    audit_types = [key for key in AUDIT_TYPES if key in results]
+    combined = len(audit_types) > 1
+
+    formatted_violations = [format_entry(key, entry, combined) for key in audit_types for entry in results[key]]
+
+    title = "Combined Audit" if combined else f"{LABELS[audit_types[0]]} Audit"
+    counts = " • ".join(f"{LABELS[key]}: {len(results[key])}" for key in audit_types)
+    content = f"**{title}** — {counts}"
+    if timestamp:
+        content += f"\nLast run <t:{int(timestamp)}:R> — use `refresh` to run it now"
+    if failed:
+        content += f"\n⚠️ Details for {failed} members couldn't be fetched; only their activity and bloc audits ran"
+
+    if formatted_violations:
+        if paginator is None:
+            paginator = ActivityPaginator(formatted_violations)
+        else:
+            paginator.finalize(formatted_violations)
+        await interaction.edit_original_response(content=content, embed=paginator.get_embed(), view=paginator)
+    else:
+        embed = create_embed(
+            title=f"{title} Complete",
+            description="All members passed every audit!" if combined else "All members passed the audit!",
+            color=discord.Color.green()
+        )
+        await interaction.edit_original_response(content=content, embed=embed, view=None)
+
+    # Send summary with violators in codeblocks
+    for message in build_summary_messages(results):
+        await interaction.followup.send(message)
+
+def get_stored_results(audit_types: List[str]) -> Optional[Tuple[Dict[str, List[Dict]], float]]:
+    """Get stored results for every requested audit type, or None if any is missing or stale."""
+    results = {}
+    oldest = None
+    for audit_type in audit_types:
+        stored = audit_result_store.get(audit_type)
+        if not stored or time.time() - stored['timestamp'] > config.AUDIT_RESULT_MAX_AGE:
+            return None
+        results[audit_type] = stored['entries']
+        oldest = stored['timestamp'] if oldest is None else min(oldest, stored['timestamp'])
+    return results, oldest
+
+async def send_stored_audit(interaction: discord.Interaction, audit_types: List[str]) -> bool:
+    """Answer from the last scheduled run if one is available. Returns False if there is nothing stored."""
+    stored = get_stored_results(audit_types)
+    if not stored:
+        return False
+    results, timestamp = stored
+    await send_audit_results(interaction, results, timestamp)
+    return True
+
+async def run_stored_audit(interaction: discord.Interaction, alliance_service, nation_service, cache_service,
+                           audit_types: List[str]):
+    """Run the selected audits now, store the results and render them."""
+    try:
+        collected = await stream_audit_results(interaction, alliance_service, nation_service, cache_service, audit_types)
+        if collected is None:
+            return
+        results, failed, paginator = collected
+
+        # A partial run would overwrite complete stored results
+        if not failed:
+            audit_result_store.put_many(results)
+        await send_audit_results(interaction, results, failed=failed, paginator=paginator)
+
+    except Exception as e:
+        logger.error(f"Error running audits {audit_types}: {e}")
+        await interaction.followup.send("Error running audit.", ephemeral=True)
+
+async def run_all_audit(interaction: discord.Interaction, alliance_service, nation_service, cache_service, cities: int,
+                        audit_types: List[str] = None):
+    """Run every audit (or just `audit_types`) from a single alliance snapshot and send the report."""
+    audit_types = audit_types or AUDIT_TYPES
+    try:
+        collected = await stream_audit_results(interaction, alliance_service, nation_service, cache_service, audit_types, cities)
+        if collected is None:
+            return
+        results, failed, paginator = collected
+
+        # Only complete runs with the default city cap are comparable to the scheduled ones
+        if cities == DEFAULT_MAX_CITIES and not failed:
+            audit_result_store.put_many(results)
+
+        await send_audit_results(interaction, results, failed=failed, paginator=paginator)
+        logger.info("Audit completed: " + ", ".join(f"{key}={len(entries)}" for key, entries in results.items()))
+
+    except Exception as e:
+        logger.error(f"Error in audits {audit_types}: {e}")
+        await interaction.followup.send("Error running audit.", ephemeral=True)
+
+async def setup(bot):
+    """Setup function for the cog."""
+    pass
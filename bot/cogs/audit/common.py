@@ -0,0 +1,24 @@
+"""
+Helpers shared by the audit modules.
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from services.registration_store import registration_store
+
+def get_discord_username_with_fallback(member: dict, cache_service=None, prefer_api: bool = False) -> str:
+    """Get Discord username with fallback order: registrations -> API -> N/A (API first if prefer_api)."""
+    api_username = member.get('discord', '')
+    if prefer_api and api_username:
+        return api_username
+
+    registered_username = registration_store.get_discord_username(member.get('id', ''))
+    if registered_username:
+        return registered_username
+
+    if api_username:
+        return api_username
+
+    return 'N/A'
@@ -17,6 +17,7 @@ from services.alliance_service import AllianceService
 from api.politics_war_api import PoliticsWarAPI
 from utils.logging import get_logger
 from config.constants import GameConstants
+from config.settings import config
 
 logger = get_logger('audit.main')
 
@@ -33,7 +34,9 @@ class AuditMainCog(commands.Cog):
     @app_commands.command(name="audit", description="Audit alliance members for various compliance issues")
     @app_commands.describe(
         type="Audit type to run",
-        cities="Maximum cities to audit (for warchest and project audits)"
+        cities="Maximum cities to audit (for warchest and project audits)",
+        refresh="Run the audit now instead of showing the last scheduled result",
+        alliances="Comma-separated alliance IDs to audit together, e.g. a whole bloc"
     )
     @app_commands.choices(type=[
         app_commands.Choice(name="activity", value="activity"),
@@ -43,40 +46,48 @@ class AuditMainCog(commands.Cog):
         app_commands.Choice(name="bloc", value="bloc"),
         app_commands.Choice(name="military", value="military"),
         app_commands.Choice(name="mmr", value="mmr"),
-        app_commands.Choice(name="deposit", value="deposit")
+        app_commands.Choice(name="deposit", value="deposit"),
+        app_commands.Choice(name="all", value="all")
     ])
-    async def audit(self, interaction: discord.Interaction, type: str, cities: int = 100):
+    async def audit(self, interaction: discord.Interaction, type: str, cities: int = 100, refresh: bool = False,
+                    alliances: Optional[str] = None):
         """Main audit command that routes to specific audit types."""
         await interaction.response.defer()
         
         try:
-            if type == "activity":
-                from .activity import run_activity_audit
-                await run_activity_audit(interaction, self.alliance_service, self.nation_service, self.cache_service)
-            elif type == "warchest":
-                from .warchest import run_warchest_audit
-                await run_warchest_audit(interaction, self.alliance_service, self.nation_service, self.cache_service, cities)
-            elif type == "spies":
-                from .spies import run_spies_audit
-                await run_spies_audit(interaction, self.alliance_service, self.nation_service, self.cache_service)
-            elif type == "projects":
-                from .projects import run_projects_audit
-                await run_projects_audit(interaction, self.alliance_service, self.nation_service, self.cache_service, 15)
-            elif type == "bloc":
-                from .bloc import run_bloc_audit
-                await run_bloc_audit(interaction, self.alliance_service, self.nation_service, self.cache_service)
-            elif type == "military":
-                from .military import run_military_audit
-                await run_military_audit(interaction, self.alliance_service, self.nation_service, self.cache_service)
-            elif type == "mmr":
-                from .mmr import run_mmr_audit
-                await run_mmr_audit(interaction, self.alliance_service, self.nation_service, self.cache_service)
-            elif type == "deposit":
-                from .deposit import run_deposit_audit
-                await run_deposit_audit(interaction, self.alliance_service, self.nation_service, self.cache_service)
-            else:
+            # Auditing other alliances always runs live, stored results only cover our own
+            if alliances:
+                from .all import AUDIT_TYPES
+                from .multi import parse_alliance_ids, run_multi_alliance_audit
+                try:
+                    alliance_ids = parse_alliance_ids(alliances)
+                except ValueError:
+                    await interaction.followup.send("Alliances must be a comma-separated list of alliance IDs.", ephemeral=True)
+                    return
+                if not alliance_ids or len(alliance_ids) > config.AUDIT_MAX_ALLIANCES:
+                    await interaction.followup.send(f"Please provide between 1 and {config.AUDIT_MAX_ALLIANCES} alliance IDs.", ephemeral=True)
+                    return
+                audit_types = AUDIT_TYPES if type == "all" else [type]
+                await run_multi_alliance_audit(interaction, self.alliance_service, self.nation_service, self.cache_service,
+                                               alliance_ids, audit_types, cities)
+                return
+            
+            # Scheduled audits answer from the last stored run unless a refresh is requested
+            from .all import AUDIT_TYPES, DEFAULT_MAX_CITIES, send_stored_audit, run_stored_audit, run_all_audit
+            audit_types = AUDIT_TYPES if type == "all" else [type]
+            if cities == DEFAULT_MAX_CITIES and all(t in config.SCHEDULED_AUDIT_TYPES for t in audit_types):
+                if refresh:
+                    await run_stored_audit(interaction, self.alliance_service, self.nation_service, self.cache_service, audit_types)
+                    return
+                if await send_stored_audit(interaction, audit_types):
+                    return
+            
+            if type != "all" and type not in AUDIT_TYPES:
                 await interaction.followup.send("Invalid audit type.", ephemeral=True)
-                
+                return
+            # Every live run streams results in as chunks of members are audited
+            await run_all_audit(interaction, self.alliance_service, self.nation_service, self.cache_service, cities, audit_types)
+            
         except Exception as e:
             logger.error(f"Error in audit command: {e}")
             await interaction.followup.send("Error running audit.", ephemeral=True)
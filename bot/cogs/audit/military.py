@@ -2,111 +2,20 @@
 Military audit logic.
 """
 
-import discord
-from typing import List, Dict, Optional
+from typing import Dict, Optional
 
 import sys
 import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 
 from utils.logging import get_logger
-from utils.pagination import ActivityPaginator
-from utils.helpers import create_embed
 from config import Config
+from .common import get_discord_username_with_fallback
 
 config = Config()
 
-def get_discord_username_with_fallback(member: dict, cache_service) -> str:
-    """Get Discord username with proper fallback order: registrations -> API -> N/A."""
-    nation_id = str(member.get('id', ''))
-    
-    # First try registrations
-    registrations = cache_service.load_registrations()
-    for discord_id, data in registrations.items():
-        if str(data.get('nation_id')) == nation_id:
-            # Prefer discord_username (exact username) over discord_name (display name)
-            return data.get('discord_username', data.get('discord_name', 'N/A'))
-    
-    # Then try API data from member
-    discord_username = member.get('discord', '')
-    if discord_username:
-        return discord_username
-    
-    # Finally return N/A
-    return 'N/A'
-
 logger = get_logger('audit.military')
 
-async def run_military_audit(interaction: discord.Interaction, alliance_service, nation_service, cache_service):
-    """Run military audit logic."""
-    try:
-        # Get alliance members
-        members = await alliance_service.get_alliance_members(config.ALLIANCE_ID)
-        if not members:
-            await interaction.followup.send("Could not fetch alliance members.", ephemeral=True)
-            return
-        
-        # Filter for non-applicants
-        filtered_members = []
-        for member in members:
-            if member.get("alliance_position", "") != "APPLICANT":
-                filtered_members.append(member)
-        
-        if not filtered_members:
-            await interaction.followup.send("No members found to audit.", ephemeral=True)
-            return
-        
-        # Get detailed nation data for all members
-        nation_ids = [str(member.get("id", 0)) for member in filtered_members]
-        nations_data = await nation_service.api.get_nations_batch_data(nation_ids, "everything_scope")
-        
-        # Load yesterday's CSV data for military comparison
-        yesterday_data = None
-        try:
-            from services.raid_cache_service import RaidCacheService
-            async with RaidCacheService() as raid_cache:
-                yesterday_data = raid_cache.load_yesterday_nations_cache()
-        except Exception as e:
-            logger.warning(f"Could not load yesterday's data for military audit: {e}")
-        
-        violations = []
-        violators = []
-        
-        for member in filtered_members:
-            nation_id = str(member.get("id", 0))
-            if nation_id not in nations_data:
-                continue
-            
-            nation_data = nations_data[nation_id]
-            violation = await check_military_compliance(member, nation_data, cache_service, yesterday_data)
-            if violation:
-                violations.append(violation)
-                discord_username = get_discord_username_with_fallback(member, cache_service)
-                violators.append(f"@{discord_username}")
-        
-        # Create paginated results
-        if violations:
-            # Format violations for display
-            formatted_violations = [format_military_violation(violation) for violation in violations]
-            paginator = ActivityPaginator(formatted_violations)
-            await interaction.edit_original_response(embed=paginator.get_embed(), view=paginator)
-        else:
-            embed = create_embed(
-                title="Military Audit Complete",
-                description="All members meet military capacity requirements!",
-                color=discord.Color.green()
-            )
-            await interaction.edit_original_response(embed=embed)
-        
-        # Send summary with violators in codeblock
-        if violators:
-            violators_text = " ".join(violators)
-            await interaction.followup.send(f"```### The Following People Need To Buy Their Military\n{violators_text}```")
-            
-    except Exception as e:
-        logger.error(f"Error in military audit: {e}")
-        await interaction.followup.send("Error running military audit.", ephemeral=True)
-
 async def check_military_compliance(member: Dict, nation_data: Dict, cache_service, yesterday_data: Dict = None) -> Optional[Dict]:
     """Check if a member meets military capacity requirements."""
     try:
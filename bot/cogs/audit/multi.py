@@ -0,0 +1,152 @@
+"""
+Multi-alliance audit logic for auditing a whole bloc in one run.
+"""
+
+import discord
+import asyncio
+from typing import Dict, List, Optional
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from utils.logging import get_logger
+from utils.pagination import ActivityPaginator
+from utils.helpers import create_embed
+from config import Config
+
+from .all import (AUDIT_TYPES, DEFAULT_MAX_CITIES, LABELS, build_audit_snapshot, build_summary_messages,
+                  format_entry, load_yesterday_data, run_all_checks)
+
+config = Config()
+
+logger = get_logger('audit.multi')
+
+def parse_alliance_ids(text: str) -> List[int]:
+    """Parse a comma or space separated list of alliance IDs, dropping duplicates. Raises ValueError on bad input."""
+    alliance_ids = []
+    for part in text.replace(',', ' ').split():
+        alliance_id = int(part)
+        if alliance_id <= 0:
+            raise ValueError(f"Invalid alliance ID: {part}")
+        if alliance_id not in alliance_ids:
+            alliance_ids.append(alliance_id)
+    return alliance_ids
+
+async def fetch_alliance_snapshots(alliance_service, nation_service, alliance_ids: List[int]) -> Dict[int, Optional[Dict]]:
+    """Fetch audit snapshots for several alliances concurrently, AUDIT_ALLIANCE_CONCURRENCY at a time.
+
+    Requests still go through the shared API client, so its key rotation and rate limiting apply across alliances.
+    """
+    yesterday_data = await load_yesterday_data()
+    semaphore = asyncio.Semaphore(config.AUDIT_ALLIANCE_CONCURRENCY)
+
+    async def fetch(alliance_id: int) -> Optional[Dict]:
+        async with semaphore:
+            try:
+                return await build_audit_snapshot(alliance_service, nation_service, alliance_id, yesterday_data or {})
+            except Exception as e:
+                logger.error(f"Error fetching audit snapshot for alliance {alliance_id}: {e}")
+                return None
+
+    snapshots = await asyncio.gather(*(fetch(alliance_id) for alliance_id in alliance_ids))
+    return dict(zip(alliance_ids, snapshots))
+
+async def collect_multi_alliance_results(alliance_service, nation_service, cache_service, alliance_ids: List[int],
+                                         audit_types: List[str] = None,
+                                         max_cities: int = DEFAULT_MAX_CITIES) -> Dict[int, Optional[Dict]]:
+    """Run the selected audits over several alliances.
+
+    Returns {alliance_id: {'name': str, 'members': int, 'results': {audit type: [entries]}}},
+    with None for alliances whose members could not be fetched.
+    """
+    snapshots = await fetch_alliance_snapshots(alliance_service, nation_service, alliance_ids)
+
+    report = {}
+    for alliance_id in alliance_ids:
+        snapshot = snapshots.get(alliance_id)
+        if not snapshot or not snapshot['members']:
+            report[alliance_id] = None
+            continue
+        # Stored verdicts are keyed by nation, so they carry over between alliances, but only
+        # the home alliance's scheduled run gets to prune them
+        results = await run_all_checks(snapshot, cache_service, max_cities, audit_types, prune_fingerprints=False)
+        report[alliance_id] = {
+            'name': snapshot['alliance_name'],
+            'members': len(snapshot['members']),
+            'results': results
+        }
+    return report
+
+def merge_alliance_results(report: Dict[int, Optional[Dict]]) -> Dict[str, List[Dict]]:
+    """Aggregate per-alliance results into one result per audit type."""
+    merged = {}
+    for alliance in report.values():
+        if not alliance:
+            continue
+        for key, entries in alliance['results'].items():
+            merged.setdefault(key, []).extend(entries)
+    return merged
+
+def build_multi_alliance_overview(report: Dict[int, Optional[Dict]], audit_types: List[str]) -> str:
+    """Per-alliance violation counts followed by the bloc-wide totals."""
+    lines = []
+    for alliance_id, alliance in report.items():
+        if not alliance:
+            lines.append(f"**{alliance_id}** — could not fetch members")
+            continue
+        counts = " • ".join(f"{LABELS[key]}: {len(alliance['results'].get(key, []))}" for key in audit_types)
+        lines.append(f"**{alliance['name']}** ({alliance['members']} members) — {counts}")
+
+    merged = merge_alliance_results(report)
+    total_members = sum(alliance['members'] for alliance in report.values() if alliance)
+    totals = " • ".join(f"{LABELS[key]}: {len(merged.get(key, []))}" for key in audit_types)
+    lines.append(f"**Total** ({total_members} members) — {totals}")
+    return "\n".join(lines)
+
+async def run_multi_alliance_audit(interaction: discord.Interaction, alliance_service, nation_service, cache_service,
+                                   alliance_ids: List[int], audit_types: List[str] = None,
+                                   max_cities: int = DEFAULT_MAX_CITIES):
+    """Run audits across several alliances and send per-alliance and aggregate results."""
+    try:
+        audit_types = [key for key in AUDIT_TYPES if key in set(audit_types or AUDIT_TYPES)]
+        report = await collect_multi_alliance_results(alliance_service, nation_service, cache_service,
+                                                      alliance_ids, audit_types, max_cities)
+        if not any(report.values()):
+            await interaction.followup.send("Could not fetch members for any of those alliances.", ephemeral=True)
+            return
+
+        combined = len(audit_types) > 1
+        formatted_violations = []
+        for alliance in report.values():
+            if not alliance:
+                continue
+            for key in audit_types:
+                for entry in alliance['results'].get(key, []):
+                    formatted_violations.append(f"**{alliance['name']}**\n{format_entry(key, entry, combined)}")
+
+        content = f"**Multi-Alliance Audit**\n{build_multi_alliance_overview(report, audit_types)}"
+        if formatted_violations:
+            paginator = ActivityPaginator(formatted_violations)
+            await interaction.edit_original_response(content=content, embed=paginator.get_embed(), view=paginator)
+        else:
+            embed = create_embed(
+                title="Multi-Alliance Audit Complete",
+                description="All members of every alliance passed!",
+                color=discord.Color.green()
+            )
+            await interaction.edit_original_response(content=content, embed=embed)
+
+        # Send summary with violators in codeblocks
+        for message in build_summary_messages(merge_alliance_results(report)):
+            await interaction.followup.send(message)
+
+        logger.info(f"Multi-alliance audit completed for {alliance_ids}")
+
+    except Exception as e:
+        logger.error(f"Error in multi-alliance audit: {e}")
+        await interaction.followup.send("Error running multi-alliance audit.", ephemeral=True)
+
+async def setup(bot):
+    """Setup function for the cog."""
+    pass
@@ -9,6 +9,7 @@ import json
 
 from bot.services.nation_service import NationService
 from bot.services.cache_service import CacheService
+from bot.models.project import get_project_bitset
 from bot.config.settings import config
 
 logger = logging.getLogger('raiden_shogun')
@@ -261,50 +262,7 @@ class BuildCog(commands.Cog):
 
     def _get_nation_projects(self, nation: object) -> set:
         """Get the nation's projects as a set."""
-        projects = set()
-        
-        # Check project_bits
-        project_bits = getattr(nation, 'project_bits', 0) or 0
-        project_bits = int(project_bits) if project_bits else 0
-        
-        if project_bits:
-            bits = bin(project_bits)[2:][::-1]
-            project_order = [
-                'iron_works','bauxite_works','arms_stockpile','emergency_gasoline_reserve','mass_irrigation',
-                'international_trade_center','missile_launch_pad','nuclear_research_facility','iron_dome',
-                'vital_defense_system','central_intelligence_agency','center_for_civil_engineering',
-                'propaganda_bureau','uranium_enrichment_program','urban_planning','advanced_urban_planning',
-                'space_program','spy_satellite','moon_landing','pirate_economy','recycling_initiative',
-                'telecommunications_satellite','green_technologies','arable_land_agency','clinical_research_center',
-                'specialized_police_training_program','advanced_engineering_corps','government_support_agency',
-                'research_and_development_center','activity_center','metropolitan_planning','military_salvage',
-                'fallout_shelter','bureau_of_domestic_affairs','advanced_pirate_economy','mars_landing',
-                'surveillance_network','guiding_satellite','nuclear_launch_facility'
-            ]
-            for i, ch in enumerate(bits):
-                if ch == '1' and i < len(project_order):
-                    projects.add(project_order[i])
-        
-        # Check boolean project fields
-        boolean_projects = [
-            'mass_irrigation', 'international_trade_center', 'center_for_civil_engineering',
-            'iron_works', 'bauxite_works', 'arms_stockpile', 'emergency_gasoline_reserve',
-            'nuclear_research_facility', 'uranium_enrichment_program', 'urban_planning',
-            'advanced_urban_planning', 'space_program', 'spy_satellite', 'moon_landing',
-            'pirate_economy', 'recycling_initiative', 'telecommunications_satellite',
-            'green_technologies', 'arable_land_agency', 'clinical_research_center',
-            'specialized_police_training_program', 'advanced_engineering_corps',
-            'government_support_agency', 'research_and_development_center', 'activity_center',
-            'metropolitan_planning', 'military_salvage', 'fallout_shelter',
-            'bureau_of_domestic_affairs', 'advanced_pirate_economy', 'mars_landing',
-            'surveillance_network', 'guiding_satellite', 'nuclear_launch_facility'
-        ]
-        
-        for project in boolean_projects:
-            if getattr(nation, project, False):
-                projects.add(project)
-        
-        return projects
+        return set(get_project_bitset(nation).names())
 
     @app_commands.command(name="build", description="Generate optimal city build based on your nation's data")
     @app_commands.describe(
@@ -7,7 +7,6 @@ from discord.ext import commands
 from discord import app_commands
 from typing import Optional
 import math
-import json
 import traceback
 from datetime import datetime, timezone
 
@@ -17,6 +16,7 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(
 
 from services.nation_service import NationService
 from services.cache_service import CacheService
+from services.registration_store import registration_store
 from services.war_service import WarService
 from services.warchest_service import WarchestService
 from utils.logging import get_logger
@@ -76,14 +76,10 @@ class NationInfoCog(commands.Cog):
             # Get Discord user if registered
             discord_info = ""
             try:
-                # First try registrations.json
-                with open('data/registrations.json', 'r') as f:
-                    registrations = json.load(f)
-                    for discord_id, reg_data in registrations.items():
-                        if reg_data.get('nation_id') == nation_id:
-                            discord_user = f"<@{discord_id}>"
-                            discord_info = f" | {discord_user}"
-                            break
+                # First try registrations
+                discord_id = registration_store.get_discord_id(nation_id)
+                if discord_id:
+                    discord_info = f" | <@{discord_id}>"
                 
                 # If not found in registrations, try nation's Discord field from API
                 if not discord_info and hasattr(nation, 'discord_username') and nation.discord_username:
@@ -218,15 +214,10 @@ class NationInfoCog(commands.Cog):
         
         try:
             # Load registrations
-            try:
-                with open('data/registrations.json', 'r') as f:
-                    registrations = json.load(f)
-            except FileNotFoundError:
+            registrations = registration_store.get_all()
+            if not registrations:
                 await ctx.send("No registrations found.")
                 return
-            except json.JSONDecodeError:
-                await ctx.send("Error reading registrations file.")
-                return
             
             if not search_term:
                 await ctx.send(
@@ -35,14 +35,9 @@ class MilitaryCog(commands.Cog):
             
             # If no nation ID provided, try to get from registrations
             if not nation_id:
-                from services.cache_service import CacheService
-                cache_service = CacheService()
-                registrations = cache_service.load_registrations()
-                
-                user_id = str(interaction.user.id)
-                if user_id in registrations:
-                    nation_id = registrations[user_id].get('nation_id')
-                else:
+                from services.registration_store import registration_store
+                nation_id = registration_store.get_nation_id(str(interaction.user.id))
+                if not nation_id:
                     await interaction.followup.send("No nation ID provided and you're not registered. Please provide a nation ID or register first.", ephemeral=True)
                     return
             
@@ -9,6 +9,7 @@ from typing import Optional, List, Dict, Tuple
 from bot.services.nation_service import NationService
 from bot.config.settings import config
 from bot.services.cache_service import CacheService
+from bot.models.project import get_project_bitset
 
 logger = logging.getLogger('raiden_shogun')
 
@@ -188,27 +189,7 @@ class ProjectsCog(commands.Cog):
             total_infra = sum(c['infrastructure'] for c in cities_norm)
             projects_built = getattr(nation, 'projects', 0) or 0
             # Check for RnD using project_bits
-            project_bits = getattr(nation, 'project_bits', 0) or 0
-            project_bits = int(project_bits) if project_bits else 0
-            has_rnd = False
-            if project_bits:
-                bits = bin(project_bits)[2:][::-1]
-                project_order = [
-                    'iron_works','bauxite_works','arms_stockpile','emergency_gasoline_reserve','mass_irrigation',
-                    'international_trade_center','missile_launch_pad','nuclear_research_facility','iron_dome',
-                    'vital_defense_system','central_intelligence_agency','center_for_civil_engineering',
-                    'propaganda_bureau','uranium_enrichment_program','urban_planning','advanced_urban_planning',
-                    'space_program','spy_satellite','moon_landing','pirate_economy','recycling_initiative',
-                    'telecommunications_satellite','green_technologies','arable_land_agency','clinical_research_center',
-                    'specialized_police_training_program','advanced_engineering_corps','government_support_agency',
-                    'research_and_development_center','activity_center','metropolitan_planning','military_salvage',
-                    'fallout_shelter','bureau_of_domestic_affairs','advanced_pirate_economy','mars_landing',
-                    'surveillance_network','guiding_satellite','nuclear_launch_facility'
-                ]
-                for i, ch in enumerate(bits):
-                    if ch == '1' and i < len(project_order) and project_order[i] == 'research_and_development_center':
-                        has_rnd = True
-                        break
+            has_rnd = get_project_bitset(nation).has('research_and_development_center')
             rnd_bonus = 2 if has_rnd else 0
             
             # Check for Military Research Center project (also gives +2 slots)
@@ -311,42 +292,14 @@ class ProjectsCog(commands.Cog):
                 await interaction.followup.send("❌ Could not fetch nation.", ephemeral=True)
                 return
 
-            # Determine owned projects using project_bits if available, else booleans
-            project_bits = getattr(nation, 'project_bits', 0) or 0
-            project_bits = int(project_bits) if project_bits else 0
-            owned = set()
-            
-            if project_bits:
-                # Convert to binary and reverse for right-to-left reading
-                bits = bin(project_bits)[2:][::-1]
-                # Project bits are read right-to-left in API_REFERENCES order; map names to index
-                project_order = [
-                    'iron_works','bauxite_works','arms_stockpile','emergency_gasoline_reserve','mass_irrigation',
-                    'international_trade_center','missile_launch_pad','nuclear_research_facility','iron_dome',
-                    'vital_defense_system','central_intelligence_agency','center_for_civil_engineering',
-                    'propaganda_bureau','uranium_enrichment_program','urban_planning','advanced_urban_planning',
-                    'space_program','spy_satellite','moon_landing','pirate_economy','recycling_initiative',
-                    'telecommunications_satellite','green_technologies','arable_land_agency','clinical_research_center',
-                    'specialized_police_training_program','advanced_engineering_corps','government_support_agency',
-                    'research_and_development_center','activity_center','metropolitan_planning','military_salvage',
-                    'fallout_shelter','bureau_of_domestic_affairs','advanced_pirate_economy','mars_landing',
-                    'surveillance_network','guiding_satellite','nuclear_launch_facility'
-                ]
-                for i, ch in enumerate(bits):
-                    if ch == '1' and i < len(project_order):
-                        owned.add(project_order[i])
-
-            def has(name: str, fallback_attr: str) -> bool:
-                if name in owned:
-                    return True
-                return bool(getattr(nation, fallback_attr, False))
-
-            has_activity = has('activity_center', 'activity_center')
-            has_pb = has('propaganda_bureau', 'propaganda_bureau')
-            has_ia = has('central_intelligence_agency', 'central_intelligence_agency')
-            has_rnd = has('research_and_development_center', 'research_and_development_center')
-            has_pe = has('pirate_economy', 'pirate_economy')
-            has_ape = has('advanced_pirate_economy', 'advanced_pirate_economy')
+            # Determine owned projects using project_bits, plus the boolean fields
+            owned_projects = get_project_bitset(nation)
+            has_activity = owned_projects.has('activity_center')
+            has_pb = owned_projects.has('propaganda_bureau')
+            has_ia = owned_projects.has('central_intelligence_agency')
+            has_rnd = owned_projects.has('research_and_development_center')
+            has_pe = owned_projects.has('pirate_economy')
+            has_ape = owned_projects.has('advanced_pirate_economy')
 
             order = [
                 ("Activity Center", has_activity),
@@ -2,16 +2,22 @@ import discord
 from discord.ext import commands
 from discord import app_commands
 import logging
+import time
 from typing import Optional
 
 from services.raid_cache_service import RaidCacheService
 from services.raid_calculation_service import RaidCalculationService
 from services.nation_service import NationService
 from services.cache_service import CacheService
+from services.beige_timer_service import beige_timer_service, turn_start
 from utils.raid_paginator import RaidPaginator
+from config.settings import config
 
 logger = logging.getLogger('raiden_shogun')
 
+# Minimum seconds between result message edits while targets stream in
+RESULTS_EDIT_INTERVAL = 2.0
+
 class RaidCog(commands.Cog):
     """Raid-related commands for finding profitable targets."""
     
@@ -20,6 +26,7 @@ class RaidCog(commands.Cog):
         self.nation_service = NationService()
         self.cache_service = CacheService()
         self.raid_calculation_service = RaidCalculationService()
+        beige_timer_service.set_notifier(self.send_beige_alerts)
     
     async def get_user_nation_id(self, ctx_or_interaction, is_slash: bool = True) -> Optional[int]:
         """Get user's nation ID from cache."""
@@ -88,14 +95,32 @@ class RaidCog(commands.Cog):
             else:
                 progress_msg = await ctx_or_interaction.send(embed=progress_embed)
             
+            # Paginator is filled in as scored chunks stream in
+            paginator = RaidPaginator([], max_targets=config.RAID_TOP_K)
+            last_render = 0.0
+            
+            async def render_results(force: bool = False):
+                nonlocal last_render
+                now = time.monotonic()
+                if not force and now - last_render < RESULTS_EDIT_INTERVAL:
+                    return
+                last_render = now
+                await progress_msg.edit(embed=paginator.get_embed(), view=paginator)
+            
             # Progress callback function
             async def update_progress(step_description):
+                if paginator.targets:
+                    # Results are already showing, keep them and just update the status line
+                    paginator.status = step_description
+                    await render_results()
+                    return
                 progress_embed.description = f"**{step_description}**\n\nFinding targets within war range of score {user_score:,.2f}..."
                 await progress_msg.edit(embed=progress_embed)
             
             # Load cached data
             async with RaidCacheService() as cache_service:
                 cache_data = cache_service.load_raid_cache()
+                cache_generation = cache_service.get_cache_generation()
                 
                 if not cache_data:
                     await self.send_error(ctx_or_interaction, "No cached data available. Please try again later.", is_slash)
@@ -141,10 +166,22 @@ class RaidCog(commands.Cog):
                     'credits': user_nation_data.credits if score is None else 0
                 }
                 
-                # Filter targets
-                valid_targets, filtered_out = await self.raid_calculation_service.filter_raid_targets(
-                    user_nation_dict, nations_data, cities_data, wars_data, alliances_data, update_progress
-                )
+                # Stream targets into the paginator as each chunk is scored
+                filtered_out = self.raid_calculation_service.new_filter_stats()
+                async for batch in self.raid_calculation_service.iter_raid_targets(
+                    user_nation_dict, nations_data, cities_data, wars_data, alliances_data, filtered_out, update_progress,
+                    cache_generation=cache_generation
+                ):
+                    first_batch = not paginator.targets
+                    paginator.add_targets(batch)
+                    if paginator.status is None:
+                        paginator.status = "Still searching"
+                    # Show the first page as soon as it exists, then throttle edits
+                    await render_results(force=first_batch)
+                
+                valid_targets = paginator.targets
+                filtered_out['below_top_k'] = paginator.total_found - len(valid_targets)
+                logger.info(f"Filtering stats: {filtered_out}")
                 
                 if not valid_targets:
                     no_targets_embed = discord.Embed(
@@ -165,17 +202,12 @@ class RaidCog(commands.Cog):
                     await progress_msg.edit(embed=no_targets_embed)
                     return
                 
-                # Create paginator
-                paginator = RaidPaginator(valid_targets)
-                
-                # Send results
-                results_embed = paginator.get_embed()
-                
-                # Replace the progress message with results
-                await progress_msg.edit(embed=results_embed, view=paginator)
+                # Final re-sort and render of the complete results
+                paginator.finalize()
+                await render_results(force=True)
                 
                 # Log success
-                logger.info(f"Raid command completed: {len(valid_targets)} targets found for score {user_score}")
+                logger.info(f"Raid command completed: {paginator.total_found} targets found for score {user_score}, showing top {len(valid_targets)}")
         
         except Exception as e:
             logger.error(f"Error in raid command: {e}")
@@ -192,6 +224,89 @@ class RaidCog(commands.Cog):
         """Find raid targets using slash command."""
         await self.raid_logic(interaction, score, is_slash=True)
 
+    def format_beige_target(self, target: dict) -> str:
+        """One-line summary of a target leaving beige."""
+        return (
+            f"[{target['nation_name']}](https://politicsandwar.com/nation/id={target['id']}) "
+            f"({target['score']:,.0f} score, {target['cities']} cities, {target['alliance_name']})"
+        )
+    
+    async def send_beige_alerts(self, alerts: dict):
+        """Tell each subscriber which of their targets just left beige."""
+        channel = self.bot.get_channel(config.BEIGE_ALERT_CHANNEL_ID) if config.BEIGE_ALERT_CHANNEL_ID else None
+        for discord_id, targets in alerts.items():
+            embed = discord.Embed(
+                title="🎯 Targets Out of Beige",
+                description="\n".join(self.format_beige_target(target) for target in targets),
+                color=discord.Color.orange()
+            )
+            try:
+                if channel:
+                    await channel.send(content=f"<@{discord_id}>", embed=embed)
+                else:
+                    user = self.bot.get_user(int(discord_id)) or await self.bot.fetch_user(int(discord_id))
+                    await user.send(embed=embed)
+            except Exception as e:
+                logger.error(f"Error sending beige alert to {discord_id}: {e}")
+    
+    @app_commands.command(name="beigewatch", description="Get pinged when a nation leaves beige (run again to stop)")
+    @app_commands.describe(nation_id="Nation ID to watch")
+    async def beigewatch_slash(self, interaction: discord.Interaction, nation_id: int):
+        """Toggle a beige exit alert for one nation."""
+        user_id = str(interaction.user.id)
+        if beige_timer_service.unwatch(user_id, nation_id):
+            await interaction.response.send_message(f"🔕 No longer watching nation {nation_id}.", ephemeral=True)
+            return
+        
+        beige_timer_service.watch(user_id, nation_id)
+        exit_turn = beige_timer_service.get_exit_turn(nation_id)
+        when = f"leaves beige <t:{int(turn_start(exit_turn))}:R>" if exit_turn else "isn't known to be in beige yet"
+        await interaction.response.send_message(
+            f"🔔 Watching nation {nation_id}; it {when}. You'll be pinged at the turn change.", ephemeral=True
+        )
+    
+    @app_commands.command(name="beigerange", description="Get pinged when targets in your war range leave beige")
+    @app_commands.describe(enabled="Turn range alerts on or off")
+    async def beigerange_slash(self, interaction: discord.Interaction, enabled: bool = True):
+        """Subscribe to beige exits within the registered nation's war range."""
+        if not enabled:
+            beige_timer_service.set_range(str(interaction.user.id), None)
+            await interaction.response.send_message("🔕 Range alerts turned off.", ephemeral=True)
+            return
+        
+        nation_id = await self.get_user_nation_id(interaction)
+        if not nation_id:
+            return
+        beige_timer_service.set_range(str(interaction.user.id), nation_id)
+        await interaction.response.send_message(
+            f"🔔 You'll be pinged when targets in range of nation {nation_id} leave beige "
+            f"(up to {config.BEIGE_ALERT_MAX_TARGETS} per turn).", ephemeral=True
+        )
+    
+    @app_commands.command(name="beigelist", description="Show your targets leaving beige soon")
+    @app_commands.describe(turns="How many turns ahead to look (default 12)")
+    async def beigelist_slash(self, interaction: discord.Interaction, turns: int = 12):
+        """List upcoming beige exits a subscriber will be alerted about."""
+        subscription = beige_timer_service.get_subscription(str(interaction.user.id))
+        if not subscription:
+            await interaction.response.send_message(
+                "❌ You have no beige alerts. Use /beigewatch or /beigerange first.", ephemeral=True
+            )
+            return
+        
+        upcoming = beige_timer_service.get_upcoming(str(interaction.user.id), max(1, min(turns, 120)))
+        lines = [f"<t:{int(turn_start(exit_turn))}:R> — {self.format_beige_target(target)}"
+                 for exit_turn, target in upcoming[:15]]
+        embed = discord.Embed(
+            title="⏳ Leaving Beige Soon",
+            description="\n".join(lines) if lines else "Nothing you're subscribed to leaves beige in that window.",
+            color=discord.Color.orange()
+        )
+        range_nation = subscription.get('range_nation_id')
+        embed.set_footer(text=f"Watching {len(subscription['watch'])} nations"
+                              + (f" • range alerts for nation {range_nation}" if range_nation else ""))
+        await interaction.response.send_message(embed=embed, ephemeral=True)
+
 async def setup(bot):
     """Setup function for the cog."""
     await bot.add_cog(RaidCog(bot))
\ No newline at end of file
@@ -10,6 +10,7 @@ import traceback
 from typing import Optional
 
 from services.nation_service import NationService
+from services.war_state_tracker import war_state_tracker
 
 logger = logging.getLogger('raiden_shogun')
 
@@ -22,8 +23,8 @@ class WarsCog(commands.Cog):
     
     def format_war_line(self, war, nation_id: int, is_offensive: bool) -> str:
         """Format a single war line for the table."""
-        # Determine if this nation is attacker or defender
-        is_attacker = war['attacker']['id'] == nation_id
+        # Determine if this nation is attacker or defender (API IDs are strings)
+        is_attacker = str(war['attacker']['id']) == str(nation_id)
         
         # Get opponent info
         if is_attacker:
@@ -50,27 +51,31 @@ class WarsCog(commands.Cog):
         else:
             type_abbr = '?'
         
-        # Control indicators
-        ground_control = war.get('groundcontrol', 0)
-        air_superiority = war.get('airsuperiority', 0)
-        naval_blockade = war.get('navalblockade', 0)
+        # Control indicators hold the ID of the nation with control (0 = nobody)
+        attacker_id = str(war['attacker']['id'])
+        defender_id = str(war['defender']['id'])
         
-        # Determine control status
-        if is_attacker:
-            ground_status = "A" if ground_control == 1 else "D" if ground_control == 2 else "-"
-            air_status = "A" if air_superiority == 1 else "D" if air_superiority == 2 else "-"
-            naval_status = "A" if naval_blockade == 1 else "D" if naval_blockade == 2 else "-"
+        def control_status(holder) -> str:
+            holder = str(holder or 0)
+            return "A" if holder == attacker_id else "D" if holder == defender_id else "-"
+        
+        ground_status = control_status(war.get('groundcontrol'))
+        air_status = control_status(war.get('airsuperiority'))
+        naval_status = control_status(war.get('navalblockade'))
+        
+        # MAPs are only known for wars followed by the war state tracker
+        if 'att_points' in war:
+            our_maps, their_maps = (war['att_points'], war['def_points']) if is_attacker else (war['def_points'], war['att_points'])
+            maps = f"{our_maps:>2}/{their_maps:>2}"
         else:
-            ground_status = "D" if ground_control == 2 else "A" if ground_control == 1 else "-"
-            air_status = "D" if air_superiority == 2 else "A" if air_superiority == 1 else "-"
-            naval_status = "D" if naval_blockade == 2 else "A" if naval_blockade == 1 else "-"
+            maps = " -/ -"
         
         # Format fortify as Yes/No
         our_fortify_str = "Yes" if our_fortify else "No"
         their_fortify_str = "Yes" if their_fortify else "No"
         
         # Format the line
-        line = f"#{war['id']:07d} {type_abbr} | {opponent['nation_name'][:15]:<15} | {our_resistance:>3}/{their_resistance:>3} | {our_fortify_str:>3}/{their_fortify_str:>3} | {ground_status}/{air_status}/{naval_status} | {war.get('turns_left', 0):>2}T"
+        line = f"#{int(war['id']):07d} {type_abbr} | {opponent['nation_name'][:15]:<15} | {our_resistance:>3}/{their_resistance:>3} | {our_fortify_str:>3}/{their_fortify_str:>3} | {ground_status}/{air_status}/{naval_status} | {maps} | {war.get('turns_left', 0):>2}T"
         
         return line
     
@@ -97,7 +102,7 @@ class WarsCog(commands.Cog):
         lines.append(f"Active Wars for {nation_name} (ID: {nation_id})")
         lines.append("=" * 60)
         lines.append("")
-        lines.append("ID      T | Opponent         | Res  | Fort | G/A/N | T")
+        lines.append("ID      T | Opponent         | Res  | Fort | G/A/N | MAP | T")
         lines.append("-" * 60)
         
         # Add defensive wars
@@ -118,6 +123,13 @@ class WarsCog(commands.Cog):
         
         return f"```\n" + "\n".join(lines) + "\n```"
     
+    async def get_wars_data(self, nation_id: int) -> Optional[dict]:
+        """Wars for a nation: live tracked state for alliance members, the API for everyone else."""
+        wars_data = war_state_tracker.get_nation_wars(nation_id)
+        if wars_data is not None:
+            return wars_data
+        return await self.nation_service.get_nation_basic(nation_id)
+    
     async def get_target_nation_id(self, context, nation_id: int = None):
         """Determine which nation ID to use based on the fallback logic."""
         # If nation ID is provided, use it
@@ -181,14 +193,14 @@ class WarsCog(commands.Cog):
                 await interaction.followup.send("❌ Could not determine nation ID. Please provide a nation ID or ensure you're registered.")
                 return
             
-            # Get nation data
-            nation_data = await self.nation_service.get_nation(target_nation_id)
-            if not nation_data:
+            # Get war data
+            wars_data = await self.get_wars_data(target_nation_id)
+            if not wars_data:
                 await interaction.followup.send(f"❌ Nation with ID {target_nation_id} not found.")
                 return
             
             # Format and send wars table
-            wars_table = self.format_wars_table(nation_data.__dict__, target_nation_id)
+            wars_table = self.format_wars_table(wars_data, target_nation_id)
             await interaction.followup.send(wars_table)
             
         except Exception as e:
@@ -206,14 +218,14 @@ class WarsCog(commands.Cog):
                 await ctx.send("❌ Could not determine nation ID. Please provide a nation ID or ensure you're registered.")
                 return
             
-            # Get nation data
-            nation_data = await self.nation_service.get_nation(target_nation_id)
-            if not nation_data:
+            # Get war data
+            wars_data = await self.get_wars_data(target_nation_id)
+            if not wars_data:
                 await ctx.send(f"❌ Nation with ID {target_nation_id} not found.")
                 return
             
             # Format and send wars table
-            wars_table = self.format_wars_table(nation_data.__dict__, target_nation_id)
+            wars_table = self.format_wars_table(wars_data, target_nation_id)
             await ctx.send(wars_table)
             
         except Exception as e:
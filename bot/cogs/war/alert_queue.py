@@ -0,0 +1,120 @@
+"""
+Per-channel queue that coalesces war alerts into multi-embed messages.
+"""
+
+import asyncio
+import discord
+from typing import Dict, List, Optional, Tuple
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from utils.logging import get_logger
+
+logger = get_logger('war.alerts')
+
+# Discord allows at most 10 embeds and 6000 embed characters per message
+MAX_EMBEDS_PER_MESSAGE = 10
+MAX_EMBED_CHARS_PER_MESSAGE = 6000
+
+Alert = Tuple[discord.Embed, Optional[str]]
+
+def _is_transient(error: Exception) -> bool:
+    """Whether a failed send is worth retrying later (rate limits, server errors, network)."""
+    if isinstance(error, discord.HTTPException):
+        return error.status == 429 or error.status >= 500
+    return True
+
+class WarAlertQueue:
+    """Queues alerts per channel and sends them as few messages as possible.
+
+    Alerts queued while a channel's previous message is still being sent are picked up by the
+    same worker, so a blitz spread over several polls still lands in full messages. Messages
+    are packed up to Discord's embed count and size limits; if Discord still rejects one, it
+    is split in half and each half retried. Each message mentions every role pinged by any of
+    its alerts once.
+    """
+
+    def __init__(self, bot):
+        self.bot = bot
+        # channel ID -> (embed, mention, the failed list of the send() call that queued it)
+        self._pending: Dict[int, List[Tuple[discord.Embed, Optional[str], List[Alert]]]] = {}
+        self._workers: Dict[int, asyncio.Task] = {}
+        self._stats = {'alerts': 0, 'messages': 0, 'split': 0, 'failed': 0, 'dropped': 0}
+
+    async def send(self, channel_id: int, alerts: List[Alert]) -> List[Alert]:
+        """Queue (embed, mention) alerts for a channel and wait until they have been sent.
+
+        Returns the alerts that hit a transient error and should be retried later. Alerts
+        Discord rejects outright (missing channel, permissions, invalid embed) are dropped.
+        """
+        if not alerts:
+            return []
+        failed: List[Alert] = []
+        self._pending.setdefault(channel_id, []).extend((embed, mention, failed) for embed, mention in alerts)
+        self._stats['alerts'] += len(alerts)
+
+        worker = self._workers.get(channel_id)
+        if worker is None or worker.done():
+            worker = self._workers[channel_id] = asyncio.create_task(self._drain(channel_id))
+        await asyncio.shield(worker)
+        return failed
+
+    def _next_batch(self, pending: List) -> List:
+        """Take the longest prefix of `pending` that fits in one message."""
+        count, chars = 0, 0
+        for embed, _, _ in pending[:MAX_EMBEDS_PER_MESSAGE]:
+            size = len(embed)
+            if count and chars + size > MAX_EMBED_CHARS_PER_MESSAGE:
+                break
+            count += 1
+            chars += size
+        batch = pending[:count]
+        del pending[:count]
+        return batch
+
+    async def _send_batch(self, channel, batch: List) -> None:
+        """Send one message, halving it on rejection until each part goes through or is a single alert."""
+        mentions = list(dict.fromkeys(mention for _, mention, _ in batch if mention))
+        try:
+            await channel.send(content=" ".join(mentions) or None, embeds=[embed for embed, _, _ in batch])
+            self._stats['messages'] += 1
+            return
+        except discord.HTTPException as e:
+            # A rejected message (e.g. over a size limit) may go through in smaller pieces
+            if len(batch) > 1 and not _is_transient(e) and not isinstance(e, (discord.Forbidden, discord.NotFound)):
+                self._stats['split'] += 1
+                middle = len(batch) // 2
+                await self._send_batch(channel, batch[:middle])
+                await self._send_batch(channel, batch[middle:])
+                return
+            error = e
+        except Exception as e:
+            error = e
+
+        if _is_transient(error):
+            logger.error(f"Error sending {len(batch)} war alerts to channel {channel.id}, will retry: {error}")
+            self._stats['failed'] += len(batch)
+            for embed, mention, failed in batch:
+                failed.append((embed, mention))
+        else:
+            logger.error(f"Discord rejected {len(batch)} war alerts for channel {channel.id}, dropping: {error}")
+            self._stats['dropped'] += len(batch)
+
+    async def _drain(self, channel_id: int) -> None:
+        """Send everything pending for a channel, as many alerts per message as fit."""
+        pending = self._pending[channel_id]
+        channel = self.bot.get_channel(channel_id)
+        if not channel:
+            logger.error(f"Could not find alert channel {channel_id}, dropping {len(pending)} alerts")
+            self._stats['dropped'] += len(pending)
+            pending.clear()
+            return
+
+        while pending:
+            await self._send_batch(channel, self._next_batch(pending))
+
+    def get_stats(self) -> Dict[str, int]:
+        """Get alert and message counts since startup."""
+        return dict(self._stats)
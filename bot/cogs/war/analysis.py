@@ -2,10 +2,12 @@
 War analysis commands.
 """
 
+import asyncio
 import discord
 from discord.ext import commands
 from discord import app_commands
 from typing import Optional, List, Dict
+from datetime import datetime, timedelta, timezone
 
 import sys
 import os
@@ -13,6 +15,13 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(
 
 from services.war_service import WarService
 from services.nation_service import NationService
+from services.war_state_tracker import war_state_tracker
+from services.war_history_store import war_history_store
+from services.counter_service import counter_service, format_counter_line
+from services.range_watchlist_service import range_watchlist_service
+from services.cache_service import CacheService
+from config.settings import config
+from utils.helpers import create_embed
 from utils.logging import get_logger
 from utils.formatting import format_number
 from config.constants import GameConstants
@@ -43,7 +52,167 @@ class WarAnalysisCog(commands.Cog):
             }
         }
     
+    @app_commands.command(name="warsummary", description="Summary of the alliance's active wars")
+    async def war_summary(self, interaction: discord.Interaction):
+        """Summarize active wars from the live war state tracker."""
+        if not war_state_tracker.is_ready():
+            await interaction.response.send_message("❌ War state is still loading, try again shortly.", ephemeral=True)
+            return
+        
+        try:
+            member_ids = war_state_tracker.get_member_ids()
+            wars = war_state_tracker.get_wars()
+            offensive = [war for war in wars if war['att_id'] in member_ids]
+            defensive = [war for war in wars if war['def_id'] in member_ids]
+            
+            # Members close to losing a war
+            low_resistance = []
+            for war in defensive + offensive:
+                side = 'def' if war['def_id'] in member_ids else 'att'
+                if war[f'{side}_resistance'] <= 30:
+                    member = war['defender'] if side == 'def' else war['attacker']
+                    low_resistance.append(f"{member.get('nation_name', 'Unknown')}: {war[f'{side}_resistance']} resistance (war #{war['id']})")
+            
+            embed = create_embed(
+                title="⚔️ Alliance War Summary",
+                description=(
+                    f"**Active Wars:** {len(wars)}\n"
+                    f"**Offensive:** {len(offensive)}\n"
+                    f"**Defensive:** {len(defensive)}"
+                ),
+                color=discord.Color.red() if defensive else discord.Color.blue()
+            )
+            
+            if low_resistance:
+                embed.add_field(name="Low Resistance", value="\n".join(low_resistance[:10]), inline=False)
+            
+            loot = war_state_tracker.get_loot_totals()
+            for kind, title in (('gained', "Loot Taken"), ('lost', "Loot Lost")):
+                totals = [f"{resource.title()}: {format_number(amount)}" for resource, amount in loot[kind].items() if amount]
+                embed.add_field(name=title, value="\n".join(totals) or "None", inline=True)
+            
+            embed.set_footer(text="Live war state; loot counted since the bot started tracking")
+            await interaction.response.send_message(embed=embed)
+        except Exception as e:
+            logger.error(f"Error in war summary command: {e}")
+            await interaction.response.send_message("❌ Error building war summary.", ephemeral=True)
+    
+    @app_commands.command(name="warstats", description="War record from the bot's war history")
+    @app_commands.describe(
+        nation_id="Nation to show (default: an alliance)",
+        alliance_id="Alliance to show (default: ours)",
+        vs_alliance_id="Only count wars against this alliance",
+        days="Only count wars declared in the last N days"
+    )
+    async def war_stats(self, interaction: discord.Interaction, nation_id: Optional[int] = None,
+                        alliance_id: Optional[int] = None, vs_alliance_id: Optional[int] = None,
+                        days: Optional[int] = None):
+        """Show wins, losses, win rate and loot from the stored war history."""
+        await interaction.response.defer()
+        
+        try:
+            since = (datetime.now(timezone.utc) - timedelta(days=days)).isoformat() if days else None
+            # Read off the event loop: a wars CSV import can hold the store for a while
+            loop = asyncio.get_running_loop()
+            if nation_id:
+                record = await loop.run_in_executor(None, war_history_store.get_nation_record, nation_id, since)
+                subject = f"Nation {nation_id}"
+            else:
+                alliance_id = alliance_id or config.ALLIANCE_ID
+                record = await loop.run_in_executor(None, war_history_store.get_alliance_record,
+                                                    alliance_id, vs_alliance_id, since)
+                subject = f"Alliance {alliance_id}" + (f" vs {vs_alliance_id}" if vs_alliance_id else "")
+            
+            if not record.get('wars'):
+                await interaction.followup.send(f"❌ No recorded wars for {subject}.")
+                return
+            
+            win_rate = f"{record['win_rate']:.0%}" if record['win_rate'] is not None else "N/A"
+            embed = create_embed(
+                title=f"📊 War Record: {subject}",
+                description=(
+                    f"**Wars:** {record['wars']} ({record['offensive']} offensive, {record['defensive']} defensive)\n"
+                    f"**Wins:** {record['wins']}\n"
+                    f"**Losses:** {record['losses']}\n"
+                    f"**Win Rate:** {win_rate}"
+                ),
+                color=discord.Color.blue()
+            )
+            embed.add_field(name="Loot Taken", value=f"${format_number(record['loot_gained'])}", inline=True)
+            embed.add_field(name="Loot Lost", value=f"${format_number(record['loot_lost'])}", inline=True)
+            embed.add_field(name="Loot per Win", value=f"${format_number(record['loot_per_win'])}", inline=True)
+            embed.set_footer(text=f"Last {days} days" if days else "All recorded wars")
+            await interaction.followup.send(embed=embed)
+        except Exception as e:
+            logger.error(f"Error in war stats command: {e}")
+            await interaction.followup.send("❌ Error reading war history.")
     
+    @app_commands.command(name="counter", description="Rank members able to counter an enemy nation")
+    @app_commands.describe(target="War ID or link (counters the non-member side), or nation ID or link")
+    async def counter(self, interaction: discord.Interaction, target: str):
+        """Rank in-range members with free offensive slots by military advantage."""
+        await interaction.response.defer()
+        
+        try:
+            enemy = await counter_service.resolve_enemy(target)
+            if not enemy:
+                await interaction.followup.send(f"❌ Could not find a nation or war for `{target}`.")
+                return
+            
+            candidates = await counter_service.find_counters(enemy, limit=10)
+            enemy_name = enemy.get('nation_name', 'Unknown')
+            # Candidate lines go in the description, ten of them overflow a field
+            lines = [format_counter_line(candidate) for candidate in candidates] or ["No members in range with free slots."]
+            embed = create_embed(
+                title=f"🎯 Counters for {enemy_name}",
+                description="\n".join(lines),
+                color=discord.Color.orange()
+            )
+            embed.add_field(name="Score", value=f"{float(enemy.get('score') or 0):,.2f}", inline=True)
+            embed.add_field(
+                name="Military",
+                value=(
+                    f"{int(enemy.get('soldiers') or 0):,} soldiers, {int(enemy.get('tanks') or 0):,} tanks, "
+                    f"{int(enemy.get('aircraft') or 0):,} aircraft, {int(enemy.get('ships') or 0):,} ships"
+                ),
+                inline=True
+            )
+            embed.set_footer(text="Strength ratio vs. enemy · soldiers/tanks/aircraft/ships · free offensive slots")
+            await interaction.followup.send(embed=embed)
+        except Exception as e:
+            logger.error(f"Error in counter command: {e}")
+            await interaction.followup.send("❌ Error finding counters.")
+
+    @app_commands.command(name="inrange", description="Watched enemy nations currently in a member's war range")
+    @app_commands.describe(nation_id="Member nation to check (uses your registered nation if not provided)")
+    async def in_range(self, interaction: discord.Interaction, nation_id: Optional[int] = None):
+        """List watchlist enemies in range of a member, from the last watchlist refresh."""
+        try:
+            nation_id = nation_id or CacheService().get_user_nation(str(interaction.user.id))
+            if not nation_id:
+                await interaction.response.send_message("❌ You need to register your nation first! Use /register command.", ephemeral=True)
+                return
+            if not range_watchlist_service.alliance_ids:
+                await interaction.response.send_message("❌ No enemy alliances are being watched (see `!rangewatch`).", ephemeral=True)
+                return
+            
+            targets = range_watchlist_service.get_targets(nation_id)
+            lines = [
+                f"[{target.get('leader_name', 'N/A')}](https://politicsandwar.com/nation/id={target.get('id')}) "
+                f"({(target.get('alliance') or {}).get('name', 'None')}) — {float(target.get('score') or 0):,.0f} score"
+                + (f", beige {target['beige_turns']} turns" if int(target.get('beige_turns') or 0) else "")
+                for target in targets[:20]
+            ]
+            embed = create_embed(
+                title=f"🎯 Enemies in Range of Nation {nation_id}",
+                description="\n".join(lines) or "No watched enemy nations in range.",
+                color=discord.Color.orange()
+            )
+            embed.set_footer(text=f"{len(targets)} in range · watching alliances {', '.join(map(str, range_watchlist_service.alliance_ids))}")
+            await interaction.response.send_message(embed=embed)
+        except Exception as e:
+            logger.error(f"Error in in-range command: {e}")
+            await interaction.response.send_message("❌ Error reading the range watchlist.", ephemeral=True)
 
 async def setup(bot: commands.Bot):
     """Setup the cog."""
@@ -1,82 +1,147 @@
+"""
+War declaration monitor that posts new wars involving alliance members.
+"""
+
+import asyncio
 import discord
-from discord.ext import commands, tasks
-from datetime import datetime, timezone, timedelta
-from typing import Dict, List, Optional, Set
-import os
+from discord.ext import commands
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Set, Tuple
 import json
-import time
-import asyncio
+import tempfile
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from api.politics_war_api import api
+from config.settings import config
+from services.alliance_snapshot_service import alliance_snapshot_service
+from services.war_event_feed import war_event_feed
+from services.war_history_store import war_history_store
+from services.counter_service import counter_service, format_counter_line
+from services.war_state_tracker import war_state_tracker
+from services.range_watchlist_service import range_watchlist_service
+from services.war_route_table import war_route_table, war_alliance_ids
+from utils.helpers import create_embed
+from utils.logging import get_logger
+from .alert_queue import WarAlertQueue
+
+logger = get_logger('war.monitor')
 
-from bot.utils.config import config
-from bot.utils.helpers import create_embed, format_number
-from bot.handler import info, error, warning
-from bot import data as get_data
+class WarMonitorCog(commands.Cog):
+    """Cog for detecting and monitoring war declarations.
+
+    One feed of every war in the game is fanned out to each channel in the war route table
+    following the attacker's or defender's alliance. Counters and live war tracking are for
+    our own alliance (ALLIANCE_ID) only.
+    """
 
-class WarDetectionCog(commands.Cog):
-    """Cog for detecting and monitoring war declarations."""
-    
     def __init__(self, bot: commands.Bot):
         self.bot = bot
-        self.config = config
-        
-        # Configuration
-        self.monitoring_channel_id = 1386829632036409425  # Channel to post notifications - UPDATE THIS ID
-        self.alert_role_id = 1358606073824546996  # Role to ping for defensive wars - UPDATE THIS ID
-        self.alliance_id = 13033  # Your alliance ID
-        
+        self.monitoring_channel_id = config.WAR_MONITOR_CHANNEL_ID
+        self.alliance_id = config.ALLIANCE_ID
+
         # File to persist highest war ID
-        self.highest_id_file = "data/highest_war_id.json"
+        self.highest_id_file = os.path.join(config.JSON_DIR, "highest_war_id.json")
         self.highest_war_id_seen = self.load_highest_id()
-        
-        # Start the monitoring task
-        self.war_monitor.start()
-        
-        info("War Detection Cog initialized", tag="WAR_DETECTION")
-    
-    def load_highest_id(self):
+        self.alert_queue = WarAlertQueue(bot)
+        # (channel ID, war ID) alerts already sent for wars above the high-water mark
+        self._sent_alerts: Set[Tuple[int, int]] = set()
+
+        # New wars arrive through the shared war event feed (push, or polling as a fallback).
+        # The stream is always registered so routes added later take effect without a restart.
+        war_event_feed.register('war', self.handle_wars, self.poll_wars, lambda: self.highest_war_id_seen)
+        logger.info(f"War monitor initialized ({len(war_route_table.routes)} routes, "
+                    f"{len(war_route_table.alliance_ids)} alliances)")
+
+        self.range_channel_id = config.RANGE_WATCH_CHANNEL_ID or self.monitoring_channel_id
+        if self.range_channel_id:
+            range_watchlist_service.set_notifier(self.send_range_alerts)
+
+    def load_highest_id(self) -> int:
         try:
             if os.path.exists(self.highest_id_file):
                 with open(self.highest_id_file, 'r') as f:
                     data = json.load(f)
                     return int(data.get('highest_id', 0))
         except Exception as e:
-            error(f"Error loading highest war ID: {e}", tag="WAR_DETECTION")
+            logger.error(f"Error loading highest war ID: {e}")
         return 0
 
     def save_highest_id(self):
+        """Atomically persist the highest war ID seen."""
         try:
-            os.makedirs(os.path.dirname(self.highest_id_file), exist_ok=True)
-            with open(self.highest_id_file, 'w') as f:
+            directory = os.path.dirname(self.highest_id_file) or '.'
+            os.makedirs(directory, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.highest_war_id.', suffix='.tmp')
+            with os.fdopen(fd, 'w') as f:
                 json.dump({'highest_id': self.highest_war_id_seen}, f)
+            os.replace(tmp_path, self.highest_id_file)
         except Exception as e:
-            error(f"Error saving highest war ID: {e}", tag="WAR_DETECTION")
+            logger.error(f"Error saving highest war ID: {e}")
 
-    async def get_alliance_members(self) -> List[Dict]:
-        """Get all alliance members."""
+    async def get_alliance_member_ids(self) -> Set[str]:
+        """Get alliance member nation IDs from the shared alliance snapshot."""
         try:
-            # Use separate API key for wars to distribute load
-            war_api_key = "29cc5d1b8aca3b02fe75"
-            # Add delay to prevent rate limiting
-            await asyncio.sleep(0.5)
-            members = get_data.GET_ALLIANCE_MEMBERS(self.alliance_id, war_api_key)
+            members = await alliance_snapshot_service.get_members(self.alliance_id)
             if not members:
-                error(f"Could not fetch alliance members for ID {self.alliance_id} (API returned: {members})", tag="WAR_DETECTION")
-                return []
-            # Check if the expected key is present in the first member
-            if isinstance(members, list) and members and 'id' in members[0]:
-                for m in members:
-                    if 'nation_id' not in m and 'id' in m:
-                        m['nation_id'] = m['id']
-            return members
+                logger.error(f"Could not fetch alliance members for ID {self.alliance_id}")
+                return set()
+            return {str(member.get('id')) for member in members}
         except Exception as e:
-            error(f"Error getting alliance members: {e}", tag="WAR_DETECTION")
-            return []
-    
+            logger.error(f"Error getting alliance members: {e}")
+            return set()
+
+    async def add_counter_fields(self, alerts: List[Tuple[discord.Embed, Dict]]) -> None:
+        """Add top counter candidates to defensive alerts, with one API call for all the attackers."""
+        attacker_ids = {str((war.get('attacker') or {}).get('id', war.get('att_id'))) for _, war in alerts}
+        try:
+            attackers = await api.get_nations_military(sorted(attacker_ids)) or {}
+            for embed, war in alerts:
+                attacker = attackers.get(str((war.get('attacker') or {}).get('id', war.get('att_id'))))
+                if not attacker:
+                    continue
+                candidates = await counter_service.find_counters(attacker, limit=config.WAR_ALERT_COUNTERS)
+                embed.add_field(
+                    name="Counter Candidates",
+                    value="\n".join(format_counter_line(candidate) for candidate in candidates) or "No members in range with free slots.",
+                    inline=False
+                )
+        except Exception as e:
+            logger.error(f"Error adding counter candidates to war alerts: {e}")
+
+    def format_range_change(self, change: Dict) -> discord.Embed:
+        """Format one enemy nation's range changes."""
+        enemy = change['enemy']
+        alliance = (enemy.get('alliance') or {}).get('name', 'None')
+        embed = create_embed(
+            title=f"🎯 {enemy.get('leader_name', 'Nation ' + str(enemy.get('id')))} ({alliance})",
+            description=f"[{enemy.get('nation_name', 'N/A')}](https://politicsandwar.com/nation/id={enemy.get('id')}) "
+                        f"• {float(enemy.get('score') or 0):,.0f} score • {len(enemy.get('cities') or [])} cities",
+            color=discord.Color.green() if change['entered'] else discord.Color.dark_grey()
+        )
+        for name, members in (("Now in range of", change['entered']), ("Out of range of", change['left'])):
+            if not members:
+                continue
+            shown = members[:config.RANGE_WATCH_MAX_MEMBERS]
+            value = ", ".join(f"{member.get('leader_name', member.get('id'))} ({float(member.get('score') or 0):,.0f})"
+                              for member in shown)
+            if len(members) > len(shown):
+                value += f" +{len(members) - len(shown)} more"
+            embed.add_field(name=f"{name} {len(members)} member{'s' if len(members) != 1 else ''}", value=value, inline=False)
+        return embed
+
+    async def send_range_alerts(self, changes: List[Dict]) -> None:
+        """Post enemy nations that moved into or out of members' range."""
+        await self.alert_queue.send(self.range_channel_id, [(self.format_range_change(change), None) for change in changes])
+
     def format_war_notification(self, war: Dict, is_defensive: bool = False) -> discord.Embed:
         """Format war notification embed."""
-        attacker = war.get('attacker', {})
-        defender = war.get('defender', {})
-        
+        # Pushed wars only carry nation IDs, polled wars also include the nations
+        attacker = war.get('attacker') or {'id': war.get('att_id'), 'leader_name': f"Nation {war.get('att_id')}"}
+        defender = war.get('defender') or {'id': war.get('def_id'), 'leader_name': f"Nation {war.get('def_id')}"}
+
         # Determine if this is a defensive war (our member is being attacked)
         if is_defensive:
             color = discord.Color.red()
@@ -86,13 +151,13 @@ class WarDetectionCog(commands.Cog):
             color = discord.Color.orange()
             title = "⚔️ **OFFENSIVE WAR DECLARATION**"
             description = f"**{attacker.get('leader_name', 'N/A')}** has declared war!"
-        
+
         embed = create_embed(
             title=title,
             description=description,
             color=color
         )
-        
+
         # Add basic war info
         embed.add_field(
             name="War Information",
@@ -103,103 +168,125 @@ class WarDetectionCog(commands.Cog):
             ),
             inline=False
         )
-        
+
         # Add nation links
         embed.add_field(
             name="Attacker",
             value=f"[{attacker.get('leader_name', 'N/A')}](https://politicsandwar.com/nation/id={attacker.get('id', '')})",
             inline=True
         )
-        
+
         embed.add_field(
-            name="Defender", 
+            name="Defender",
             value=f"[{defender.get('leader_name', 'N/A')}](https://politicsandwar.com/nation/id={defender.get('id', '')})",
             inline=True
         )
-        
+
         # Add timestamp
-        embed.set_footer(text=f"Declared at {datetime.now().strftime('%Y-%m-%d %H:%M:%S')} UTC")
-        
+        embed.set_footer(text=f"Declared at {datetime.now(timezone.utc).strftime('%Y-%m-%d %H:%M:%S')} UTC")
+
         return embed
-    
-    @tasks.loop(seconds=30)  # Reduced from 2.5 to 30 seconds to avoid rate limits
-    async def war_monitor(self):
-        """Monitor for new war declarations using min_id and orderBy ASC."""
-        try:
-            # Add delay to avoid rate limiting
-            await asyncio.sleep(1)
-            
-            params = {
-                "min_id": self.highest_war_id_seen,
-                "orderBy": [{"column": "ID", "order": "ASC"}],
-                "first": 50  # Reduced from 100 to 50 to reduce API load
-            }
-            # Use separate API key for wars to distribute load
-            war_api_key = "29cc5d1b8aca3b02fe75"
-            # Add delay to prevent rate limiting
-            await asyncio.sleep(1)
-            wars = get_data.GET_WARS(params, war_api_key)
-            if not wars:
-                return
-            alliance_members = await self.get_alliance_members()
-            alliance_member_ids = {str(member.get('nation_id')) for member in alliance_members}
-            channel = self.bot.get_channel(self.monitoring_channel_id)
-            if not channel:
-                error(f"Could not find monitoring channel {self.monitoring_channel_id}", tag="WAR_DETECTION")
-                return
-            for war in wars:
-                war_id = war.get('id')
-                if not war_id:
-                    continue
-                try:
-                    war_id_int = int(war_id)
-                except (ValueError, TypeError):
-                    error(f"Invalid war ID format: {war_id}", tag="WAR_DETECTION")
-                    continue
-                if war_id_int <= self.highest_war_id_seen:
-                    continue
-                attacker_id = str(war.get('attacker', {}).get('id'))
-                defender_id = str(war.get('defender', {}).get('id'))
-                if attacker_id in alliance_member_ids or defender_id in alliance_member_ids:
-                    is_defensive = defender_id in alliance_member_ids
-                    embed = self.format_war_notification(war, is_defensive=is_defensive)
-                    if is_defensive:
-                        await channel.send(f"<@&{self.alert_role_id}>", embed=embed)
-                        info(f"Posted defensive war declaration for war {war_id_int}", tag="WAR_DETECTION")
-                    else:
-                        await channel.send(embed=embed)
-                        info(f"Posted offensive war declaration for war {war_id_int}", tag="WAR_DETECTION")
-                if war_id_int > self.highest_war_id_seen:
-                    self.highest_war_id_seen = war_id_int
-                    self.save_highest_id()
-        except Exception as e:
-            error(f"Error in war monitor: {e}", tag="WAR_DETECTION")
-            # If we get rate limited, wait longer before next attempt
-            if "429" in str(e) or "Too Many Requests" in str(e):
-                warning("Rate limited in war monitor, waiting 60 seconds", tag="WAR_DETECTION")
-                await asyncio.sleep(60)
-    
-    @war_monitor.before_loop
-    async def before_war_monitor(self):
-        """Wait until bot is ready before starting the monitor."""
-        await self.bot.wait_until_ready()
-        info("War declaration monitor task started", tag="WAR_DETECTION")
-    
+
+    async def poll_wars(self, min_id: int) -> Optional[List[Dict]]:
+        """Fetch wars from `min_id` onwards, oldest first, or None on failure (the feed's polling fallback)."""
+        # With nothing persisted, start from the newest war instead of replaying every war in the game
+        if not self.highest_war_id_seen:
+            latest_id = await api.get_latest_war_id()
+            if latest_id:
+                self.highest_war_id_seen = latest_id
+                self.save_highest_id()
+                logger.info(f"War monitor starting from war ID {latest_id}")
+            return []
+
+        return await api.get_wars_since(min_id, config.WAR_MONITOR_PAGE_SIZE)
+
+    async def handle_wars(self, wars: List[Dict]):
+        """Fan new wars out to every routed channel and advance the high-water mark once per batch.
+
+        The mark never moves past a war whose alert failed to send. The feed then polls from the
+        mark again before delivering anything newer, even in push mode; channels that already got
+        a replayed war's alert are skipped.
+        """
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, war_history_store.record_wars, wars)
+
+        alerts: Dict[int, List[Tuple[discord.Embed, str]]] = {}  # channel ID -> (embed, mention)
+        embed_war_ids: Dict[int, int] = {}  # id(embed) -> war ID
+        defensive_alerts = []
+        member_war_ids = []
+        highest_id = self.highest_war_id_seen
+        for war in wars:
+            war_id = int(war['id'])
+            if war_id <= highest_id:
+                continue
+            highest_id = war_id
+
+            att_alliance_id, def_alliance_id = war_alliance_ids(war)
+            if self.alliance_id in (att_alliance_id, def_alliance_id):
+                member_war_ids.append(war_id)
+
+            matches = [(route, is_defensive) for route, is_defensive in war_route_table.match(war)
+                       if (route['channel_id'], war_id) not in self._sent_alerts]
+            if not matches:
+                continue
+            # Channels alerted the same way share one embed
+            embeds = {}
+            for route, is_defensive in matches:
+                if is_defensive not in embeds:
+                    embeds[is_defensive] = self.format_war_notification(war, is_defensive=is_defensive)
+                    embed_war_ids[id(embeds[is_defensive])] = war_id
+                mention = f"<@&{route['role_id']}>" if is_defensive and route['role_id'] else None
+                alerts.setdefault(route['channel_id'], []).append((embeds[is_defensive], mention))
+
+            if def_alliance_id == self.alliance_id and True in embeds:
+                defensive_alerts.append((embeds[True], war))
+
+        if defensive_alerts and config.WAR_ALERT_COUNTERS:
+            await self.add_counter_fields(defensive_alerts)
+
+        # Wars from one poll go out together per channel, then the batch is checkpointed once
+        sent, unsent = set(), set()
+        if alerts:
+            results = await asyncio.gather(*(self.alert_queue.send(channel_id, channel_alerts)
+                                             for channel_id, channel_alerts in alerts.items()))
+            for (channel_id, channel_alerts), failed in zip(alerts.items(), results):
+                failed_ids = {id(embed) for embed, _ in failed}
+                for embed, _ in channel_alerts:
+                    (unsent if id(embed) in failed_ids else sent).add((channel_id, embed_war_ids[id(embed)]))
+            logger.info(f"Posted {len(sent)} war alerts to {len(alerts)} channels up to war {highest_id}")
+
+        if unsent:
+            highest_id = min(war_id for _, war_id in unsent) - 1
+            logger.warning(f"{len(unsent)} war alerts failed to send, retrying from war {highest_id + 1}")
+        self._sent_alerts = {(channel_id, war_id) for channel_id, war_id in self._sent_alerts | sent
+                             if war_id > highest_id}
+
+        if highest_id > self.highest_war_id_seen:
+            self.highest_war_id_seen = highest_id
+            self.save_highest_id()
+
+        # Start live tracking right away instead of waiting for the first attack or re-sync
+        if member_war_ids:
+            await war_state_tracker.track_wars(member_war_ids)
+
     @commands.command(name="warstatus")
     @commands.has_permissions(administrator=True)
     async def war_status(self, ctx):
         """Show the status of war detection system."""
         try:
-            alliance_members = await self.get_alliance_members()
-            channel = self.bot.get_channel(self.monitoring_channel_id)
+            alliance_member_ids = await self.get_alliance_member_ids()
+            feed = war_event_feed.get_stats()
+            mode = "Push (real-time)" if feed['mode'] == 'push' else f"Polling every {feed['poll_interval']}s"
+            tracker = war_state_tracker.get_stats()
             status_info = [
                 f"**War Declaration Detection Status**",
-                f"✅ **Monitoring:** {'Active' if self.war_monitor.is_running() else 'Inactive'}",
+                f"✅ **Monitoring:** {'Active' if war_route_table.routes else 'Inactive (no routes)'}",
                 f"📊 **Highest War ID Seen:** {self.highest_war_id_seen}",
-                f"👥 **Alliance Members:** {len(alliance_members)}",
-                f"📢 **Alert Channel:** {channel.mention if channel else 'Not Found'}",
-                f"🔔 **Alert Role:** <@&{self.alert_role_id}>",
-                f"🔄 **Check Interval:** Every 2.5 seconds"
+                f"👥 **Alliance Members:** {len(alliance_member_ids)}",
+                f"📢 **Routes:** {len(war_route_table.routes)} ({len(war_route_table.alliance_ids)} alliances, "
+                f"{len(war_route_table.get_guild_routes(ctx.guild.id)) if ctx.guild else 0} in this server)",
+                f"🔄 **Feed:** {mode}",
+                f"⚔️ **Tracked Wars:** {tracker['wars']} (attack ID {tracker['highest_attack_id']})"
             ]
             embed = create_embed(
                 title="War Declaration Detection System Status",
@@ -208,28 +295,84 @@ class WarDetectionCog(commands.Cog):
             )
             await ctx.send(embed=embed)
         except Exception as e:
-            error(f"Error in war status command: {e}", tag="WAR_DETECTION")
+            logger.error(f"Error in war status command: {e}")
             await ctx.send("Error getting war detection status.")
-    
+
     @commands.command(name="clearwars")
     @commands.has_permissions(administrator=True)
     async def clear_known_wars(self, ctx):
-        """Reset the war ID tracking to detect all current wars as new."""
+        """Reset the war ID tracking so the monitor restarts from the newest war."""
         try:
             old_id = self.highest_war_id_seen
             self.highest_war_id_seen = 0
             self.save_highest_id()
             embed = create_embed(
                 title="War ID Tracking Reset",
-                description=f"Reset highest war ID from {old_id} to 0. Will detect all current wars as new on next check.",
+                description=f"Reset highest war ID from {old_id}. Tracking restarts from the newest war on the next check.",
                 color=discord.Color.blue()
             )
             await ctx.send(embed=embed)
-            info(f"War ID tracking reset by {ctx.author}", tag="WAR_DETECTION")
+            logger.info(f"War ID tracking reset by {ctx.author}")
         except Exception as e:
-            error(f"Error resetting war tracking: {e}", tag="WAR_DETECTION")
+            logger.error(f"Error resetting war tracking: {e}")
             await ctx.send("Error resetting war tracking.")
 
+    @commands.command(name="rangewatch")
+    @commands.has_permissions(administrator=True)
+    async def range_watch(self, ctx, alliance_id: int = None):
+        """Toggle watching an enemy alliance for nations moving into members' range, or list watched alliances."""
+        try:
+            if alliance_id is None:
+                stats = range_watchlist_service.get_stats()
+                watched = ", ".join(str(aid) for aid in stats['alliances']) or "None"
+                description = (
+                    f"**Watched Alliances:** {watched}\n"
+                    f"**Enemy Nations:** {stats['enemies']} • **Members:** {stats['members']}\n"
+                    f"**Pairs In Range:** {stats['pairs']}\n"
+                    f"**Last Refresh:** {stats['last_refresh_ms']}ms"
+                )
+                title = "War-Range Watchlist"
+            elif range_watchlist_service.remove_alliance(alliance_id):
+                title, description = "War-Range Watchlist Updated", f"Stopped watching alliance {alliance_id}."
+            elif range_watchlist_service.add_alliance(alliance_id):
+                title = "War-Range Watchlist Updated"
+                description = (f"Watching alliance {alliance_id}. Nations moving into or out of members' range "
+                               f"will be posted in <#{self.range_channel_id}>.")
+            else:
+                title, description = "War-Range Watchlist", "That's our own alliance."
+            await ctx.send(embed=create_embed(title=title, description=description, color=discord.Color.blue()))
+        except Exception as e:
+            logger.error(f"Error in range watch command: {e}")
+            await ctx.send("Error updating the range watchlist.")
+
+    @commands.command(name="warroute")
+    @commands.has_permissions(administrator=True)
+    async def war_route(self, ctx, action: str = "list", alliance_id: int = None,
+                        channel: discord.TextChannel = None, role: discord.Role = None):
+        """Route an alliance's war alerts to a channel: !warroute add|remove <alliance_id> [#channel] [@role]."""
+        try:
+            action = action.lower()
+            if action == "add" and alliance_id:
+                channel = channel or ctx.channel
+                is_new = war_route_table.add(alliance_id, ctx.guild.id, channel.id, role.id if role else 0)
+                description = (f"{'Added' if is_new else 'Updated'} route: alliance {alliance_id} → {channel.mention}"
+                               + (f", pinging {role.mention} on defensive wars" if role else ""))
+            elif action == "remove" and alliance_id:
+                removed = war_route_table.remove(alliance_id, ctx.guild.id, channel.id if channel else None)
+                description = f"Removed {removed} route{'s' if removed != 1 else ''} for alliance {alliance_id}."
+            else:
+                routes = war_route_table.get_guild_routes(ctx.guild.id) if ctx.guild else []
+                description = "\n".join(
+                    f"Alliance {route['alliance_id']} → <#{route['channel_id']}>"
+                    + (f" (<@&{route['role_id']}>)" if route['role_id'] else "")
+                    for route in routes
+                ) or "No war routes in this server."
+            embed = create_embed(title="War Alert Routes", description=description, color=discord.Color.blue())
+            await ctx.send(embed=embed)
+        except Exception as e:
+            logger.error(f"Error in war route command: {e}")
+            await ctx.send("Error updating war routes.")
+
 async def setup(bot: commands.Bot):
-    """Set up the war detection cog."""
-    await bot.add_cog(WarDetectionCog(bot)) 
\ No newline at end of file
+    """Set up the war monitor cog."""
+    await bot.add_cog(WarMonitorCog(bot))
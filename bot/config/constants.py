@@ -68,6 +68,7 @@ class GameConstants:
     # Raid Configuration
     MIN_LOOT_POTENTIAL = 100000  # $100k minimum
     MAX_DEFENSIVE_WARS = 3
+    MAX_OFFENSIVE_WARS = 5  # +1 each for Pirate Economy and Advanced Pirate Economy
     TOP_ALLIANCE_RANK = 60
     
     # Audit Thresholds
@@ -59,6 +59,7 @@ class Config:
         self.CACHE_UPDATE_INTERVAL = 300  # 5 minutes
         self.CACHE_DIR = "data/cache"
         self.JSON_DIR = "data"
+        self.WAR_HISTORY_DB = "data/war_history.db"
         
         # Rate Limiting Configuration
         self.API_RATE_LIMIT = 1000  # calls per hour per key
@@ -105,6 +106,59 @@ class Config:
         self.MIN_LOOT_POTENTIAL = 100000  # $100k minimum
         self.MAX_DEFENSIVE_WARS = 3
         self.TOP_ALLIANCE_RANK = 60
+        self.RAID_TOP_K = int(os.getenv('RAID_TOP_K', '60'))  # Keep only the best N targets (0 = keep all)
+        self.RAID_PARALLEL_SCORING_THRESHOLD = 1000  # Score batches this large in a process pool
+        
+        # Beige exit alerts
+        self.BEIGE_ALERT_CHANNEL_ID = int(os.getenv('BEIGE_ALERT_CHANNEL_ID', '0'))  # 0 = DM subscribers instead
+        self.BEIGE_ALERT_DELAY = 30  # Seconds after a turn change before checking who left beige
+        self.BEIGE_ALERT_MAX_TARGETS = 10  # Targets listed per alert
+        self.BEIGE_TURNS_PER_DEFEAT = 24  # Beige a defeated nation gets, added to any beige it already has
+        
+        # Alliance snapshot settings
+        self.ALLIANCE_SNAPSHOT_TTL = 120  # 2 minutes
+        self.ALLIANCE_SNAPSHOT_REFRESH_INTERVAL = 90  # background refresh, keeps the snapshot warm
+        
+        # War monitor settings
+        self.WAR_MONITOR_CHANNEL_ID = int(os.getenv('WAR_MONITOR_CHANNEL_ID', '1386829632036409425'))  # 0 = monitor disabled
+        self.WAR_ALERT_ROLE_ID = int(os.getenv('WAR_ALERT_ROLE_ID', '1358606073824546996'))  # Pinged on defensive wars
+        self.WAR_MONITOR_INTERVAL = 30  # Seconds between war polls when push is unavailable
+        self.WAR_MONITOR_MIN_INTERVAL = 5  # Polling interval around turn changes and right after new wars
+        self.WAR_MONITOR_MAX_INTERVAL = 300  # Quiet periods back off polling up to this
+        self.WAR_POLL_DAILY_BUDGET = int(os.getenv('WAR_POLL_DAILY_BUDGET', '2880'))  # API calls/day (a fixed 30s poll)
+        self.WAR_POLL_TURN_WINDOW = 120  # Seconds either side of a turn change polled at the min interval
+        self.WAR_POLL_BURST_WINDOW = 300  # Seconds after new wars polled at the min interval
+        self.WAR_MONITOR_PAGE_SIZE = 100  # Wars fetched per poll
+        self.WAR_ALERT_COUNTERS = 3  # Counter candidates listed on defensive alerts (0 = none)
+        
+        # War event feed (push subscriptions, with polling as the fallback)
+        self.WAR_FEED_PUSH_ENABLED = os.getenv('WAR_FEED_PUSH_ENABLED', 'true').lower() == 'true'
+        self.WAR_FEED_SOCKET_URL = os.getenv('WAR_FEED_SOCKET_URL', 'wss://socket.politicsandwar.com/app/a22734a47847a64386c8?protocol=7&client=raiden_shogun&version=1.0')
+        self.WAR_FEED_SUBSCRIBE_URL = os.getenv('WAR_FEED_SUBSCRIBE_URL', 'https://api.politicsandwar.com/subscriptions/v1/subscribe')
+        self.WAR_FEED_AUTH_URL = os.getenv('WAR_FEED_AUTH_URL', 'https://api.politicsandwar.com/subscriptions/v1/auth')
+        self.WAR_FEED_ACTIVITY_TIMEOUT = 120  # Reconnect if the socket is silent this long
+        self.WAR_FEED_RETRY_MAX = 600  # Max seconds of polling before retrying push
+        
+        # War state tracker settings
+        self.WAR_STATE_RECONCILE_INTERVAL = 1800  # Re-sync tracked wars with the API (catches drift and new wars)
+        self.WAR_ATTACK_PAGE_SIZE = 500  # War attacks fetched per poll
+        
+        # War-range watchlist settings
+        self.RANGE_WATCH_CHANNEL_ID = int(os.getenv('RANGE_WATCH_CHANNEL_ID', '0'))  # 0 = war monitor channel
+        self.RANGE_WATCH_INTERVAL = 300  # Seconds between watchlist refreshes (enemy snapshots are TTL cached)
+        self.RANGE_WATCH_MAX_MEMBERS = 8  # Members named per enemy in range alerts
+        
+        # Activity tracker settings
+        self.ACTIVITY_SAMPLE_INTERVAL = int(os.getenv('ACTIVITY_SAMPLE_INTERVAL', '900'))  # 15 minutes
+        self.ACTIVITY_HISTORY_DAYS = 14  # Days of login history kept per nation
+        
+        # Scheduled audit settings
+        self.SCHEDULED_AUDIT_TYPES = [t.strip() for t in os.getenv('SCHEDULED_AUDIT_TYPES', 'activity,warchest,spies,projects,bloc,military,mmr,deposit').split(',') if t.strip()]
+        self.AUDIT_SCHEDULE_INTERVAL = int(os.getenv('AUDIT_SCHEDULE_INTERVAL', '3600'))  # 1 hour
+        self.AUDIT_RESULT_MAX_AGE = 3 * 3600  # Older stored results are re-run instead of shown
+        self.AUDIT_NOTIFY_CHANNEL_ID = int(os.getenv('AUDIT_NOTIFY_CHANNEL_ID', '0'))  # 0 = don't post changes
+        self.AUDIT_ALLIANCE_CONCURRENCY = 3  # Alliances fetched at once by multi-alliance audits
+        self.AUDIT_MAX_ALLIANCES = 10  # Cap on alliances per multi-alliance audit
         
         # Validation
         self._validate_config()
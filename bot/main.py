@@ -17,6 +17,13 @@ from utils.logging import setup_logging, get_logger
 from services.cache_service import CacheService
 from tasks.raid_cache_task import update_raid_cache_task, startup_cache_update
 from tasks.latency_monitor import latency_monitor_task
+from tasks.audit_task import scheduled_audit_task
+from services.alliance_snapshot_service import alliance_snapshot_service
+from services.activity_tracker import activity_tracker
+from services.war_event_feed import war_event_feed
+from services.war_state_tracker import war_state_tracker
+from services.beige_timer_service import beige_timer_service
+from services.range_watchlist_service import range_watchlist_service
 
 # Setup logging
 logger = setup_logging()
@@ -57,6 +64,14 @@ async def on_ready():
     # Start background tasks
     bot.loop.create_task(update_cache_task())
     bot.loop.create_task(update_raid_cache_task())
+    bot.loop.create_task(alliance_snapshot_service.refresh_task())
+    bot.loop.create_task(activity_tracker.sample_task())
+    war_state_tracker.register(war_event_feed)
+    bot.loop.create_task(war_state_tracker.sync_task())
+    bot.loop.create_task(war_event_feed.run())
+    bot.loop.create_task(beige_timer_service.run())
+    bot.loop.create_task(range_watchlist_service.run())
+    bot.loop.create_task(scheduled_audit_task(bot))
     
     # Run startup cache update
     bot.loop.create_task(startup_cache_update())
@@ -172,6 +187,7 @@ async def load_cogs():
         'cogs.audit.military',
         'cogs.alliance.management',
         'cogs.war.detection',
+        'cogs.war.war_detection',
         'cogs.war.analysis',
         'cogs.utility.help',
         'cogs.utility.feedback',
@@ -6,8 +6,9 @@ from .nation import Nation, City
 from .alliance import Alliance
 from .war import War
 from .user import User
+from .project import ProjectBitset
 
-__all__ = ['Nation', 'City', 'Alliance', 'War', 'User']
+__all__ = ['Nation', 'City', 'Alliance', 'War', 'User', 'ProjectBitset']
 
 
 
@@ -3,9 +3,12 @@ Nation and City data models.
 """
 
 from dataclasses import dataclass
+from functools import cached_property
 from typing import List, Optional, Dict, Any
 from datetime import datetime
 
+from .project import ProjectBitset
+
 @dataclass
 class City:
     """City data model."""
@@ -229,6 +232,11 @@ class Nation:
             print(f"Traceback: {traceback.format_exc()}")
             raise
     
+    @cached_property
+    def project_bitset(self) -> ProjectBitset:
+        """Owned projects, decoded from project_bits once per nation."""
+        return ProjectBitset.from_nation(self)
+    
     def get_military_capacity(self) -> Dict[str, int]:
         """Calculate military capacity from city buildings."""
         capacity = {"soldiers": 0, "tanks": 0, "aircraft": 0, "ships": 0}
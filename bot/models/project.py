@@ -0,0 +1,111 @@
+"""
+Project ownership decoded from a nation's project_bits.
+"""
+
+from typing import Any, Dict, Iterable, List
+
+# Project bits are read right-to-left in API_REFERENCES order
+PROJECT_ORDER = (
+    'iron_works', 'bauxite_works', 'arms_stockpile', 'emergency_gasoline_reserve', 'mass_irrigation',
+    'international_trade_center', 'missile_launch_pad', 'nuclear_research_facility', 'iron_dome',
+    'vital_defense_system', 'central_intelligence_agency', 'center_for_civil_engineering',
+    'propaganda_bureau', 'uranium_enrichment_program', 'urban_planning', 'advanced_urban_planning',
+    'space_program', 'spy_satellite', 'moon_landing', 'pirate_economy', 'recycling_initiative',
+    'telecommunications_satellite', 'green_technologies', 'arable_land_agency', 'clinical_research_center',
+    'specialized_police_training_program', 'advanced_engineering_corps', 'government_support_agency',
+    'research_and_development_center', 'activity_center', 'metropolitan_planning', 'military_salvage',
+    'fallout_shelter', 'bureau_of_domestic_affairs', 'advanced_pirate_economy', 'mars_landing',
+    'surveillance_network', 'guiding_satellite', 'nuclear_launch_facility'
+)
+
+PROJECT_INDEX = {name: index for index, name in enumerate(PROJECT_ORDER)}
+
+ALL_PROJECTS_MASK = (1 << len(PROJECT_ORDER)) - 1
+
+def project_mask(names: Iterable[str]) -> int:
+    """Bit mask for a set of project names. Unknown names are ignored."""
+    mask = 0
+    for name in names:
+        index = PROJECT_INDEX.get(name)
+        if index is not None:
+            mask |= 1 << index
+    return mask
+
+class ProjectBitset:
+    """A nation's owned projects as an integer bitset, so lookups and counts are single bit operations."""
+
+    __slots__ = ('bits',)
+
+    def __init__(self, bits: int = 0):
+        self.bits = bits & ALL_PROJECTS_MASK
+
+    @classmethod
+    def from_bits(cls, project_bits: Any) -> 'ProjectBitset':
+        """Decode the API's project_bits (int or numeric string, possibly empty)."""
+        try:
+            return cls(int(project_bits) if project_bits else 0)
+        except (TypeError, ValueError):
+            return cls(0)
+
+    @classmethod
+    def from_nation(cls, nation: Any) -> 'ProjectBitset':
+        """Decode a nation dict or Nation model, also trusting any boolean project fields it carries."""
+        if isinstance(nation, dict):
+            get = nation.get
+        else:
+            get = lambda name, default=None: getattr(nation, name, default)
+
+        bitset = cls.from_bits(get('project_bits', 0))
+        for name, index in PROJECT_INDEX.items():
+            if get(name, False):
+                bitset.bits |= 1 << index
+        return bitset
+
+    def has(self, name: str) -> bool:
+        """Whether the project is owned."""
+        index = PROJECT_INDEX.get(name)
+        return index is not None and bool(self.bits >> index & 1)
+
+    def has_all(self, mask: int) -> bool:
+        """Whether every project in the mask is owned."""
+        return self.bits & mask == mask
+
+    def count(self) -> int:
+        """Number of owned projects."""
+        return bin(self.bits).count('1')
+
+    def names(self) -> List[str]:
+        """Owned project names in bit order."""
+        return [name for index, name in enumerate(PROJECT_ORDER) if self.bits >> index & 1]
+
+    def missing(self, names: Iterable[str]) -> List[str]:
+        """The given projects that are not owned, keeping their order."""
+        return [name for name in names if not self.has(name)]
+
+    def __contains__(self, name: str) -> bool:
+        return self.has(name)
+
+    def __eq__(self, other: Any) -> bool:
+        return hasattr(other, 'bits') and self.bits == other.bits
+
+    def __hash__(self) -> int:
+        return hash(self.bits)
+
+    def __repr__(self) -> str:
+        return f"ProjectBitset({self.names()})"
+
+def get_project_bitset(nation: Any) -> ProjectBitset:
+    """The nation's cached bitset if it is a Nation model, otherwise a fresh decode."""
+    # Duck-typed: this module is imported both as models.project and bot.models.project,
+    # which gives two distinct ProjectBitset classes
+    bitset = getattr(nation, 'project_bitset', None)
+    return bitset if hasattr(bitset, 'bits') else ProjectBitset.from_nation(nation)
+
+def decode_project_bitsets(nations_data: Dict[str, Dict]) -> Dict[str, ProjectBitset]:
+    """Decode every nation in a batch once, keyed like the batch."""
+    return {nation_id: ProjectBitset.from_nation(nation_data) for nation_id, nation_data in nations_data.items()}
+
+def nations_missing(bitsets: Dict[str, ProjectBitset], names: Iterable[str]) -> List[str]:
+    """IDs of the nations missing any of the given projects, as one mask test per nation."""
+    mask = project_mask(names)
+    return [nation_id for nation_id, bitset in bitsets.items() if bitset.bits & mask != mask]
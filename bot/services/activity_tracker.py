@@ -0,0 +1,161 @@
+"""
+Lightweight alliance activity tracker.
+
+Samples only the member fields the activity audit needs and keeps a compact
+per-nation history of the UTC days each nation was seen active.
+"""
+
+import asyncio
+import json
+import os
+import tempfile
+import time
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from api.politics_war_api import api
+from config.settings import config
+
+logger = logging.getLogger('raiden_shogun')
+
+def parse_last_active(last_active: str) -> Optional[float]:
+    """Unix timestamp for the API's last_active string, or None if it can't be parsed."""
+    try:
+        return datetime.fromisoformat(last_active.replace("Z", "+00:00")).timestamp()
+    except (AttributeError, ValueError):
+        return None
+
+def utc_day(timestamp: float) -> str:
+    """UTC calendar day (YYYY-MM-DD) of a unix timestamp."""
+    return datetime.fromtimestamp(timestamp, tz=timezone.utc).strftime('%Y-%m-%d')
+
+class ActivityTracker:
+    """Activity history for one alliance, stored in data/activity_history.json.
+
+    Each nation keeps {'first_seen': day, 'last_active': unix, 'days': [active days]}, trimmed to
+    ACTIVITY_HISTORY_DAYS. The latest sampled member rows are kept too, so the activity audit can
+    be answered without fetching the alliance's full member data.
+    """
+
+    def __init__(self, path: str = None, alliance_id: int = None):
+        self.path = path or os.path.join(config.JSON_DIR, "activity_history.json")
+        self.alliance_id = alliance_id or config.ALLIANCE_ID
+        self._lock = asyncio.Lock()
+        data = self._load()
+        self._sampled_at = data.get('sampled_at', 0.0)
+        self._members = data.get('members', [])
+        self._nations = data.get('nations', {})
+
+    def _load(self) -> Dict:
+        try:
+            if os.path.exists(self.path):
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                if data.get('alliance_id') == self.alliance_id:
+                    return data
+        except Exception as e:
+            logger.error(f"Error loading activity history: {e}")
+        return {}
+
+    def _save(self) -> None:
+        """Atomically write the history to disk."""
+        try:
+            directory = os.path.dirname(self.path) or '.'
+            os.makedirs(directory, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.activity_history.', suffix='.tmp')
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump({
+                    'alliance_id': self.alliance_id,
+                    'sampled_at': self._sampled_at,
+                    'members': self._members,
+                    'nations': self._nations
+                }, f, separators=(',', ':'))
+            os.replace(tmp_path, self.path)
+        except Exception as e:
+            logger.error(f"Error saving activity history: {e}")
+
+    def record(self, members: List[Dict], sampled_at: float = None) -> None:
+        """Fold one sample of member rows into the history."""
+        sampled_at = sampled_at or time.time()
+        today = utc_day(sampled_at)
+        cutoff = utc_day(sampled_at - config.ACTIVITY_HISTORY_DAYS * 86400)
+
+        nations = {}
+        for member in members:
+            nation_id = str(member.get('id'))
+            history = self._nations.get(nation_id) or {'first_seen': today, 'last_active': None, 'days': []}
+            last_active = parse_last_active(member.get('last_active'))
+            if last_active is not None:
+                history['last_active'] = last_active
+                day = utc_day(last_active)
+                if day >= history['first_seen'] and day not in history['days']:
+                    history['days'].append(day)
+                    history['days'].sort()
+            history['days'] = [day for day in history['days'] if day > cutoff]
+            nations[nation_id] = history
+
+        # Nations that left the alliance are dropped
+        self._nations = nations
+        self._members = members
+        self._sampled_at = sampled_at
+
+    async def sample(self) -> bool:
+        """Fetch id/last_active for the alliance and record it."""
+        async with self._lock:
+            members = await api.get_alliance_activity(self.alliance_id)
+            if not members:
+                return False
+            self.record(members)
+            self._save()
+            logger.info(f"Activity sample recorded for {len(members)} nations")
+            return True
+
+    def get_age(self) -> Optional[float]:
+        """Seconds since the last sample, or None if there is none."""
+        return time.time() - self._sampled_at if self._sampled_at else None
+
+    def is_fresh(self) -> bool:
+        """Whether the last sample is recent enough to answer an audit."""
+        age = self.get_age()
+        return age is not None and age < config.ACTIVITY_SAMPLE_INTERVAL * 2
+
+    async def get_members(self, max_age: float = None) -> Optional[List[Dict]]:
+        """Latest sampled member rows, re-sampling first if they are older than `max_age` (default: two intervals)."""
+        max_age = max_age if max_age is not None else config.ACTIVITY_SAMPLE_INTERVAL * 2
+        age = self.get_age()
+        if age is None or age > max_age:
+            await self.sample()
+        return list(self._members) if self._members else None
+
+    def get_last_active(self, nation_id) -> Optional[float]:
+        """Last known login of a nation as a unix timestamp."""
+        history = self._nations.get(str(nation_id))
+        return history['last_active'] if history else None
+
+    def get_inactive_days(self, nation_id, days: int = 7, now: float = None) -> Optional[int]:
+        """How many of the last `days` full UTC days the nation didn't log in.
+
+        Only days since the nation was first tracked are counted, None if it isn't tracked.
+        """
+        history = self._nations.get(str(nation_id))
+        if not history:
+            return None
+        today = datetime.fromtimestamp(now or time.time(), tz=timezone.utc).date()
+        active = set(history['days'])
+        window = [(today - timedelta(days=offset)).isoformat() for offset in range(1, days + 1)]
+        return sum(1 for day in window if day >= history['first_seen'] and day not in active)
+
+    async def sample_task(self) -> None:
+        """Background task sampling activity every ACTIVITY_SAMPLE_INTERVAL seconds."""
+        while True:
+            try:
+                await self.sample()
+            except Exception as e:
+                logger.error(f"Error in activity sample task: {e}")
+            await asyncio.sleep(config.ACTIVITY_SAMPLE_INTERVAL)
+
+# Global activity tracker instance
+activity_tracker = ActivityTracker()
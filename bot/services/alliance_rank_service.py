@@ -0,0 +1,119 @@
+"""
+Locally maintained alliance rank table for the raid alliance filter.
+"""
+
+import time
+import logging
+from typing import Dict, Optional, Any
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.raid_search_cache import raid_search_cache
+
+logger = logging.getLogger('raiden_shogun')
+
+# Nations CSV encodes alliance_position as a number
+CSV_POSITIONS = {
+    '0': 'NOALLIANCE',
+    '1': 'APPLICANT',
+    '2': 'MEMBER',
+    '3': 'OFFICER',
+    '4': 'HEIR',
+    '5': 'LEADER'
+}
+
+MEMBER_POSITIONS = {'MEMBER', 'OFFICER', 'HEIR', 'LEADER'}
+
+def parse_csv_position(value: Any) -> Optional[str]:
+    """Normalize a CSV alliance_position value, or None if it is missing or unknown."""
+    value = str(value if value is not None else '').strip()
+    if value in CSV_POSITIONS:
+        return CSV_POSITIONS[value]
+    value = value.upper()
+    if value == 'APPLICANT' or value in MEMBER_POSITIONS:
+        return value
+    return None
+
+class AllianceRankTable:
+    """Alliance ranks computed from the alliances CSV, corrected by a periodic GraphQL refresh."""
+
+    def __init__(self, top_rank: int = 65, refresh_interval: int = 21600):
+        self.top_rank = top_rank
+        self.refresh_interval = refresh_interval  # 6 hours between API refreshes
+
+        self._ranks = {}  # alliance_id -> rank (CSV ranks overlaid with API ranks)
+        self._api_ranks = {}  # alliance_id -> official rank from the last API refresh
+        self._csv_generation = None
+        self._refreshed_at = 0
+        self._top_ids = frozenset()
+
+    def build_from_csv(self, alliances_data: Dict[str, Dict[str, Any]], generation: Any = None) -> None:
+        """Rank alliances by score from the alliances CSV (the CSV itself has no rank)."""
+        ordered = sorted(alliances_data.values(), key=lambda a: float(a.get('score', 0)), reverse=True)
+        self._ranks = {int(a['id']): rank for rank, a in enumerate(ordered, start=1)}
+        self._ranks.update(self._api_ranks)
+        self._csv_generation = generation
+        self._update_top_ids()
+        logger.info(f"🏰 Built alliance rank table from CSV ({len(self._ranks)} alliances)")
+
+    def apply_api_ranks(self, alliances: list) -> None:
+        """Overwrite ranks with the official ranks from the API."""
+        api_ranks = {}
+        for alliance in alliances:
+            try:
+                api_ranks[int(alliance['id'])] = int(alliance.get('rank') or 999)
+            except (KeyError, TypeError, ValueError):
+                continue
+        self._api_ranks = api_ranks
+        self._ranks.update(api_ranks)
+        self._refreshed_at = time.time()
+        self._update_top_ids()
+        logger.info(f"🏰 Refreshed alliance ranks from API ({len(api_ranks)} alliances)")
+
+    def _update_top_ids(self) -> None:
+        """Recompute the top alliance set, clearing shared verdicts if it changed."""
+        # Once the API has answered, its top list is authoritative over score-derived ranks
+        source = self._api_ranks or self._ranks
+        top_ids = frozenset(aid for aid, rank in source.items() if rank <= self.top_rank)
+        if self._top_ids and top_ids != self._top_ids:
+            raid_search_cache.invalidate_alliance_verdicts()
+        self._top_ids = top_ids
+
+    async def ensure_fresh(self, alliances_data: Dict[str, Dict[str, Any]], generation: Any = None) -> None:
+        """Rebuild when the CSV generation changes and refresh from the API when the interval has passed."""
+        if alliances_data and (not self._ranks or generation != self._csv_generation):
+            self.build_from_csv(alliances_data, generation)
+
+        if time.time() - self._refreshed_at < self.refresh_interval:
+            return
+
+        try:
+            from api.politics_war_api import api
+            # Fetch a margin past the cutoff so alliances near the boundary are ranked officially
+            top_alliances = await api.get_top_alliances(self.top_rank + 35)
+            if top_alliances:
+                self.apply_api_ranks(top_alliances)
+            else:
+                # Don't retry on every search while the API is failing
+                self._refreshed_at = time.time() - self.refresh_interval / 2
+        except Exception as e:
+            logger.error(f"🏰 Error refreshing alliance ranks: {e}")
+            self._refreshed_at = time.time() - self.refresh_interval / 2
+
+    def is_ready(self) -> bool:
+        """Whether any rank data has been loaded."""
+        return bool(self._ranks)
+
+    def get_rank(self, alliance_id: Optional[int]) -> int:
+        """Get an alliance's rank (999 if unknown)."""
+        if not alliance_id:
+            return 999
+        return self._ranks.get(int(alliance_id), 999)
+
+    def is_top_alliance(self, alliance_id: Optional[int]) -> bool:
+        """Check if an alliance is within the protected top ranks."""
+        return bool(alliance_id) and int(alliance_id) in self._top_ids
+
+# Global alliance rank table instance
+alliance_rank_table = AllianceRankTable()
@@ -8,7 +8,9 @@ import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from models.alliance import Alliance
+from models.project import ProjectBitset
 from api.politics_war_api import api
+from services.alliance_snapshot_service import alliance_snapshot_service
 from config.constants import GameConstants
 
 class AllianceService:
@@ -24,9 +26,17 @@ class AllianceService:
             return Alliance.from_dict(data)
         return None
     
-    async def get_alliance_members(self, alliance_id: int) -> Optional[List[Dict]]:
-        """Get alliance members."""
-        return await self.api.get_alliance_members(alliance_id, "alliance_scope")
+    async def get_alliance_members(self, alliance_id: int, force: bool = False) -> Optional[List[Dict]]:
+        """Get alliance members from the shared snapshot."""
+        return await alliance_snapshot_service.get_members(alliance_id, force=force)
+    
+    async def get_member_nations_data(self, alliance_id: int, nation_ids: List[str] = None) -> Dict[str, Dict]:
+        """Get detailed nation data for alliance members from the shared snapshot."""
+        return await alliance_snapshot_service.get_nations_data(alliance_id, nation_ids)
+    
+    def iter_member_nations_data(self, alliance_id: int, nation_ids: List[str] = None, chunk_size: int = 50):
+        """Get detailed nation data for alliance members a chunk of IDs at a time (see AllianceSnapshotService)."""
+        return alliance_snapshot_service.iter_nations_data(alliance_id, nation_ids, chunk_size)
     
     def audit_activity(self, members: List[Dict]) -> List[Dict]:
         """Audit member activity."""
@@ -62,10 +72,7 @@ class AllianceService:
                 projects = member.get("projects", 0)
                 
                 # Check if member has Intelligence Agency project
-                has_intel_agency = any(
-                    project.get('name') == 'Intelligence Agency' 
-                    for project in member.get('projects_list', [])
-                )
+                has_intel_agency = ProjectBitset.from_nation(member).has('central_intelligence_agency')
                 
                 required_spies = GameConstants.SPY_REQUIREMENTS["with_intelligence_agency"] if has_intel_agency else GameConstants.SPY_REQUIREMENTS["base"]
                 
@@ -0,0 +1,231 @@
+"""
+Shared, TTL-cached alliance member snapshots.
+
+Audits, the war monitor and AllianceService all read alliance members from here
+instead of each fetching the member list (and detailed nation batch) themselves.
+"""
+
+import asyncio
+import inspect
+import time
+import logging
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Tuple
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from api.politics_war_api import api
+from config.settings import config
+
+logger = logging.getLogger('raiden_shogun')
+
+class AllianceSnapshot:
+    """One alliance's member list plus the detailed nation batch, as of `fetched_at`."""
+
+    def __init__(self, alliance_id: int, members: List[Dict], fetched_at: float):
+        self.alliance_id = alliance_id
+        self.members = members
+        self.fetched_at = fetched_at
+        self.nations_data = None  # nation_id (str) -> detailed nation data, fetched on first use
+        self.member_ids = frozenset(str(member.get('id')) for member in members)
+
+    def age(self) -> float:
+        """Seconds since this snapshot was fetched."""
+        return time.time() - self.fetched_at
+
+class AllianceSnapshotService:
+    """Holds one snapshot per alliance, refreshed on expiry or in the background."""
+
+    def __init__(self, ttl: int = None, refresh_interval: int = None):
+        self.ttl = ttl or config.ALLIANCE_SNAPSHOT_TTL
+        self.refresh_interval = refresh_interval or config.ALLIANCE_SNAPSHOT_REFRESH_INTERVAL
+        self._snapshots = {}  # alliance_id -> AllianceSnapshot
+        self._locks = {}  # alliance_id -> asyncio.Lock, so concurrent callers share one fetch
+        self._subscribers = []
+        self._stats = {'hits': 0, 'fetches': 0, 'detail_fetches': 0}
+
+    def _get_lock(self, alliance_id: int) -> asyncio.Lock:
+        lock = self._locks.get(alliance_id)
+        if lock is None:
+            lock = self._locks[alliance_id] = asyncio.Lock()
+        return lock
+
+    def _is_fresh(self, snapshot: Optional[AllianceSnapshot]) -> bool:
+        return snapshot is not None and snapshot.age() < self.ttl
+
+    async def get_snapshot(self, alliance_id: int = None, force: bool = False,
+                           include_details: bool = False) -> Optional[AllianceSnapshot]:
+        """Get the alliance snapshot, fetching it if missing, expired or forced."""
+        alliance_id = alliance_id or config.ALLIANCE_ID
+        snapshot = self._snapshots.get(alliance_id)
+
+        if force or not self._is_fresh(snapshot):
+            async with self._get_lock(alliance_id):
+                # Another caller may have refreshed it while we waited
+                snapshot = self._snapshots.get(alliance_id)
+                if force or not self._is_fresh(snapshot):
+                    snapshot = await self._refresh(alliance_id) or snapshot
+        else:
+            self._stats['hits'] += 1
+
+        if snapshot is not None and include_details and snapshot.nations_data is None:
+            async with self._get_lock(alliance_id):
+                if snapshot.nations_data is None:
+                    await self._fetch_details(snapshot)
+
+        return snapshot
+
+    async def get_members(self, alliance_id: int = None, force: bool = False) -> Optional[List[Dict]]:
+        """Get alliance members (a copy of the list, the member dicts are shared)."""
+        snapshot = await self.get_snapshot(alliance_id, force=force)
+        return list(snapshot.members) if snapshot else None
+
+    async def get_nations_data(self, alliance_id: int = None, nation_ids: List[str] = None) -> Dict[str, Dict]:
+        """Get detailed nation data for alliance members, optionally limited to `nation_ids`."""
+        snapshot = await self.get_snapshot(alliance_id, include_details=True)
+        nations_data = snapshot.nations_data if snapshot and snapshot.nations_data else {}
+        if nation_ids is None:
+            return dict(nations_data)
+
+        result = {}
+        missing = []
+        for nation_id in nation_ids:
+            nation_id = str(nation_id)
+            if nation_id in nations_data:
+                result[nation_id] = nations_data[nation_id]
+            else:
+                missing.append(nation_id)
+
+        # Nations not in the snapshot (e.g. joined since it was taken) are fetched directly
+        if missing:
+            extra = await api.get_nations_batch_data(missing, "everything_scope") or {}
+            result.update({str(k): v for k, v in extra.items()})
+        return result
+
+    async def iter_nations_data(self, alliance_id: int = None, nation_ids: List[str] = None,
+                                chunk_size: int = 50) -> AsyncIterator[Tuple[List[str], Optional[Dict[str, Dict]]]]:
+        """Yield (nation IDs, detailed nation data) a chunk at a time, with None for a chunk that failed.
+
+        Details already in the snapshot are served from it; otherwise each chunk is its own API call,
+        so callers can use early chunks while later ones are fetched. If every chunk succeeds the
+        details are kept on the snapshot for other callers.
+        """
+        alliance_id = alliance_id or config.ALLIANCE_ID
+        snapshot = await self.get_snapshot(alliance_id)
+        if nation_ids is None:
+            nation_ids = [str(member.get('id', 0)) for member in snapshot.members] if snapshot else []
+        nation_ids = [str(nation_id) for nation_id in nation_ids]
+        cached = snapshot.nations_data if snapshot and snapshot.nations_data else {}
+
+        fetched = {}
+        complete = True
+        for start in range(0, len(nation_ids), chunk_size):
+            chunk = nation_ids[start:start + chunk_size]
+            missing = [nation_id for nation_id in chunk if nation_id not in cached]
+            data = {nation_id: cached[nation_id] for nation_id in chunk if nation_id in cached}
+            if missing:
+                try:
+                    extra = await api.get_nations_batch_data(missing, "everything_scope")
+                except Exception as e:
+                    logger.error(f"👥 Error fetching nation details for alliance {alliance_id}: {e}")
+                    extra = None
+                # The batch call returns {} on an error response
+                if not extra:
+                    complete = False
+                    yield chunk, None
+                    continue
+                self._stats['detail_fetches'] += 1
+                extra = {str(k): v for k, v in extra.items()}
+                fetched.update(extra)
+                data.update(extra)
+            yield chunk, data
+
+        if complete and fetched and snapshot is not None and snapshot.nations_data is None:
+            snapshot.nations_data = fetched
+
+    async def _refresh(self, alliance_id: int) -> Optional[AllianceSnapshot]:
+        """Fetch a new member list and notify subscribers of membership changes."""
+        try:
+            members = await api.get_alliance_members(alliance_id, "alliance_scope")
+        except Exception as e:
+            logger.error(f"👥 Error fetching alliance members for {alliance_id}: {e}")
+            return None
+
+        self._stats['fetches'] += 1
+        if not members:
+            logger.warning(f"👥 No members returned for alliance {alliance_id}, keeping previous snapshot")
+            return None
+
+        previous = self._snapshots.get(alliance_id)
+        snapshot = AllianceSnapshot(alliance_id, members, time.time())
+        self._snapshots[alliance_id] = snapshot
+
+        if previous is None:
+            logger.info(f"👥 Loaded alliance {alliance_id} snapshot ({len(members)} members)")
+            await self._notify(alliance_id, snapshot, set(snapshot.member_ids), set())
+        else:
+            joined = snapshot.member_ids - previous.member_ids
+            left = previous.member_ids - snapshot.member_ids
+            if joined or left:
+                logger.info(f"👥 Alliance {alliance_id} membership changed (+{len(joined)} / -{len(left)})")
+                await self._notify(alliance_id, snapshot, joined, left)
+
+        return snapshot
+
+    async def _fetch_details(self, snapshot: AllianceSnapshot) -> None:
+        """Fetch the detailed nation batch for every member of a snapshot."""
+        try:
+            nation_ids = [str(member.get('id', 0)) for member in snapshot.members]
+            nations_data = await api.get_nations_batch_data(nation_ids, "everything_scope")
+            if nations_data:
+                snapshot.nations_data = {str(k): v for k, v in nations_data.items()}
+                self._stats['detail_fetches'] += 1
+        except Exception as e:
+            logger.error(f"👥 Error fetching nation details for alliance {snapshot.alliance_id}: {e}")
+
+    def invalidate(self, alliance_id: int = None) -> None:
+        """Drop one alliance's snapshot, or all of them."""
+        if alliance_id is None:
+            self._snapshots.clear()
+        else:
+            self._snapshots.pop(alliance_id, None)
+
+    def subscribe(self, callback: Callable) -> None:
+        """Register `callback(alliance_id, snapshot, joined, left)`; it may be sync or async."""
+        if callback not in self._subscribers:
+            self._subscribers.append(callback)
+
+    def unsubscribe(self, callback: Callable) -> None:
+        """Remove a previously registered callback."""
+        if callback in self._subscribers:
+            self._subscribers.remove(callback)
+
+    async def _notify(self, alliance_id: int, snapshot: AllianceSnapshot, joined: set, left: set) -> None:
+        for callback in list(self._subscribers):
+            try:
+                result = callback(alliance_id, snapshot, joined, left)
+                if inspect.isawaitable(result):
+                    await result
+            except Exception as e:
+                logger.error(f"👥 Error in alliance snapshot subscriber: {e}")
+
+    async def refresh_task(self) -> None:
+        """Background task keeping our alliance's snapshot warm."""
+        while True:
+            try:
+                await self.get_snapshot(config.ALLIANCE_ID, force=True)
+            except Exception as e:
+                logger.error(f"👥 Error in alliance snapshot refresh task: {e}")
+            await asyncio.sleep(self.refresh_interval)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get snapshot statistics."""
+        return {
+            'alliances': {aid: {'members': len(s.members), 'age': round(s.age(), 1),
+                                'has_details': s.nations_data is not None}
+                          for aid, s in self._snapshots.items()},
+            **self._stats
+        }
+
+# Global alliance snapshot service instance
+alliance_snapshot_service = AllianceSnapshotService()
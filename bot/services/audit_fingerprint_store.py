@@ -0,0 +1,90 @@
+"""
+Per-member audit fingerprints, so unchanged members can reuse their last verdict.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import logging
+from typing import Any, Dict, Iterable, Optional, Tuple
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.settings import config
+
+logger = logging.getLogger('raiden_shogun')
+
+class AuditFingerprintStore:
+    """Stores {audit_type: {nation_id: {'fingerprint': str, 'entry': dict or None}}} in data/audit_fingerprints.json.
+
+    The entry is the serialized violation from the run that produced the fingerprint
+    (None means the member passed), so a matching fingerprint lets an audit skip the check.
+    """
+
+    def __init__(self, path: str = None):
+        self.path = path or os.path.join(config.JSON_DIR, "audit_fingerprints.json")
+        self._verdicts = self._load()
+        self._dirty = False
+        self._stats = {'hits': 0, 'misses': 0}
+
+    def _load(self) -> Dict[str, Dict[str, Dict]]:
+        try:
+            if os.path.exists(self.path):
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    return json.load(f)
+        except Exception as e:
+            logger.error(f"Error loading audit fingerprints: {e}")
+        return {}
+
+    @staticmethod
+    def fingerprint(values: Any) -> str:
+        """Stable hash of the inputs an audit verdict depends on."""
+        payload = json.dumps(values, sort_keys=True, default=str, separators=(',', ':'))
+        return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+    def lookup(self, audit_type: str, nation_id: str, fingerprint: str) -> Tuple[bool, Optional[Dict]]:
+        """Return (hit, entry) for a member whose inputs hash to `fingerprint`."""
+        cached = self._verdicts.get(audit_type, {}).get(nation_id)
+        if cached is not None and cached.get('fingerprint') == fingerprint:
+            self._stats['hits'] += 1
+            return True, cached.get('entry')
+        self._stats['misses'] += 1
+        return False, None
+
+    def put(self, audit_type: str, nation_id: str, fingerprint: str, entry: Optional[Dict]) -> None:
+        """Remember the verdict for a member's current fingerprint."""
+        self._verdicts.setdefault(audit_type, {})[nation_id] = {'fingerprint': fingerprint, 'entry': entry}
+        self._dirty = True
+
+    def prune(self, audit_type: str, nation_ids: Iterable[str]) -> None:
+        """Drop members of an audit that are no longer being audited."""
+        keep = set(nation_ids)
+        verdicts = self._verdicts.get(audit_type, {})
+        stale = [nation_id for nation_id in verdicts if nation_id not in keep]
+        for nation_id in stale:
+            del verdicts[nation_id]
+        if stale:
+            self._dirty = True
+
+    def save(self) -> None:
+        """Atomically write the fingerprints if anything changed."""
+        if not self._dirty:
+            return
+        try:
+            directory = os.path.dirname(self.path) or '.'
+            os.makedirs(directory, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.audit_fingerprints.', suffix='.tmp')
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(self._verdicts, f)
+            os.replace(tmp_path, self.path)
+            self._dirty = False
+        except Exception as e:
+            logger.error(f"Error saving audit fingerprints: {e}")
+
+    def get_stats(self) -> Dict[str, int]:
+        """Get hit/miss counts since startup."""
+        return dict(self._stats)
+
+# Global audit fingerprint store instance
+audit_fingerprint_store = AuditFingerprintStore()
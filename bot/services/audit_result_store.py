@@ -0,0 +1,84 @@
+"""
+Persisted audit results, so /audit can answer from the last scheduled run.
+"""
+
+import json
+import os
+import tempfile
+import time
+import logging
+from typing import Dict, List, Optional, Tuple
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.settings import config
+
+logger = logging.getLogger('raiden_shogun')
+
+class AuditResultStore:
+    """Last result per audit type, stored in data/audit_results.json.
+
+    Each result is {'timestamp': float, 'entries': [{'nation_id', 'username', 'formatted', 'error'}]}.
+    """
+
+    def __init__(self, path: str = None):
+        self.path = path or os.path.join(config.JSON_DIR, "audit_results.json")
+        self._results = self._load()
+
+    def _load(self) -> Dict[str, Dict]:
+        try:
+            if os.path.exists(self.path):
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    return json.load(f)
+        except Exception as e:
+            logger.error(f"Error loading audit results: {e}")
+        return {}
+
+    def _save(self) -> None:
+        """Atomically write all results to disk."""
+        try:
+            directory = os.path.dirname(self.path) or '.'
+            os.makedirs(directory, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.audit_results.', suffix='.tmp')
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(self._results, f, indent=2)
+            os.replace(tmp_path, self.path)
+        except Exception as e:
+            logger.error(f"Error saving audit results: {e}")
+
+    def get(self, audit_type: str) -> Optional[Dict]:
+        """Get the last stored result for an audit type."""
+        return self._results.get(audit_type)
+
+    def get_age(self, audit_type: str) -> Optional[float]:
+        """Seconds since the audit type was last stored, or None if never."""
+        result = self.get(audit_type)
+        return time.time() - result['timestamp'] if result else None
+
+    def put_many(self, results: Dict[str, List[Dict]], timestamp: float = None) -> Dict[str, Tuple[List[Dict], List[Dict]]]:
+        """Store results for several audit types and return (entered, left) violators per type.
+
+        Types that had no previous result report no changes, so a first run never floods notifications.
+        """
+        timestamp = timestamp or time.time()
+        changes = {}
+        for audit_type, entries in results.items():
+            previous = self._results.get(audit_type)
+            if previous is not None:
+                changes[audit_type] = self._diff(previous['entries'], entries)
+            else:
+                changes[audit_type] = ([], [])
+            self._results[audit_type] = {'timestamp': timestamp, 'entries': entries}
+        self._save()
+        return changes
+
+    @staticmethod
+    def _diff(old_entries: List[Dict], new_entries: List[Dict]) -> Tuple[List[Dict], List[Dict]]:
+        old_by_id = {entry['nation_id']: entry for entry in old_entries if not entry.get('error')}
+        new_by_id = {entry['nation_id']: entry for entry in new_entries if not entry.get('error')}
+        entered = [entry for nation_id, entry in new_by_id.items() if nation_id not in old_by_id]
+        left = [entry for nation_id, entry in old_by_id.items() if nation_id not in new_by_id]
+        return entered, left
+
+# Global audit result store instance
+audit_result_store = AuditResultStore()
@@ -0,0 +1,304 @@
+"""
+Beige exit timers: tells subscribed raiders when targets leave beige.
+"""
+
+import asyncio
+import heapq
+import json
+import os
+import tempfile
+import time
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from api.politics_war_api import api
+from config.settings import config
+from services.raid_cache_service import RaidCacheService
+from services.war_service import WarService
+from services.war_state_tracker import war_state_tracker, current_turn, TURN_SECONDS
+
+logger = logging.getLogger('raiden_shogun')
+
+def turn_start(turn: int) -> float:
+    """Unix time a turn starts."""
+    return turn * TURN_SECONDS
+
+class BeigeTimerService:
+    """A heap of (exit_turn, nation_id) for every beige nation, drained once per turn.
+
+    Exit turns come from the raid cache's beige_turns (re-read whenever the cache changes) and
+    from wars the war state tracker sees won, which add BEIGE_TURNS_PER_DEFEAT to the loser.
+    A nation's latest exit turn lives in `_exits`; superseded heap entries are skipped when
+    popped. Nations due this turn are re-checked with one API call before anyone is alerted.
+
+    Subscriptions are stored in data/beige_subscriptions.json as
+    {discord_id: {'watch': [nation IDs], 'range_nation_id': ID or None}}; `range_nation_id`
+    subscribes to every target leaving beige within that nation's war range.
+    """
+
+    def __init__(self, path: str = None, alliance_id: int = None):
+        self.path = path or os.path.join(config.JSON_DIR, "beige_subscriptions.json")
+        self.alliance_id = alliance_id or config.ALLIANCE_ID
+        self.war_service = WarService()
+        self._heap: List[Tuple[int, str]] = []
+        self._exits: Dict[str, int] = {}  # nation ID -> turn it leaves beige
+        self._targets: Dict[str, Dict] = {}  # nation ID -> name, score, alliance and cities
+        self._scores: Dict[str, float] = {}  # every nation's score, for range subscriptions
+        self._subscriptions = self._load()
+        self._generation = None
+        self._notifier: Optional[Callable[[Dict[str, List[Dict]]], Awaitable]] = None
+        self._stats = {'alerts': 0, 'rechecked': 0, 'still_beige': 0}
+        war_state_tracker.subscribe_war_end(self.on_war_end)
+
+    def _load(self) -> Dict[str, Dict]:
+        try:
+            if os.path.exists(self.path):
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    return json.load(f)
+        except Exception as e:
+            logger.error(f"Error loading beige subscriptions: {e}")
+        return {}
+
+    def _save(self) -> None:
+        """Atomically write subscriptions to disk."""
+        try:
+            directory = os.path.dirname(self.path) or '.'
+            os.makedirs(directory, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.beige_subscriptions.', suffix='.tmp')
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(self._subscriptions, f, indent=2)
+            os.replace(tmp_path, self.path)
+        except Exception as e:
+            logger.error(f"Error saving beige subscriptions: {e}")
+
+    def _schedule(self, nation_id: str, exit_turn: int) -> None:
+        self._exits[nation_id] = exit_turn
+        heapq.heappush(self._heap, (exit_turn, nation_id))
+        # Drop superseded entries once they outnumber live ones
+        if len(self._heap) > 2 * len(self._exits) + 1000:
+            self._heap = [(turn, nid) for nid, turn in self._exits.items()]
+            heapq.heapify(self._heap)
+
+    def _snapshot_start(self, date: Optional[str], generation: float) -> float:
+        """Unix time of the start (UTC) of the nations dump's date."""
+        try:
+            return datetime.strptime(date, "%Y-%m-%d").replace(tzinfo=timezone.utc).timestamp()
+        except (TypeError, ValueError):
+            # Caches written before the date was recorded: the file may hold the previous day's dump
+            day = datetime.fromtimestamp(generation, timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+            return (day - timedelta(days=1)).timestamp()
+
+    def sync_raid_cache(self) -> bool:
+        """Schedule beige exits from the raid cache if it changed since the last sync."""
+        cache = RaidCacheService()
+        generation = cache.get_cache_generation()
+        if generation is None or generation == self._generation:
+            return False
+        nations = cache.load_nations_cache()
+        if not nations:
+            return False
+
+        # beige_turns counts turn changes from when the daily dump was taken: no earlier than the
+        # start of its date, no later than when the file was written. Scheduling from the earliest
+        # errs early, and recheck() reschedules nations still in beige.
+        earliest_turn = current_turn(self._snapshot_start(cache.get_nations_date(), generation))
+        latest_turn = current_turn(generation)
+        now_turn = current_turn()
+        self._scores = {nation_id: float(nation.get('score') or 0) for nation_id, nation in nations.items()}
+        scheduled = 0
+        for nation_id, nation in nations.items():
+            beige_turns = int(nation.get('beige_turns') or 0)
+            if beige_turns <= 0 or nation.get('vmode') or latest_turn + beige_turns <= now_turn:
+                continue
+            exit_turn = max(earliest_turn + beige_turns, now_turn + 1)
+            self._targets[nation_id] = {
+                'id': nation_id,
+                'nation_name': nation.get('nation_name', 'Unknown'),
+                'leader_name': nation.get('leader_name', 'Unknown'),
+                'score': float(nation.get('score') or 0),
+                'alliance_id': nation.get('alliance_id'),
+                'alliance_name': nation.get('alliance_name', 'None'),
+                'cities': int(nation.get('cities') or 0)
+            }
+            # A defeat seen since the dump was taken may have pushed the exit later
+            if exit_turn > self._exits.get(nation_id, 0):
+                self._schedule(nation_id, exit_turn)
+                scheduled += 1
+
+        self._generation = generation
+        logger.info(f"Beige timers synced from raid cache: {scheduled} scheduled, {len(self._exits)} pending")
+        return True
+
+    def on_war_end(self, attack: Dict) -> None:
+        """War state tracker subscriber: the loser of a won war goes (further) into beige."""
+        if attack.get('type') != 'VICTORY':
+            return
+        loser_id = str(attack.get('def_id'))
+        exit_turn = max(self._exits.get(loser_id, 0), current_turn()) + config.BEIGE_TURNS_PER_DEFEAT
+        self._targets.setdefault(loser_id, {
+            'id': loser_id, 'nation_name': f"Nation {loser_id}", 'leader_name': f"Nation {loser_id}",
+            'score': self._scores.get(loser_id, 0.0), 'alliance_id': None, 'alliance_name': 'None', 'cities': 0
+        })
+        self._schedule(loser_id, exit_turn)
+
+    def pop_due(self, turn: int) -> List[str]:
+        """Nations leaving beige at or before `turn`, removed from the schedule."""
+        due = []
+        while self._heap and self._heap[0][0] <= turn:
+            exit_turn, nation_id = heapq.heappop(self._heap)
+            if self._exits.get(nation_id) != exit_turn:
+                continue
+            del self._exits[nation_id]
+            due.append(nation_id)
+        return due
+
+    async def recheck(self, nation_ids: List[str], turn: int) -> List[str]:
+        """Confirm due nations really left beige, rescheduling any that didn't."""
+        hittable = []
+        for start in range(0, len(nation_ids), 500):
+            chunk = nation_ids[start:start + 500]
+            nations = await api.get_nations_military(chunk)
+            if nations is None:
+                # Couldn't check, trust the schedule
+                hittable.extend(chunk)
+                continue
+            self._stats['rechecked'] += len(chunk)
+            for nation_id in chunk:
+                nation = nations.get(nation_id)
+                if not nation or nation.get('vmode'):
+                    self._targets.pop(nation_id, None)
+                    continue
+                target = self._targets.get(nation_id)
+                if target is not None:
+                    target.update(nation_name=nation.get('nation_name', target['nation_name']),
+                                  leader_name=nation.get('leader_name', target['leader_name']),
+                                  score=float(nation.get('score') or target['score']))
+                beige_turns = int(nation.get('beige_turns') or 0)
+                if beige_turns > 0:
+                    self._stats['still_beige'] += 1
+                    self._schedule(nation_id, turn + beige_turns)
+                else:
+                    hittable.append(nation_id)
+        return hittable
+
+    def alerts_for(self, nation_ids: List[str]) -> Dict[str, List[Dict]]:
+        """Targets to send each subscriber: watched nations plus in-range ones, biggest first."""
+        targets = [self._targets[nation_id] for nation_id in nation_ids if nation_id in self._targets]
+        alerts = {}
+        for discord_id, subscription in self._subscriptions.items():
+            watched = set(subscription.get('watch', []))
+            matched = [target for target in targets if target['id'] in watched]
+
+            range_score = self._scores.get(str(subscription.get('range_nation_id')))
+            if range_score:
+                matched += [target for target in targets
+                            if target['id'] not in watched and target['alliance_id'] != self.alliance_id
+                            and self.war_service.is_in_war_range(range_score, target['score'])]
+
+            if matched:
+                matched.sort(key=lambda target: (target['id'] not in watched, -target['cities']))
+                alerts[discord_id] = matched[:config.BEIGE_ALERT_MAX_TARGETS]
+        return alerts
+
+    async def tick(self, turn: int = None) -> Dict[str, List[Dict]]:
+        """Handle one turn change: pop due nations, re-check them and notify subscribers."""
+        turn = turn if turn is not None else current_turn()
+        self.sync_raid_cache()
+        due = self.pop_due(turn)
+        if not due:
+            return {}
+
+        if self._subscriptions:
+            due = await self.recheck(due, turn)
+        alerts = self.alerts_for(due)
+        for nation_id in due:
+            self._targets.pop(nation_id, None)
+
+        if alerts and self._notifier:
+            try:
+                await self._notifier(alerts)
+                self._stats['alerts'] += sum(len(targets) for targets in alerts.values())
+            except Exception as e:
+                logger.error(f"Error sending beige alerts: {e}")
+        logger.info(f"Turn {turn}: {len(due)} nations left beige, alerts for {len(alerts)} subscribers")
+        return alerts
+
+    def set_notifier(self, notifier: Callable[[Dict[str, List[Dict]]], Awaitable]) -> None:
+        """Set `await notifier({discord_id: [targets]})`, called once per turn with any alerts."""
+        self._notifier = notifier
+
+    async def run(self) -> None:
+        """Background task waking once per turn change, however many timers are pending."""
+        self.sync_raid_cache()
+        while True:
+            next_turn = current_turn() + 1
+            await asyncio.sleep(max(turn_start(next_turn) + config.BEIGE_ALERT_DELAY - time.time(), 0))
+            try:
+                await self.tick(next_turn)
+            except Exception as e:
+                logger.error(f"Error in beige timer task: {e}")
+
+    def watch(self, discord_id: str, nation_id: int) -> bool:
+        """Add a nation to a subscriber's watch list. Returns False if it was already watched."""
+        subscription = self._subscriptions.setdefault(str(discord_id), {'watch': [], 'range_nation_id': None})
+        if str(nation_id) in subscription['watch']:
+            return False
+        subscription['watch'].append(str(nation_id))
+        self._save()
+        return True
+
+    def unwatch(self, discord_id: str, nation_id: int) -> bool:
+        """Remove a nation from a subscriber's watch list. Returns False if it wasn't watched."""
+        subscription = self._subscriptions.get(str(discord_id))
+        if not subscription or str(nation_id) not in subscription['watch']:
+            return False
+        subscription['watch'].remove(str(nation_id))
+        self._prune(str(discord_id))
+        self._save()
+        return True
+
+    def set_range(self, discord_id: str, nation_id: Optional[int]) -> None:
+        """Subscribe to targets in range of `nation_id` leaving beige, or unsubscribe with None."""
+        subscription = self._subscriptions.setdefault(str(discord_id), {'watch': [], 'range_nation_id': None})
+        subscription['range_nation_id'] = str(nation_id) if nation_id else None
+        self._prune(str(discord_id))
+        self._save()
+
+    def _prune(self, discord_id: str) -> None:
+        subscription = self._subscriptions.get(discord_id)
+        if subscription and not subscription['watch'] and not subscription.get('range_nation_id'):
+            del self._subscriptions[discord_id]
+
+    def get_subscription(self, discord_id: str) -> Optional[Dict]:
+        """A subscriber's watch list and range nation."""
+        return self._subscriptions.get(str(discord_id))
+
+    def get_exit_turn(self, nation_id) -> Optional[int]:
+        """Turn a nation is expected to leave beige, None if it isn't known to be beige."""
+        return self._exits.get(str(nation_id))
+
+    def get_upcoming(self, discord_id: str, turns: int = 12) -> List[Tuple[int, Dict]]:
+        """(exit_turn, target) a subscriber would be alerted about in the next `turns` turns."""
+        subscription = self._subscriptions.get(str(discord_id))
+        if not subscription:
+            return []
+        last_turn = current_turn() + turns
+        due = sorted((turn, nation_id) for nation_id, turn in self._exits.items() if turn <= last_turn)
+        alerts = self.alerts_for([nation_id for _, nation_id in due])
+        matched = {target['id'] for target in alerts.get(str(discord_id), [])}
+        return [(turn, self._targets[nation_id]) for turn, nation_id in due if nation_id in matched]
+
+    def get_stats(self) -> Dict:
+        """Get pending timer and alert counts."""
+        return {
+            'pending': len(self._exits),
+            'heap': len(self._heap),
+            'subscribers': len(self._subscriptions),
+            **self._stats
+        }
+
+# Global beige timer service instance
+beige_timer_service = BeigeTimerService()
@@ -14,6 +14,7 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from config.settings import config
 from api.politics_war_api import api
+from services.registration_store import registration_store
 
 class CacheService:
     """Service for cache management and data synchronization."""
@@ -136,48 +137,26 @@ class CacheService:
     
     def load_registrations(self) -> Dict:
         """Load registered nations data."""
-        try:
-            if os.path.exists(self.registrations_file):
-                with open(self.registrations_file, 'r', encoding='utf-8') as f:
-                    return json.load(f)
-            return {}
-        except Exception as e:
-            print(f"Error loading registrations: {e}")
-            return {}
+        return registration_store.get_all()
     
     def save_registrations(self, registrations: Dict):
         """Save registered nations data."""
         try:
-            with open(self.registrations_file, 'w', encoding='utf-8') as f:
-                json.dump(registrations, f, indent=2)
+            registration_store.replace_all(registrations)
         except Exception as e:
             print(f"Error saving registrations: {e}")
     
     def get_user_nation(self, discord_id: str) -> Optional[int]:
         """Get user's nation ID from registrations."""
-        registrations = self.load_registrations()
-        user_data = registrations.get(discord_id)
-        if user_data:
-            return user_data.get('nation_id')
-        return None
+        return registration_store.get_nation_id(discord_id)
     
     def register_user(self, discord_id: str, nation_id: int, discord_name: str, nation_name: str):
         """Register a user with their nation."""
-        registrations = self.load_registrations()
-        registrations[discord_id] = {
-            'nation_id': nation_id,
-            'discord_name': discord_name,  # Keep for compatibility
-            'discord_username': discord_name,  # Exact username
-            'nation_name': nation_name,
-            'registered_at': datetime.now(timezone.utc).isoformat()
-        }
-        self.save_registrations(registrations)
+        try:
+            registration_store.register(discord_id, nation_id, discord_name, nation_name)
+        except Exception as e:
+            print(f"Error saving registrations: {e}")
     
     def get_discord_username(self, nation_id: str) -> str:
         """Get Discord username from nation ID."""
-        registrations = self.load_registrations()
-        for discord_id, data in registrations.items():
-            if str(data.get('nation_id')) == str(nation_id):
-                # Prefer discord_username (exact username) over discord_name (display name)
-                return data.get('discord_username', data.get('discord_name', 'N/A'))
-        return 'N/A'
+        return registration_store.get_discord_username(nation_id) or 'N/A'
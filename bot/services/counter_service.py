@@ -0,0 +1,160 @@
+"""
+Counter-target finder: ranks alliance members able to counter an enemy nation.
+"""
+
+import re
+import time
+import heapq
+import logging
+from bisect import bisect_left, bisect_right
+from typing import Dict, List, Optional
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from api.politics_war_api import api
+from config.settings import config
+from config.constants import GameConstants
+from models.project import ProjectBitset
+from services.alliance_snapshot_service import alliance_snapshot_service
+from services.war_service import WarService
+from services.war_state_tracker import war_state_tracker
+
+logger = logging.getLogger('raiden_shogun')
+
+MILITARY_UNITS = ('soldiers', 'tanks', 'aircraft', 'ships')
+
+class CounterService:
+    """In-memory index of alliance members by score, for ranking counter candidates.
+
+    The index is rebuilt from the alliance snapshot whenever the snapshot changes, so ranking an
+    enemy is a bisect over member scores plus a sort of the few in range, with no per-member API
+    calls. Free offensive slots come from the war state tracker when it is live, otherwise from
+    the snapshot's offensive wars.
+    """
+
+    def __init__(self, alliance_id: int = None):
+        self.alliance_id = alliance_id or config.ALLIANCE_ID
+        self.war_service = WarService()
+        self._snapshot = None
+        self._scores: List[float] = []
+        self._entries: List[Dict] = []
+
+    def build(self, members: List[Dict]) -> None:
+        """Index members by score with their military strength and offensive slots."""
+        entries = []
+        for member in members:
+            if member.get('vmode'):
+                continue
+            military = {unit: int(member.get(unit) or 0) for unit in MILITARY_UNITS}
+            projects = ProjectBitset.from_nation(member)
+            entries.append({
+                'id': str(member.get('id')),
+                'nation_name': member.get('nation_name', 'Unknown'),
+                'leader_name': member.get('leader_name', 'Unknown'),
+                'discord': member.get('discord'),
+                'score': float(member.get('score') or 0),
+                'military': military,
+                'strength': self.war_service.calculate_war_strength(military),
+                'max_offensive': GameConstants.MAX_OFFENSIVE_WARS + projects.has('pirate_economy')
+                                 + projects.has('advanced_pirate_economy'),
+                'offensive': sum(1 for war in member.get('offensive_wars') or [] if int(war.get('turns_left') or 0) > 0)
+            })
+        entries.sort(key=lambda entry: entry['score'])
+        self._entries = entries
+        self._scores = [entry['score'] for entry in entries]
+
+    async def refresh(self) -> bool:
+        """Rebuild the index if the alliance snapshot has changed. Returns whether an index exists."""
+        snapshot = await alliance_snapshot_service.get_snapshot(self.alliance_id)
+        if snapshot is not None and snapshot is not self._snapshot:
+            self.build(snapshot.members)
+            self._snapshot = snapshot
+        return bool(self._entries)
+
+    def in_range(self, enemy_score: float) -> List[Dict]:
+        """Members whose war range covers `enemy_score`."""
+        # is_in_war_range(member, enemy) holds for member scores in [enemy / (1 + r), enemy / (1 - r)]
+        spread = GameConstants.WAR_RANGE_MULTIPLIER
+        low = bisect_left(self._scores, enemy_score / (1 + spread) - 0.01)
+        high = bisect_right(self._scores, enemy_score / (1 - spread) + 0.01)
+        return [entry for entry in self._entries[low:high]
+                if self.war_service.is_in_war_range(entry['score'], enemy_score)]
+
+    def free_slots(self, entry: Dict) -> int:
+        """Offensive war slots a member has open."""
+        offensive = entry['offensive']
+        wars = war_state_tracker.get_nation_wars(entry['id'])
+        if wars is not None:
+            offensive = len(wars['offensive_wars'])
+        return max(entry['max_offensive'] - offensive, 0)
+
+    def rank(self, enemy: Dict, limit: int = 10) -> List[Dict]:
+        """Members in range of `enemy` with a free slot, strongest military advantage first."""
+        enemy_id = str(enemy.get('id'))
+        enemy_strength = self.war_service.calculate_war_strength({unit: int(enemy.get(unit) or 0) for unit in MILITARY_UNITS})
+        already_fighting = war_state_tracker.get_opponent_ids(enemy_id)
+
+        candidates = []
+        for entry in self.in_range(float(enemy.get('score') or 0)):
+            if entry['id'] == enemy_id or entry['id'] in already_fighting:
+                continue
+            free_slots = self.free_slots(entry)
+            if not free_slots:
+                continue
+            candidates.append({
+                **entry,
+                'free_slots': free_slots,
+                'advantage': entry['strength'] - enemy_strength,
+                'ratio': entry['strength'] / enemy_strength if enemy_strength else None
+            })
+        return heapq.nlargest(limit, candidates, key=lambda candidate: candidate['advantage'])
+
+    async def find_counters(self, enemy: Dict, limit: int = 10) -> List[Dict]:
+        """Rank counter candidates against an enemy nation (needs its score and military)."""
+        started = time.perf_counter()
+        if not await self.refresh():
+            logger.warning("No alliance snapshot available for counter search")
+            return []
+        candidates = self.rank(enemy, limit)
+        logger.debug(f"Ranked counters for nation {enemy.get('id')} in {(time.perf_counter() - started) * 1000:.1f}ms")
+        return candidates
+
+    async def resolve_enemy(self, target: str) -> Optional[Dict]:
+        """Enemy nation (score and military) for a war ID/link or a nation ID/link.
+
+        For a war, the enemy is the side that isn't an alliance member.
+        """
+        numbers = re.findall(r'\d+', target or '')
+        if not numbers:
+            return None
+        target_id = int(numbers[-1])
+        is_nation = 'nation' in target.lower()
+
+        war = None if is_nation else war_state_tracker.get_war(target_id)
+        if war is None and 'war' in target.lower():
+            rows = await api.get_active_wars(war_ids=[target_id]) or []
+            war = rows[0] if rows else None
+
+        enemy_id = target_id
+        if war:
+            await self.refresh()
+            member_ids = {entry['id'] for entry in self._entries}
+            enemy_id = war['def_id'] if str(war['att_id']) in member_ids else war['att_id']
+
+        nations = await api.get_nations_military([enemy_id]) or {}
+        return nations.get(str(enemy_id))
+
+def format_counter_line(candidate: Dict) -> str:
+    """One-line summary of a counter candidate."""
+    ratio = f"{candidate['ratio']:.1f}x" if candidate['ratio'] is not None else "∞"
+    military = candidate['military']
+    return (
+        f"[{candidate['leader_name']}](https://politicsandwar.com/nation/id={candidate['id']}) "
+        f"({candidate['score']:,.0f}) — {ratio} strength, "
+        f"{military['soldiers']:,}/{military['tanks']:,}/{military['aircraft']:,}/{military['ships']:,}, "
+        f"{candidate['free_slots']} slot{'s' if candidate['free_slots'] != 1 else ''}"
+    )
+
+# Global counter service instance
+counter_service = CounterService()
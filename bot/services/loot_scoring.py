@@ -0,0 +1,210 @@
+"""
+Pure, synchronous loot scoring kernel for raid targets.
+
+Everything here is a plain function of its inputs (nation dict, city dicts and a
+price vector) so it can be batched, run in a process pool, and tested in isolation.
+"""
+
+import atexit
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Sequence, Tuple
+
+# Fallback market prices when the trade price API is unavailable
+DEFAULT_MARKET_PRICES = {
+    'coal': 50.0, 'oil': 100.0, 'uranium': 2000.0, 'iron': 75.0,
+    'bauxite': 80.0, 'lead': 90.0, 'gasoline': 150.0, 'munitions': 200.0,
+    'steel': 300.0, 'aluminum': 400.0, 'food': 25.0, 'credits': 1000.0
+}
+
+# Improvement values (based on references.md)
+IMPROVEMENT_VALUES = (
+    # Military improvements (high value)
+    ('barracks', 3000),
+    ('factory', 15000),
+    ('hangar', 100000),
+    ('drydock', 250000),
+    # Commerce improvements (medium value)
+    ('supermarket', 5000),
+    ('bank', 15000),
+    ('shopping_mall', 45000),
+    ('stadium', 100000),
+    ('subway', 250000),
+    # Civil improvements (medium value)
+    ('police_station', 75000),
+    ('hospital', 100000),
+    ('recycling_center', 125000),
+    # Resource improvements (medium value)
+    ('coal_mine', 1000),
+    ('oil_well', 1000),
+    ('uranium_mine', 25000),
+    ('iron_mine', 9500),
+    ('bauxite_mine', 1000),
+    ('lead_mine', 1000),
+    ('farm', 1000),
+    # Manufacturing improvements (high value)
+    ('oil_refinery', 45000),
+    ('steel_mill', 45000),
+    ('aluminum_refinery', 30000),
+    ('munitions_factory', 35000),
+    # Power improvements (medium value)
+    ('nuclear_power', 500000),
+    ('oil_power', 7000),
+    ('coal_power', 5000),
+    ('wind_power', 30000),
+)
+
+# Commerce bonus per improvement (+% each)
+COMMERCE_RATES = (
+    ('supermarket', 3),
+    ('bank', 5),
+    ('shopping_mall', 9),
+    ('stadium', 12),
+    ('subway', 8),
+)
+
+# (improvement, resource, units per turn) for flat-rate producers; farms are handled separately
+PRODUCTION_RATES = (
+    ('coal_mine', 'coal', 0.25),
+    ('iron_mine', 'iron', 0.25),
+    ('uranium_mine', 'uranium', 0.25),
+    ('oil_well', 'oil', 0.25),
+    ('bauxite_mine', 'bauxite', 0.25),
+    ('lead_mine', 'lead', 0.25),
+)
+
+MANUFACTURING_RATES = (
+    ('oil_refinery', 'gasoline', 0.5),
+    ('steel_mill', 'steel', 0.75),
+    ('aluminum_refinery', 'aluminum', 0.75),
+    ('munitions_factory', 'munitions', 1.5),
+)
+
+TURNS_PER_DAY = 30
+
+# Process pool for very large candidate sets, created on first use
+_process_pool = None
+
+
+def improvements_value(cities_data: Sequence[Dict]) -> float:
+    """Total value of city improvements."""
+    total_value = 0.0
+    for city in cities_data:
+        for improvement, value in IMPROVEMENT_VALUES:
+            total_value += city.get(improvement, 0) * value
+    return total_value
+
+
+def commerce_value(cities_data: Sequence[Dict]) -> float:
+    """Commerce-based income potential."""
+    total_commerce_value = 0.0
+    for city in cities_data:
+        infrastructure = city.get('infrastructure', 0)
+        land = city.get('land', 0)
+
+        commerce_rate = 0
+        for improvement, rate in COMMERCE_RATES:
+            commerce_rate += city.get(improvement, 0) * rate
+
+        # Cap at 100% (or 125% with International Trade Center project)
+        commerce_rate = min(commerce_rate, 100)
+
+        # Base income = Infrastructure * 100 * (1 + Commerce/100)
+        base_income = infrastructure * 100 * (1 + commerce_rate / 100)
+        land_value = land * 50  # Approximate land value
+
+        total_commerce_value += base_income + land_value
+    return total_commerce_value
+
+
+def production_value(cities_data: Sequence[Dict], prices: Dict[str, float]) -> float:
+    """Daily production value of city improvements at the given prices."""
+    total_value = 0.0
+    for city in cities_data:
+        for improvement, resource, per_turn in PRODUCTION_RATES:
+            total_value += city.get(improvement, 0) * per_turn * TURNS_PER_DAY * prices[resource]
+
+        # Farms: Land/500 tons per turn
+        total_value += city.get('farm', 0) * (city.get('land', 0) / 500) * TURNS_PER_DAY * prices['food']
+
+        for improvement, resource, per_turn in MANUFACTURING_RATES:
+            total_value += city.get(improvement, 0) * per_turn * TURNS_PER_DAY * prices[resource]
+    return total_value
+
+
+def military_value(nation_data: Dict) -> float:
+    """Value of a nation's military, including missiles and nukes."""
+    return (
+        nation_data.get('soldiers', 0) * 1.25 +     # $1.25 per soldier
+        nation_data.get('tanks', 0) * 50 +          # $50 per tank
+        nation_data.get('aircraft', 0) * 500 +      # $500 per aircraft
+        nation_data.get('ships', 0) * 3375 +        # $3,375 per ship
+        nation_data.get('missiles', 0) * 10000 +    # $10k per missile
+        nation_data.get('nukes', 0) * 100000        # $100k per nuke
+    )
+
+
+def score_nation(nation_data: Dict, cities_data: Sequence[Dict], prices: Dict[str, float]) -> float:
+    """Total loot potential for a nation based on city improvements and infrastructure."""
+    total_loot = 0.0
+
+    # 1. Infrastructure value (major factor from cities)
+    total_infrastructure = sum(city.get('infrastructure', 0) for city in cities_data)
+    total_loot += total_infrastructure * 100
+
+    # 2. City improvements value
+    total_loot += improvements_value(cities_data)
+
+    # 3. Commerce-based income potential
+    total_loot += commerce_value(cities_data)
+
+    # 4. Military value (indicates nation strength and development)
+    total_loot += military_value(nation_data)
+
+    # 5. City count bonus ($50k per city)
+    city_count = len(cities_data)
+    if city_count > 0:
+        total_loot += city_count * 50000
+
+    # 6. Score-based bonus ($1k per score point)
+    score = float(nation_data.get('score', 0))
+    if score > 0:
+        total_loot += score * 1000
+
+    # 7. Resource production value (daily production * market prices)
+    total_loot += production_value(cities_data, prices)
+
+    return total_loot
+
+
+def score_batch(items: Sequence[Tuple[Dict, Sequence[Dict]]], prices: Dict[str, float]) -> List[float]:
+    """Score a batch of (nation_data, cities_data) pairs."""
+    return [score_nation(nation_data, cities_data, prices) for nation_data, cities_data in items]
+
+
+def get_process_pool(max_workers: Optional[int] = None) -> ProcessPoolExecutor:
+    """Get the shared process pool used for very large scoring batches."""
+    global _process_pool
+    if _process_pool is None:
+        _process_pool = ProcessPoolExecutor(max_workers=max_workers or min(4, os.cpu_count() or 1))
+        atexit.register(shutdown_process_pool)
+    return _process_pool
+
+
+def shutdown_process_pool() -> None:
+    """Shut down the shared process pool, if it was ever started."""
+    global _process_pool
+    if _process_pool is not None:
+        _process_pool.shutdown(wait=True)
+        _process_pool = None
+
+
+def score_batch_parallel(items: Sequence[Tuple[Dict, Sequence[Dict]]], prices: Dict[str, float],
+                         chunk_size: int = 250) -> List[float]:
+    """Score a large batch across the process pool, preserving input order."""
+    pool = get_process_pool()
+    chunks = [items[i:i + chunk_size] for i in range(0, len(items), chunk_size)]
+    results = []
+    for chunk_scores in pool.map(score_batch, chunks, [prices] * len(chunks)):
+        results.extend(chunk_scores)
+    return results
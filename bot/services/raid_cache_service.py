@@ -1,3 +1,4 @@
+import asyncio
 import aiohttp
 import zipfile
 import csv
@@ -7,6 +8,12 @@ import os
 from datetime import datetime, timezone, timedelta
 from typing import Dict, List, Any, Optional
 import logging
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.raid_search_cache import raid_search_cache
+from services.alliance_rank_service import parse_csv_position
+from services.war_history_store import war_history_store
 
 logger = logging.getLogger('raiden_shogun')
 
@@ -43,6 +50,7 @@ class CSVParser:
                     'alliance_id': int(row.get('alliance_id', 0)) if row.get('alliance_id') and row.get('alliance_id') != 'None' else None,
                     'alliance_name': row.get('alliance', 'None') if row.get('alliance') and row.get('alliance') != 'None' else 'None',
                     'alliance_rank': 999,  # Not available in this CSV
+                    'alliance_position': parse_csv_position(row.get('alliance_position')),
                     'color': row.get('color', 'gray'),
                     'vmode': vmode,
                     'beige_turns': beige_turns,
@@ -243,6 +251,9 @@ class RaidCacheService:
                 with open(cache_path, 'w') as f:
                     json.dump(combined_cache, f, indent=2)
                 
+                # Searches computed against the old data are no longer valid
+                raid_search_cache.invalidate()
+                
                 logger.info(f"Raid cache updated successfully for date {date}")
                 return True
             else:
@@ -290,6 +301,10 @@ class RaidCacheService:
                 with open(current_cache_path, 'w') as f:
                     json.dump(nations_data, f, indent=2)
                 
+                # Record which day's dump this is (may be a fallback date), for turn counters like beige_turns
+                with open(f"{self.cache_dir}/nations_meta.json", 'w') as f:
+                    json.dump({'date': date}, f)
+                
                 logger.info(f"Updated nations cache: {len(nations_data)} nations")
                 return nations_data
             else:
@@ -384,6 +399,10 @@ class RaidCacheService:
                 
                 wars_data = self.parser.parse_wars_csv(csv_content)
                 
+                # Keep every war in the dump in the war history (the cache only groups them by nation)
+                loop = asyncio.get_running_loop()
+                await loop.run_in_executor(None, war_history_store.import_wars_csv, date, csv_content)
+                
                 # Save individual cache (always overwrite the same file)
                 cache_path = f"{self.cache_dir}/wars.json"
                 with open(cache_path, 'w') as f:
@@ -434,6 +453,34 @@ class RaidCacheService:
             logger.error(f"Error loading raid cache: {e}")
             return None
     
+    def get_cache_generation(self) -> Optional[float]:
+        """Get a version marker for the cached data (nations file modification time)."""
+        nations_path = f"{self.cache_dir}/nations.json"
+        try:
+            return os.path.getmtime(nations_path)
+        except OSError:
+            return None
+    
+    def get_nations_date(self) -> Optional[str]:
+        """Get the date (YYYY-MM-DD) of the CSV dump the cached nations came from."""
+        try:
+            with open(f"{self.cache_dir}/nations_meta.json", 'r') as f:
+                return json.load(f).get('date')
+        except (OSError, ValueError):
+            return None
+    
+    def load_nations_cache(self) -> Optional[Dict]:
+        """Load only the cached nations data."""
+        try:
+            nations_path = f"{self.cache_dir}/nations.json"
+            if os.path.exists(nations_path):
+                with open(nations_path, 'r') as f:
+                    return json.load(f)
+            return None
+        except Exception as e:
+            logger.error(f"Error loading nations cache: {e}")
+            return None
+    
     def load_yesterday_nations_cache(self) -> Optional[Dict]:
         """Load yesterday's nations cache data for comparison."""
         try:
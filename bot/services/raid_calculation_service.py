@@ -1,7 +1,17 @@
 import logging
 import asyncio
 import time
-from typing import Dict, List, Any, Tuple, Optional
+from typing import Dict, List, Any, Tuple, Optional, AsyncIterator, Set
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.settings import config
+from utils.top_k import TopKHeap
+from services.raid_search_cache import raid_search_cache
+from services import loot_scoring
+from services.alliance_rank_service import alliance_rank_table, MEMBER_POSITIONS
+from services.war_history_store import war_history_store
 
 logger = logging.getLogger('raiden_shogun')
 
@@ -21,49 +31,8 @@ class RaidCalculationService:
     
     async def calculate_loot_potential(self, nation_data: Dict, cities_data: List[Dict], wars_data: List[Dict]) -> float:
         """Calculate total loot potential for a nation based on city improvements and infrastructure."""
-        total_loot = 0.0
-        
-        # 1. Infrastructure value (major factor from cities)
-        total_infrastructure = sum(city.get('infrastructure', 0) for city in cities_data)
-        infrastructure_value = total_infrastructure * 100  # Base infrastructure value
-        total_loot += infrastructure_value
-        
-        # 2. City improvements value (based on actual improvements)
-        improvements_value = self.calculate_improvements_value(cities_data)
-        total_loot += improvements_value
-        
-        # 3. Commerce-based income potential
-        commerce_value = self.calculate_commerce_value(cities_data)
-        total_loot += commerce_value
-        
-        # 4. Military value (indicates nation strength and development)
-        military_value = (
-            nation_data.get('soldiers', 0) * 1.25 +     # $1.25 per soldier
-            nation_data.get('tanks', 0) * 50 +          # $50 per tank
-            nation_data.get('aircraft', 0) * 500 +      # $500 per aircraft
-            nation_data.get('ships', 0) * 3375 +        # $3,375 per ship
-            nation_data.get('missiles', 0) * 10000 +    # $10k per missile
-            nation_data.get('nukes', 0) * 100000        # $100k per nuke
-        )
-        total_loot += military_value
-        
-        # 5. City count bonus (more cities = more value)
-        city_count = len(cities_data)
-        if city_count > 0:
-            city_bonus = city_count * 50000  # $50k per city
-            total_loot += city_bonus
-        
-        # 6. Score-based bonus (indicates development level)
-        score = float(nation_data.get('score', 0))
-        if score > 0:
-            score_bonus = score * 1000  # $1k per score point
-            total_loot += score_bonus
-        
-        # 7. Resource production value (daily production * market prices)
-        production_value = await self.calculate_production_value(cities_data)
-        total_loot += production_value
-        
-        return total_loot
+        prices = await self.get_market_prices()
+        return loot_scoring.score_nation(nation_data, cities_data, prices)
 
     async def get_market_prices(self) -> Dict[str, float]:
         """Get current market prices for resources."""
@@ -81,37 +50,19 @@ class RaidCalculationService:
                 # Get the most recent prices
                 latest_prices = prices_data[0]
                 self._market_prices = {
-                    'coal': latest_prices.get('coal', 50.0),
-                    'oil': latest_prices.get('oil', 100.0),
-                    'uranium': latest_prices.get('uranium', 2000.0),
-                    'iron': latest_prices.get('iron', 75.0),
-                    'bauxite': latest_prices.get('bauxite', 80.0),
-                    'lead': latest_prices.get('lead', 90.0),
-                    'gasoline': latest_prices.get('gasoline', 150.0),
-                    'munitions': latest_prices.get('munitions', 200.0),
-                    'steel': latest_prices.get('steel', 300.0),
-                    'aluminum': latest_prices.get('aluminum', 400.0),
-                    'food': latest_prices.get('food', 25.0),
-                    'credits': latest_prices.get('credits', 1000.0)
+                    resource: latest_prices.get(resource, default)
+                    for resource, default in loot_scoring.DEFAULT_MARKET_PRICES.items()
                 }
                 self._prices_timestamp = current_time
                 logger.info(f"🌐 Updated market prices: {self._market_prices}")
             else:
                 logger.warning("🌐 No market prices data available, using defaults")
                 # Use default prices if API fails
-                self._market_prices = {
-                    'coal': 50.0, 'oil': 100.0, 'uranium': 2000.0, 'iron': 75.0,
-                    'bauxite': 80.0, 'lead': 90.0, 'gasoline': 150.0, 'munitions': 200.0,
-                    'steel': 300.0, 'aluminum': 400.0, 'food': 25.0, 'credits': 1000.0
-                }
+                self._market_prices = dict(loot_scoring.DEFAULT_MARKET_PRICES)
         except Exception as e:
             logger.error(f"🌐 Error fetching market prices: {e}")
             # Use default prices on error
-            self._market_prices = {
-                'coal': 50.0, 'oil': 100.0, 'uranium': 2000.0, 'iron': 75.0,
-                'bauxite': 80.0, 'lead': 90.0, 'gasoline': 150.0, 'munitions': 200.0,
-                'steel': 300.0, 'aluminum': 400.0, 'food': 25.0, 'credits': 1000.0
-            }
+            self._market_prices = dict(loot_scoring.DEFAULT_MARKET_PRICES)
         
         return self._market_prices
 
@@ -222,36 +173,32 @@ class RaidCalculationService:
         
         return total_value
 
-    def calculate_war_loot_modifier(self, nation_data: Dict, wars_data: List[Dict]) -> float:
-        """Calculate loot modifier based on historical war performance."""
-        nation_id = nation_data.get('id')
-        if not nation_id or not wars_data:
-            return 1.0
-        
-        # Find wars involving this nation
-        nation_wars = []
-        for war in wars_data:
-            if (war.get('aggressor_nation_id') == nation_id or 
-                war.get('defender_nation_id') == nation_id):
-                nation_wars.append(war)
+    def calculate_war_loot_modifier(self, nation_data: Dict, wars_data: List[Dict] = None) -> float:
+        """Calculate loot modifier based on historical war performance.
         
-        if not nation_wars:
+        Without `wars_data`, uses what was looted from the nation in its lost wars in the war history.
+        """
+        nation_id = nation_data.get('id')
+        if not nation_id:
             return 1.0
         
-        # Calculate average loot from wars where they were defeated
-        total_loot = 0
-        looted_wars = 0
-        
-        for war in nation_wars:
-            loot = war.get('loot', 0)
-            if loot and loot > 0:
-                total_loot += loot
-                looted_wars += 1
+        if wars_data is None:
+            loot_values = [loot for loot in war_history_store.get_loot_lost(nation_id) if loot > 0]
+        else:
+            # Find wars involving this nation
+            nation_wars = []
+            for war in wars_data:
+                if (war.get('aggressor_nation_id') == nation_id or 
+                    war.get('defender_nation_id') == nation_id):
+                    nation_wars.append(war)
+            
+            # Calculate average loot from wars where they were defeated
+            loot_values = [war['loot'] for war in nation_wars if (war.get('loot') or 0) > 0]
         
-        if looted_wars == 0:
+        if not loot_values:
             return 1.0
         
-        avg_loot = total_loot / looted_wars
+        avg_loot = sum(loot_values) / len(loot_values)
         
         # Categorize based on average loot (more conservative estimates)
         if avg_loot < 1000000:  # Under 1M = bad target
@@ -267,146 +214,16 @@ class RaidCalculationService:
 
     async def calculate_production_value(self, cities_data: List[Dict]) -> float:
         """Calculate production value based on city improvements using real-time market prices."""
-        total_value = 0.0
-        
-        # Get current market prices
         prices = await self.get_market_prices()
-        
-        for city in cities_data:
-            # Coal mines: 3 tons/day = 0.25/turn
-            coal_mines = city.get('coal_mine', 0)
-            coal_production = coal_mines * 0.25 * 30  # 30 turns = 1 day
-            total_value += coal_production * prices['coal']
-            
-            # Iron mines: 3 tons/day = 0.25/turn
-            iron_mines = city.get('iron_mine', 0)
-            iron_production = iron_mines * 0.25 * 30
-            total_value += iron_production * prices['iron']
-            
-            # Uranium mines: 3 tons/day = 0.25/turn
-            uranium_mines = city.get('uranium_mine', 0)
-            uranium_production = uranium_mines * 0.25 * 30
-            total_value += uranium_production * prices['uranium']
-            
-            # Oil wells: 3 tons/day = 0.25/turn
-            oil_wells = city.get('oil_well', 0)
-            oil_production = oil_wells * 0.25 * 30
-            total_value += oil_production * prices['oil']
-            
-            # Bauxite mines: 3 tons/day = 0.25/turn
-            bauxite_mines = city.get('bauxite_mine', 0)
-            bauxite_production = bauxite_mines * 0.25 * 30
-            total_value += bauxite_production * prices['bauxite']
-            
-            # Lead mines: 3 tons/day = 0.25/turn
-            lead_mines = city.get('lead_mine', 0)
-            lead_production = lead_mines * 0.25 * 30
-            total_value += lead_production * prices['lead']
-            
-            # Farms: Land/500 tons per turn
-            farms = city.get('farm', 0)
-            land = city.get('land', 0)
-            food_production = farms * (land / 500) * 30
-            total_value += food_production * prices['food']
-            
-            # Manufacturing improvements
-            # Oil refineries: 0.5/turn (3 oil -> 6 gasoline)
-            oil_refineries = city.get('oil_refinery', 0)
-            gasoline_production = oil_refineries * 0.5 * 30
-            total_value += gasoline_production * prices['gasoline']
-            
-            # Steel mills: 0.75/turn (3 iron + 3 coal -> 9 steel)
-            steel_mills = city.get('steel_mill', 0)
-            steel_production = steel_mills * 0.75 * 30
-            total_value += steel_production * prices['steel']
-            
-            # Aluminum refineries: 0.75/turn (3 bauxite -> 9 aluminum)
-            aluminum_refineries = city.get('aluminum_refinery', 0)
-            aluminum_production = aluminum_refineries * 0.75 * 30
-            total_value += aluminum_production * prices['aluminum']
-            
-            # Munitions factories: 1.5/turn (6 lead -> 18 munitions)
-            munitions_factories = city.get('munitions_factory', 0)
-            munitions_production = munitions_factories * 1.5 * 30
-            total_value += munitions_production * prices['munitions']
-        
-        return total_value
+        return loot_scoring.production_value(cities_data, prices)
 
     def calculate_improvements_value(self, cities_data: List[Dict]) -> float:
         """Calculate total value of city improvements based on references.md."""
-        total_value = 0.0
-        
-        for city in cities_data:
-            # Military improvements (high value)
-            total_value += city.get('barracks', 0) * 3000      # $3k each
-            total_value += city.get('factory', 0) * 15000      # $15k each
-            total_value += city.get('hangar', 0) * 100000      # $100k each
-            total_value += city.get('drydock', 0) * 250000     # $250k each
-            
-            # Commerce improvements (medium value)
-            total_value += city.get('supermarket', 0) * 5000   # $5k each
-            total_value += city.get('bank', 0) * 15000         # $15k each
-            total_value += city.get('shopping_mall', 0) * 45000  # $45k each
-            total_value += city.get('stadium', 0) * 100000     # $100k each
-            total_value += city.get('subway', 0) * 250000      # $250k each
-            
-            # Civil improvements (medium value)
-            total_value += city.get('police_station', 0) * 75000  # $75k each
-            total_value += city.get('hospital', 0) * 100000       # $100k each
-            total_value += city.get('recycling_center', 0) * 125000  # $125k each
-            
-            # Resource improvements (medium value)
-            total_value += city.get('coal_mine', 0) * 1000     # $1k each
-            total_value += city.get('oil_well', 0) * 1000      # $1k each
-            total_value += city.get('uranium_mine', 0) * 25000 # $25k each
-            total_value += city.get('iron_mine', 0) * 9500     # $9.5k each
-            total_value += city.get('bauxite_mine', 0) * 1000  # $1k each
-            total_value += city.get('lead_mine', 0) * 1000     # $1k each
-            total_value += city.get('farm', 0) * 1000          # $1k each
-            
-            # Manufacturing improvements (high value)
-            total_value += city.get('oil_refinery', 0) * 45000    # $45k each
-            total_value += city.get('steel_mill', 0) * 45000      # $45k each
-            total_value += city.get('aluminum_refinery', 0) * 30000  # $30k each
-            total_value += city.get('munitions_factory', 0) * 35000  # $35k each
-            
-            # Power improvements (medium value)
-            total_value += city.get('nuclear_power', 0) * 500000  # $500k each
-            total_value += city.get('oil_power', 0) * 7000        # $7k each
-            total_value += city.get('coal_power', 0) * 5000       # $5k each
-            total_value += city.get('wind_power', 0) * 30000      # $30k each
-        
-        return total_value
+        return loot_scoring.improvements_value(cities_data)
 
     def calculate_commerce_value(self, cities_data: List[Dict]) -> float:
         """Calculate commerce-based income potential based on references.md."""
-        total_commerce_value = 0.0
-        
-        for city in cities_data:
-            infrastructure = city.get('infrastructure', 0)
-            land = city.get('land', 0)
-            
-            # Calculate commerce rate based on improvements (from references.md)
-            commerce_rate = 0
-            commerce_rate += city.get('supermarket', 0) * 3   # +3% each
-            commerce_rate += city.get('bank', 0) * 5          # +5% each
-            commerce_rate += city.get('shopping_mall', 0) * 9 # +9% each
-            commerce_rate += city.get('stadium', 0) * 12      # +12% each
-            commerce_rate += city.get('subway', 0) * 8        # +8% each
-            
-            # Cap at 100% (or 125% with International Trade Center project)
-            commerce_rate = min(commerce_rate, 100)
-            
-            # Calculate city income
-            # Base income = Infrastructure * 100 * (1 + Commerce/100)
-            base_income = infrastructure * 100 * (1 + commerce_rate / 100)
-            
-            # Add land value
-            land_value = land * 50  # Approximate land value
-            
-            total_commerce_value += base_income + land_value
-        
-        return total_commerce_value
+        return loot_scoring.commerce_value(cities_data)
 
     def calculate_score_bonus(self, nation_data: Dict) -> float:
         """Calculate bonus based on nation score and city count."""
@@ -511,22 +328,57 @@ class RaidCalculationService:
             # If API call fails, be conservative and filter out
             return False
 
-    async def filter_raid_targets(self, user_nation_data: Dict, all_nations: Dict, cities_data: Dict, wars_data: Dict, alliances_data: Dict, progress_callback=None) -> Tuple[List[Dict], Dict[str, int]]:
-        """Filter nations through optimized pipeline with all filtering before calculations."""
-        user_score = float(user_nation_data.get('score', 0))
-        min_score = user_score * 0.75  # 75% of user's score
-        max_score = user_score * 1.25  # 125% of user's score
+    async def filter_raid_targets(self, user_nation_data: Dict, all_nations: Dict, cities_data: Dict, wars_data: Dict, alliances_data: Dict, progress_callback=None, top_k: Optional[int] = None, cache_generation: Any = None) -> Tuple[List[Dict], Dict[str, int]]:
+        """Filter nations through optimized pipeline with all filtering before calculations.
         
-        valid_targets = []
-        filtered_out = {
+        Only the best `top_k` targets by profit score are kept (defaults to config.RAID_TOP_K, 0 keeps all);
+        the rest are counted under filtered_out['below_top_k'].
+        """
+        if top_k is None:
+            top_k = config.RAID_TOP_K
+        
+        best_targets = TopKHeap(key=lambda x: x['profit_score'], limit=top_k)
+        filtered_out = self.new_filter_stats()
+        
+        async for batch in self.iter_raid_targets(user_nation_data, all_nations, cities_data, wars_data, alliances_data, filtered_out, progress_callback, cache_generation):
+            best_targets.extend(batch)
+        
+        # Heap output is already ordered by profit score (descending)
+        valid_targets = best_targets.sorted()
+        filtered_out['below_top_k'] = best_targets.dropped
+        
+        # Update progress
+        if progress_callback:
+            await progress_callback(f"✅ Search complete! Found {best_targets.total_seen} valid targets")
+        
+        logger.info(f"Found {best_targets.total_seen} valid targets after all filtering, keeping top {len(valid_targets)}")
+        logger.info(f"Filtering stats: {filtered_out}")
+        
+        return valid_targets, filtered_out
+
+    def new_filter_stats(self) -> Dict[str, int]:
+        """Create an empty filtering statistics dict."""
+        return {
             'score_range': 0,
             'vmode': 0,
             'beige_turns': 0,
             'defensive_wars': 0,
             'no_cities': 0,
             'alliance_member': 0,
-            'low_loot': 0
+            'low_loot': 0,
+            'below_top_k': 0
         }
+
+    async def iter_raid_targets(self, user_nation_data: Dict, all_nations: Dict, cities_data: Dict, wars_data: Dict, alliances_data: Dict, filtered_out: Dict[str, int], progress_callback=None, cache_generation: Any = None) -> AsyncIterator[List[Dict]]:
+        """Run the filtering pipeline, yielding scored targets as each city improvements chunk completes.
+        
+        Batches are unsorted; `filtered_out` is updated in place as the pipeline runs.
+        When `cache_generation` is given, work is shared with other searches through raid_search_cache.
+        """
+        user_score = float(user_nation_data.get('score', 0))
+        min_score = user_score * 0.75  # 75% of user's score
+        max_score = user_score * 1.25  # 125% of user's score
+        use_cache = cache_generation is not None
         
         logger.info(f"Filtering targets for user score {user_score} (range: {min_score}-{max_score})")
         
@@ -535,6 +387,97 @@ class RaidCalculationService:
             await progress_callback("Phase 1: CSV-based filtering (score, vmode, beige, wars, cities)")
         
         # Phase 1: CSV-based filtering (fast, bulk operations)
+        if use_cache:
+            raid_search_cache.sync_generation(cache_generation)
+            band_key = raid_search_cache.band_key(min_score, max_score)
+            band = raid_search_cache.get_band(band_key)
+            if band is None:
+                band = self._build_band(band_key, all_nations, cities_data, wars_data)
+                raid_search_cache.put_band(band_key, band)
+            else:
+                logger.info(f"🗂️ Using cached candidates for score band {band_key}")
+            candidates = self._candidates_from_band(band, min_score, max_score, filtered_out)
+        else:
+            candidates = self._csv_filter(all_nations, cities_data, wars_data, min_score, max_score, filtered_out)
+        
+        logger.info(f"After CSV filtering: {len(candidates)} candidates for API checks")
+        
+        # Phase 2: Alliance filtering, decided locally from the CSV and rank table where possible
+        await alliance_rank_table.ensure_fresh(alliances_data, cache_generation)
+        alliance_filtered_candidates, needs_position_check = self._local_alliance_filtering(candidates, filtered_out)
+        
+        # Update progress
+        if progress_callback:
+            await progress_callback(f"Phase 2: Alliance filtering ({len(candidates)} candidates, {len(needs_position_check)} need position checks)")
+        
+        # Store progress callback for batch methods
+        self._progress_callback = progress_callback
+        
+        # Only top alliance nations without a known position need the API
+        if needs_position_check:
+            alliance_filtered_candidates += await self._batch_alliance_filtering(needs_position_check, filtered_out, use_cache)
+        
+        logger.info(f"After alliance filtering: {len(alliance_filtered_candidates)} candidates for city improvements check")
+        
+        if not alliance_filtered_candidates:
+            return
+        
+        # Targets already scored by an earlier search are yielded straight away
+        if use_cache:
+            cached_batch = []
+            remaining = []
+            for candidate in alliance_filtered_candidates:
+                if not raid_search_cache.has_loot(candidate['nation_id']):
+                    remaining.append(candidate)
+                    continue
+                target = raid_search_cache.get_loot(candidate['nation_id'])
+                if target is None:
+                    filtered_out['low_loot'] += 1
+                else:
+                    cached_batch.append(target)
+            
+            logger.info(f"🗂️ Reused loot for {len(alliance_filtered_candidates) - len(remaining)} candidates")
+            alliance_filtered_candidates = remaining
+            if cached_batch:
+                yield cached_batch
+            if not alliance_filtered_candidates:
+                return
+        
+        # Update progress
+        if progress_callback:
+            await progress_callback(f"Phase 3: City improvements analysis ({len(alliance_filtered_candidates)} candidates)")
+        
+        # Fetch the most promising candidates first so the best targets surface early.
+        # The CSV floor only bounds loot from below, so it orders the work but cannot prune it.
+        alliance_filtered_candidates.sort(key=self._csv_loot_floor, reverse=True)
+        
+        # Market prices are fetched once and shared by every chunk of this search
+        prices = await self.get_market_prices()
+        
+        # Phase 3 + 4: Fetch city improvements chunk by chunk and score each chunk as soon as it arrives
+        from api.politics_war_api import api
+        candidates_by_id = {c['nation_id']: c for c in alliance_filtered_candidates}
+        candidate_ids = list(candidates_by_id.keys())
+        
+        async for chunk_ids, chunk_data, fetched in self._iter_city_improvements(api, candidate_ids):
+            chunk_candidates = [candidates_by_id[nation_id] for nation_id in chunk_ids]
+            scored = await self._score_candidates(chunk_candidates, chunk_data, prices)
+            
+            batch = []
+            for candidate, target in zip(chunk_candidates, scored):
+                # Only share results that were computed from real city data
+                if use_cache and candidate['nation_id'] in fetched:
+                    raid_search_cache.put_loot(candidate['nation_id'], target)
+                if target is None:
+                    filtered_out['low_loot'] += 1
+                    continue
+                batch.append(target)
+            
+            if batch:
+                yield batch
+
+    def _csv_filter(self, all_nations: Dict, cities_data: Dict, wars_data: Dict, min_score: float, max_score: float, filtered_out: Dict[str, int], rejected: Optional[List[Tuple[float, str]]] = None) -> List[Dict]:
+        """Phase 1 CSV filters. Optionally records (score, reason) for in-range rejections."""
         candidates = []
         for nation_id, nation_data in all_nations.items():
             # Stage 1: Score Range Filter
@@ -543,27 +486,27 @@ class RaidCalculationService:
                 filtered_out['score_range'] += 1
                 continue
             
+            reason = None
+            nation_wars = wars_data.get(nation_id, [])
+            nation_cities = cities_data.get(nation_id, [])
+            
             # Stage 2: Vacation Mode Filter
             if nation_data.get('vmode', 0) == 1:
-                filtered_out['vmode'] += 1
-                continue
-            
+                reason = 'vmode'
             # Stage 3: Beige Turns Filter
-            if nation_data.get('beige_turns', 0) > 0:
-                filtered_out['beige_turns'] += 1
-                continue
-            
+            elif nation_data.get('beige_turns', 0) > 0:
+                reason = 'beige_turns'
             # Stage 4: Defensive Wars Filter
-            nation_wars = wars_data.get(nation_id, [])
-            defensive_wars = len([w for w in nation_wars if w.get('defender_id') == nation_id])
-            if defensive_wars >= 3:
-                filtered_out['defensive_wars'] += 1
-                continue
-            
+            elif len([w for w in nation_wars if w.get('defender_id') == nation_id]) >= 3:
+                reason = 'defensive_wars'
             # Stage 5: Cities Existence Filter
-            nation_cities = cities_data.get(nation_id, [])
-            if not nation_cities:
-                filtered_out['no_cities'] += 1
+            elif not nation_cities:
+                reason = 'no_cities'
+            
+            if reason:
+                filtered_out[reason] += 1
+                if rejected is not None:
+                    rejected.append((nation_score, reason))
                 continue
             
             # Add to candidates for API filtering
@@ -574,82 +517,146 @@ class RaidCalculationService:
                 'wars_data': nation_wars
             })
         
-        logger.info(f"After CSV filtering: {len(candidates)} candidates for API checks")
-        
-        # Update progress
-        if progress_callback:
-            await progress_callback(f"Phase 2: Alliance filtering ({len(candidates)} candidates)")
-        
-        # Store progress callback for batch methods
-        self._progress_callback = progress_callback
+        return candidates
+
+    def _build_band(self, band_key: Tuple[int, int], all_nations: Dict, cities_data: Dict, wars_data: Dict) -> Dict[str, Any]:
+        """Run Phase 1 over a whole score band so it can be reused for any range inside it."""
+        band_min, band_max = raid_search_cache.band_bounds(band_key)
+        rejected = []
+        candidates = self._csv_filter(all_nations, cities_data, wars_data, band_min, band_max, self.new_filter_stats(), rejected)
+        logger.info(f"🗂️ Built score band {band_key} ({band_min:,.0f}-{band_max:,.0f}): {len(candidates)} candidates")
+        return {
+            'candidates': candidates,
+            'rejected': rejected,
+            'total_nations': len(all_nations)
+        }
+
+    def _candidates_from_band(self, band: Dict[str, Any], min_score: float, max_score: float, filtered_out: Dict[str, int]) -> List[Dict]:
+        """Narrow a cached band to the exact score range, producing the same stats as _csv_filter."""
+        candidates = [
+            c for c in band['candidates']
+            if min_score <= float(c['nation_data'].get('score', 0)) <= max_score
+        ]
+        in_range = len(candidates)
+        for score, reason in band['rejected']:
+            if min_score <= score <= max_score:
+                filtered_out[reason] += 1
+                in_range += 1
+        filtered_out['score_range'] += band['total_nations'] - in_range
+        return candidates
+
+    def _csv_loot_floor(self, candidate: Dict) -> float:
+        """Cheap loot lower bound from CSV data (military, city count and score terms only)."""
+        nation_data = candidate['nation_data']
+        city_count = len(candidate['cities_data'])
+        score = float(nation_data.get('score', 0))
+        return loot_scoring.military_value(nation_data) + city_count * 50000 + max(score, 0) * 1000
+
+    async def _score_candidates(self, candidates: List[Dict], city_improvements_data: Dict, prices: Dict[str, float]) -> List[Optional[Dict]]:
+        """Score candidates with the loot kernel, returning a target dict (or None below the loot threshold) for each."""
+        # Use real-time city improvements if available, fallback to CSV
+        final_cities = [
+            city_improvements_data[c['nation_id']] if c['nation_id'] in city_improvements_data else c['cities_data']
+            for c in candidates
+        ]
+        items = [(c['nation_data'], cities) for c, cities in zip(candidates, final_cities)]
         
-        # Phase 2: Batch API-based alliance filtering (before calculations)
-        alliance_filtered_candidates = await self._batch_alliance_filtering(candidates, filtered_out)
+        # Very large batches (e.g. everything served from the city cache) go to the process pool
+        if len(items) >= config.RAID_PARALLEL_SCORING_THRESHOLD:
+            loop = asyncio.get_running_loop()
+            try:
+                loot_values = await loop.run_in_executor(None, loot_scoring.score_batch_parallel, items, prices)
+            except Exception as e:
+                logger.warning(f"Parallel loot scoring failed, scoring in process: {e}")
+                loot_values = loot_scoring.score_batch(items, prices)
+        else:
+            loot_values = loot_scoring.score_batch(items, prices)
         
-        logger.info(f"After alliance filtering: {len(alliance_filtered_candidates)} candidates for city improvements check")
+        targets = []
+        for candidate, cities, loot_potential in zip(candidates, final_cities, loot_values):
+            # Stage 7: Loot Potential Filter (final filter)
+            if loot_potential <= config.MIN_LOOT_POTENTIAL:
+                targets.append(None)
+                continue
+            
+            targets.append({
+                'nation_data': candidate['nation_data'],
+                'cities_data': cities,
+                'wars_data': candidate['wars_data'],
+                'loot_potential': loot_potential,
+                'profit_score': loot_potential
+            })
+        return targets
+
+    def _local_alliance_filtering(self, candidates: List[Dict], filtered_out: Dict[str, int]) -> Tuple[List[Dict], List[Dict]]:
+        """Apply the alliance rules from CSV data. Returns (valid candidates, candidates needing an API position check)."""
+        valid = []
+        needs_position_check = []
         
-        # Update progress
-        if progress_callback:
-            await progress_callback(f"Phase 3: City improvements analysis ({len(alliance_filtered_candidates)} candidates)")
+        # Without rank data nothing can be decided locally beyond the basics
+        ranks_ready = alliance_rank_table.is_ready()
         
-        # Phase 3: Batch API call for city improvements (only for alliance-filtered candidates)
-        if alliance_filtered_candidates:
-            from api.politics_war_api import api
-            candidate_ids = [c['nation_id'] for c in alliance_filtered_candidates]
-            city_improvements_data = await self._get_city_improvements_with_rate_limiting(api, candidate_ids)
+        for candidate in candidates:
+            nation_data = candidate['nation_data']
+            alliance_id = nation_data.get('alliance_id')
             
-            # Update progress
-            if progress_callback:
-                await progress_callback(f"Phase 4: Loot calculation and final filtering ({len(alliance_filtered_candidates)} candidates)")
+            # No alliance = valid target
+            if not alliance_id:
+                if not nation_data.get('alliance_name'):
+                    nation_data['alliance_name'] = 'None'
+                valid.append(candidate)
+                continue
             
-            # Phase 4: Calculate loot potential and filter by loot threshold
-            for candidate in alliance_filtered_candidates:
-                nation_id = candidate['nation_id']
-                nation_data = candidate['nation_data']
-                nation_cities = candidate['cities_data']
-                nation_wars = candidate['wars_data']
-                
-                # Use real-time city improvements if available, fallback to CSV
-                if nation_id in city_improvements_data:
-                    real_cities = city_improvements_data[nation_id]
-                    loot_potential = await self.calculate_loot_potential(nation_data, real_cities, nation_wars)
-                    final_cities = real_cities
-                else:
-                    # Fallback to CSV data
-                    loot_potential = await self.calculate_loot_potential(nation_data, nation_cities, nation_wars)
-                    final_cities = nation_cities
-                
-                # Stage 7: Loot Potential Filter (final filter)
-                if loot_potential <= 100000:  # Minimum $100k loot
-                    filtered_out['low_loot'] += 1
-                    continue
-                
-                # Add to valid targets
-                valid_targets.append({
-                    'nation_data': nation_data,
-                    'cities_data': final_cities,
-                    'wars_data': nation_wars,
-                    'loot_potential': loot_potential,
-                    'profit_score': loot_potential
-                })
-        
-        # Sort by profit score (descending)
-        valid_targets.sort(key=lambda x: x['profit_score'], reverse=True)
-        
-        # Update progress
-        if progress_callback:
-            await progress_callback(f"✅ Search complete! Found {len(valid_targets)} valid targets")
-        
-        logger.info(f"Found {len(valid_targets)} valid targets after all filtering")
-        logger.info(f"Filtering stats: {filtered_out}")
+            # Filter out our own members
+            if alliance_id == config.ALLIANCE_ID:
+                filtered_out['alliance_member'] += 1
+                continue
+            
+            if not ranks_ready:
+                needs_position_check.append(candidate)
+                continue
+            
+            # Nations in smaller alliances are valid targets
+            if not alliance_rank_table.is_top_alliance(alliance_id):
+                valid.append(candidate)
+                continue
+            
+            # Top alliance: members are protected, applicants are not
+            position = nation_data.get('alliance_position')
+            if position in MEMBER_POSITIONS:
+                filtered_out['alliance_member'] += 1
+            elif position == 'APPLICANT':
+                valid.append(candidate)
+            else:
+                needs_position_check.append(candidate)
         
-        return valid_targets, filtered_out
+        logger.info(f"🏰 Local alliance filtering: {len(valid)} valid, {len(needs_position_check)} need position checks")
+        return valid, needs_position_check
 
-    async def _batch_alliance_filtering(self, candidates: List[Dict], filtered_out: Dict[str, int]) -> List[Dict]:
+    async def _batch_alliance_filtering(self, candidates: List[Dict], filtered_out: Dict[str, int], use_cache: bool = False) -> List[Dict]:
         """Batch process alliance filtering to reduce API calls."""
         if not candidates:
             return []
         
+        alliance_filtered_candidates = []
+        
+        # Reuse verdicts from earlier searches and only query the rest
+        if use_cache:
+            unknown = []
+            for candidate in candidates:
+                verdict = raid_search_cache.get_alliance_verdict(candidate['nation_id'])
+                if verdict is None:
+                    unknown.append(candidate)
+                elif verdict:
+                    alliance_filtered_candidates.append(candidate)
+                else:
+                    filtered_out['alliance_member'] += 1
+            
+            logger.info(f"🗂️ Reused alliance verdicts for {len(candidates) - len(unknown)} candidates")
+            candidates = unknown
+            if not candidates:
+                return alliance_filtered_candidates
+        
         from api.politics_war_api import api
         
         # Configuration for batch alliance filtering
@@ -658,7 +665,6 @@ class RaidCalculationService:
         MAX_ALLIANCE_RETRIES = 2
         ALLIANCE_RETRY_DELAY = 1.0
         
-        alliance_filtered_candidates = []
         candidate_ids = [c['nation_id'] for c in candidates]
         total_chunks = (len(candidate_ids) + ALLIANCE_CHUNK_SIZE - 1) // ALLIANCE_CHUNK_SIZE
         
@@ -684,7 +690,11 @@ class RaidCalculationService:
                     nation_data = candidate['nation_data']
                     
                     # Check alliance status using batch data
-                    if self._is_valid_raid_target_from_batch(nation_data, chunk_alliance_data.get(nation_id)):
+                    is_valid = self._is_valid_raid_target_from_batch(nation_data, chunk_alliance_data.get(nation_id))
+                    if use_cache:
+                        raid_search_cache.put_alliance_verdict(nation_id, is_valid)
+                    
+                    if is_valid:
                         alliance_filtered_candidates.append(candidate)
                     else:
                         filtered_out['alliance_member'] += 1
@@ -762,16 +772,31 @@ class RaidCalculationService:
 
     async def _get_city_improvements_with_rate_limiting(self, api, candidate_ids: List[int]) -> Dict[int, List[Dict]]:
         """Get city improvements data with intelligent batching, rate limiting, and caching."""
+        city_improvements_data = {}
+        async for _, chunk_data, _ in self._iter_city_improvements(api, candidate_ids):
+            city_improvements_data.update(chunk_data)
+        return city_improvements_data
+
+    async def _iter_city_improvements(self, api, candidate_ids: List[int]) -> AsyncIterator[Tuple[List[int], Dict[int, List[Dict]], Set[int]]]:
+        """Yield (chunk_ids, city data, IDs with real city data) per chunk, with rate limiting and caching.
+        
+        Nations without real city data are left out of the city data and scored from the CSV.
+        """
         if not candidate_ids:
-            return {}
+            return
         
         # Check cache first
         current_time = time.time()
-        if current_time - self._cache_timestamp < self._cache_duration and self._city_cache:
+        topping_up = current_time - self._cache_timestamp < self._cache_duration and self._city_cache
+        if topping_up:
             logger.info(f"🌐 Using cached city data ({len(self._city_cache)} nations cached)")
-            # Return cached data for requested nations
-            cached_data = {nation_id: self._city_cache.get(nation_id, []) for nation_id in candidate_ids}
-            return cached_data
+            # Return cached data for requested nations, then fetch the ones the cache lacks
+            cached_ids = [nation_id for nation_id in candidate_ids if nation_id in self._city_cache]
+            if cached_ids:
+                yield cached_ids, {nation_id: self._city_cache[nation_id] for nation_id in cached_ids}, set(cached_ids)
+            candidate_ids = [nation_id for nation_id in candidate_ids if nation_id not in self._city_cache]
+            if not candidate_ids:
+                return
         
         # Configuration for rate limiting
         CHUNK_SIZE = 25  # Process 25 nations at a time
@@ -779,7 +804,7 @@ class RaidCalculationService:
         MAX_RETRIES = 3
         RETRY_DELAY = 1.0  # 1 second delay on retry
         
-        city_improvements_data = {}
+        processed = 0
         total_chunks = (len(candidate_ids) + CHUNK_SIZE - 1) // CHUNK_SIZE
         
         logger.info(f"🌐 Processing {len(candidate_ids)} nations in {total_chunks} chunks of {CHUNK_SIZE}")
@@ -798,25 +823,28 @@ class RaidCalculationService:
             chunk_data = await self._get_chunk_with_retry(api, chunk, MAX_RETRIES, RETRY_DELAY)
             
             if chunk_data:
-                city_improvements_data.update(chunk_data)
                 # Update cache
                 self._city_cache.update(chunk_data)
                 logger.info(f"✅ Chunk {chunk_num} completed successfully")
             else:
                 logger.warning(f"⚠️ Chunk {chunk_num} failed, using CSV fallback")
-                # Fallback to empty data (will use CSV data in calculation)
-                for nation_id in chunk:
-                    city_improvements_data[nation_id] = []
+                # Fallback to no data (will use CSV data in calculation)
+                chunk_data = {}
+            fetched = {nation_id for nation_id in chunk if nation_id in chunk_data}
+            chunk_data = {nation_id: chunk_data[nation_id] for nation_id in fetched}
+            
+            processed += len(fetched)
+            yield chunk, chunk_data, fetched
             
             # Add delay between chunks (except for the last one)
             if i + CHUNK_SIZE < len(candidate_ids):
                 await asyncio.sleep(DELAY_BETWEEN_CHUNKS)
         
-        # Update cache timestamp
-        self._cache_timestamp = current_time
+        # Update cache timestamp (a top-up must not extend the life of the older entries)
+        if not topping_up:
+            self._cache_timestamp = current_time
         
-        logger.info(f"🌐 Completed city improvements fetch: {len(city_improvements_data)} nations processed")
-        return city_improvements_data
+        logger.info(f"🌐 Completed city improvements fetch: {processed} nations processed")
 
     async def _get_chunk_with_retry(self, api, chunk: List[int], max_retries: int, retry_delay: float) -> Optional[Dict[int, List[Dict]]]:
         """Get city data for a chunk with retry logic."""
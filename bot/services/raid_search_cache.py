@@ -0,0 +1,129 @@
+"""
+Shared raid search cache, reused across users searching similar score ranges.
+"""
+
+import math
+import time
+import logging
+from collections import OrderedDict
+from typing import Dict, Any, Optional, Tuple
+
+logger = logging.getLogger('raiden_shogun')
+
+class RaidSearchCache:
+    """Caches pre-filtered candidates per score band plus alliance verdicts and loot per nation.
+
+    Everything is tied to a cache generation (the raid CSV cache version); when the
+    generation changes, all entries are dropped.
+    """
+
+    def __init__(self, band_ratio: float = 0.05, max_bands: int = 64,
+                 verdict_duration: int = 1800, loot_duration: int = 3600):
+        self.band_ratio = band_ratio  # Score bands grow geometrically by 5%
+        self.max_bands = max_bands
+        self.verdict_duration = verdict_duration  # 30 minutes
+        self.loot_duration = loot_duration  # 1 hour, matches the city improvements cache
+
+        self.generation = None
+        self._bands = OrderedDict()  # (lo_idx, hi_idx) -> band entry, kept in LRU order
+        self._alliance_verdicts = {}  # nation_id -> (is_valid, timestamp)
+        self._loot = {}  # nation_id -> (scored target or None if below threshold, timestamp)
+        self._hits = {'bands': 0, 'verdicts': 0, 'loot': 0}
+
+    def sync_generation(self, generation: Any) -> None:
+        """Drop everything if the raid cache generation has changed."""
+        if generation != self.generation:
+            if self.generation is not None:
+                logger.info(f"🗂️ Raid search cache generation changed ({self.generation} -> {generation}), clearing")
+            self.invalidate()
+            self.generation = generation
+
+    def invalidate(self) -> None:
+        """Clear all cached search work."""
+        self._bands.clear()
+        self._alliance_verdicts.clear()
+        self._loot.clear()
+
+    def invalidate_alliance_verdicts(self) -> None:
+        """Clear alliance verdicts when the alliance filter data has changed."""
+        self._alliance_verdicts.clear()
+        logger.info("🗂️ Raid search cache alliance verdicts cleared")
+
+    def band_key(self, min_score: float, max_score: float) -> Tuple[int, int]:
+        """Quantize a score range outward onto the shared geometric band grid."""
+        step = math.log1p(self.band_ratio)
+        lo_idx = math.floor(math.log(min_score) / step) if min_score > 1 else -1
+        hi_idx = math.ceil(math.log(max_score) / step) if max_score > 1 else 0
+        return lo_idx, hi_idx
+
+    def band_bounds(self, band_key: Tuple[int, int]) -> Tuple[float, float]:
+        """Score range covered by a band key."""
+        step = math.log1p(self.band_ratio)
+        lo_idx, hi_idx = band_key
+        lo = math.exp(lo_idx * step) if lo_idx >= 0 else 0.0
+        hi = math.exp(hi_idx * step)
+        # Pad slightly so float rounding never shrinks the band inside the requested range
+        return lo * (1 - 1e-9), hi * (1 + 1e-9)
+
+    def get_band(self, band_key: Tuple[int, int]) -> Optional[Dict]:
+        """Get the cached Phase 1 result for a band."""
+        entry = self._bands.get(band_key)
+        if entry is not None:
+            self._bands.move_to_end(band_key)
+            self._hits['bands'] += 1
+        return entry
+
+    def put_band(self, band_key: Tuple[int, int], entry: Dict) -> None:
+        """Store the Phase 1 result for a band, evicting the least recently used band."""
+        self._bands[band_key] = entry
+        self._bands.move_to_end(band_key)
+        while len(self._bands) > self.max_bands:
+            self._bands.popitem(last=False)
+
+    def get_alliance_verdict(self, nation_id: str) -> Optional[bool]:
+        """Get a cached alliance filter verdict, or None if unknown or expired."""
+        cached = self._alliance_verdicts.get(nation_id)
+        if cached is None:
+            return None
+        is_valid, timestamp = cached
+        if time.time() - timestamp >= self.verdict_duration:
+            del self._alliance_verdicts[nation_id]
+            return None
+        self._hits['verdicts'] += 1
+        return is_valid
+
+    def put_alliance_verdict(self, nation_id: str, is_valid: bool) -> None:
+        """Store an alliance filter verdict decided from real API data."""
+        self._alliance_verdicts[nation_id] = (is_valid, time.time())
+
+    def has_loot(self, nation_id: str) -> bool:
+        """Check if a loot result is cached and fresh."""
+        cached = self._loot.get(nation_id)
+        if cached is None:
+            return False
+        if time.time() - cached[1] >= self.loot_duration:
+            del self._loot[nation_id]
+            return False
+        return True
+
+    def get_loot(self, nation_id: str) -> Optional[Dict]:
+        """Get a cached scored target (None means it was below the loot threshold)."""
+        self._hits['loot'] += 1
+        return self._loot[nation_id][0]
+
+    def put_loot(self, nation_id: str, target: Optional[Dict]) -> None:
+        """Store a scored target computed from real city data."""
+        self._loot[nation_id] = (target, time.time())
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get cache statistics."""
+        return {
+            'generation': self.generation,
+            'bands': len(self._bands),
+            'alliance_verdicts': len(self._alliance_verdicts),
+            'loot_entries': len(self._loot),
+            'hits': dict(self._hits)
+        }
+
+# Global raid search cache instance
+raid_search_cache = RaidSearchCache()
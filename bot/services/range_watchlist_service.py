@@ -0,0 +1,267 @@
+"""
+War-range watchlist: tracks which enemy nations are in range of which alliance members.
+"""
+
+import asyncio
+import json
+import os
+import tempfile
+import time
+import logging
+from bisect import bisect_left, bisect_right, insort
+from typing import Awaitable, Callable, Dict, Iterable, List, Optional, Set, Tuple
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.settings import config
+from config.constants import GameConstants
+from services.alliance_snapshot_service import alliance_snapshot_service
+from services.war_service import WarService
+
+logger = logging.getLogger('raiden_shogun')
+
+class ScoreIndex:
+    """Nation IDs sorted by score, updated in place as scores change."""
+
+    def __init__(self):
+        self.scores: Dict[str, float] = {}
+        self._sorted: List[Tuple[float, str]] = []
+
+    def set(self, nation_id: str, score: float) -> bool:
+        """Insert or move a nation. Returns whether its score changed."""
+        old = self.scores.get(nation_id)
+        if old == score:
+            return False
+        if old is not None:
+            self._sorted.pop(bisect_left(self._sorted, (old, nation_id)))
+        insort(self._sorted, (score, nation_id))
+        self.scores[nation_id] = score
+        return True
+
+    def remove(self, nation_id: str) -> None:
+        old = self.scores.pop(nation_id, None)
+        if old is not None:
+            self._sorted.pop(bisect_left(self._sorted, (old, nation_id)))
+
+    def between(self, low: float, high: float) -> List[str]:
+        """Nation IDs with low <= score <= high."""
+        start = bisect_left(self._sorted, (low, ''))
+        end = bisect_right(self._sorted, (high, '\uffff'))
+        return [nation_id for _, nation_id in self._sorted[start:end]]
+
+class RangeWatchlistService:
+    """Incremental join of alliance members against watched enemy alliances by war range.
+
+    Members and enemies each sit in a ScoreIndex. On every refresh only nations whose score
+    changed (or that appeared or disappeared) have their pairs recomputed, by bisecting the
+    other side's index for their score band, and only the pairs that changed are reported.
+    Enemies from an alliance that was just added to the watchlist, and members who just
+    joined, are baselined silently.
+
+    Watched alliance IDs are stored in data/range_watchlist.json.
+    """
+
+    def __init__(self, path: str = None, alliance_id: int = None):
+        self.path = path or os.path.join(config.JSON_DIR, "range_watchlist.json")
+        self.alliance_id = alliance_id or config.ALLIANCE_ID
+        self.war_service = WarService()
+        self.alliance_ids: List[int] = self._load()
+        self._members = ScoreIndex()
+        self._enemies = ScoreIndex()
+        self._member_info: Dict[str, Dict] = {}
+        self._enemy_info: Dict[str, Dict] = {}
+        self._targets: Dict[str, Set[str]] = {}  # member ID -> enemy IDs in its range
+        self._hunters: Dict[str, Set[str]] = {}  # enemy ID -> member IDs it is in range of
+        self._loaded_alliances: Set[int] = set()
+        self._notifier: Optional[Callable[[List[Dict]], Awaitable]] = None
+        self._stats = {'refreshes': 0, 'recomputed': 0, 'entered': 0, 'left': 0, 'last_refresh_ms': 0.0}
+
+    def _load(self) -> List[int]:
+        try:
+            if os.path.exists(self.path):
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    return [int(alliance_id) for alliance_id in json.load(f).get('alliances', [])]
+        except Exception as e:
+            logger.error(f"Error loading range watchlist: {e}")
+        return []
+
+    def _save(self) -> None:
+        """Atomically write the watched alliances to disk."""
+        try:
+            directory = os.path.dirname(self.path) or '.'
+            os.makedirs(directory, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.range_watchlist.', suffix='.tmp')
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump({'alliances': self.alliance_ids}, f, indent=2)
+            os.replace(tmp_path, self.path)
+        except Exception as e:
+            logger.error(f"Error saving range watchlist: {e}")
+
+    def add_alliance(self, alliance_id: int) -> bool:
+        """Watch an enemy alliance. Returns False if it was already watched."""
+        if alliance_id in self.alliance_ids or alliance_id == self.alliance_id:
+            return False
+        self.alliance_ids.append(alliance_id)
+        self._save()
+        return True
+
+    def remove_alliance(self, alliance_id: int) -> bool:
+        """Stop watching an enemy alliance. Returns False if it wasn't watched."""
+        if alliance_id not in self.alliance_ids:
+            return False
+        self.alliance_ids.remove(alliance_id)
+        self._save()
+        return True
+
+    def _enemy_band(self, member_score: float) -> Tuple[float, float]:
+        spread = GameConstants.WAR_RANGE_MULTIPLIER
+        return member_score * (1 - spread), member_score * (1 + spread)
+
+    def _member_band(self, enemy_score: float) -> Tuple[float, float]:
+        # Members whose enemy band covers `enemy_score`
+        spread = GameConstants.WAR_RANGE_MULTIPLIER
+        return enemy_score / (1 + spread), enemy_score / (1 - spread)
+
+    def _in_range(self, member_id: str, enemy_id: str) -> bool:
+        return self.war_service.is_in_war_range(self._members.scores[member_id], self._enemies.scores[enemy_id])
+
+    def _sync_index(self, index: ScoreIndex, info: Dict[str, Dict], nations: Iterable[Dict]) -> Tuple[Set[str], Set[str], Set[str]]:
+        """Bring an index in line with `nations`. Returns (added, moved, removed) IDs."""
+        seen = set()
+        added, moved = set(), set()
+        for nation in nations:
+            nation_id = str(nation.get('id'))
+            seen.add(nation_id)
+            is_new = nation_id not in index.scores
+            if index.set(nation_id, float(nation.get('score') or 0)):
+                (added if is_new else moved).add(nation_id)
+            info[nation_id] = nation
+        removed = set(index.scores) - seen
+        for nation_id in removed:
+            index.remove(nation_id)
+            info.pop(nation_id, None)
+        return added, moved, removed
+
+    def update(self, members: List[Dict], enemies: List[Dict], new_alliances: Set[int] = frozenset()) -> Tuple[Set[Tuple[str, str]], Set[Tuple[str, str]]]:
+        """Apply a refresh of both sides. Returns the (member ID, enemy ID) pairs that entered and left range."""
+        members_added, members_moved, members_removed = self._sync_index(self._members, self._member_info, members)
+        enemies_added, enemies_moved, enemies_removed = self._sync_index(self._enemies, self._enemy_info, enemies)
+
+        # Pairs touching a changed nation, before and after
+        old_pairs = set()
+        for member_id in members_added | members_moved | members_removed:
+            old_pairs.update((member_id, enemy_id) for enemy_id in self._targets.get(member_id, ()))
+        for enemy_id in enemies_added | enemies_moved | enemies_removed:
+            old_pairs.update((member_id, enemy_id) for member_id in self._hunters.get(enemy_id, ()))
+
+        new_pairs = set()
+        for member_id in members_added | members_moved:
+            for enemy_id in self._enemies.between(*self._enemy_band(self._members.scores[member_id])):
+                if self._in_range(member_id, enemy_id):
+                    new_pairs.add((member_id, enemy_id))
+        for enemy_id in enemies_added | enemies_moved:
+            for member_id in self._members.between(*self._member_band(self._enemies.scores[enemy_id])):
+                if self._in_range(member_id, enemy_id):
+                    new_pairs.add((member_id, enemy_id))
+
+        for member_id, enemy_id in old_pairs - new_pairs:
+            self._targets[member_id].discard(enemy_id)
+            self._hunters[enemy_id].discard(member_id)
+        for member_id, enemy_id in new_pairs - old_pairs:
+            self._targets.setdefault(member_id, set()).add(enemy_id)
+            self._hunters.setdefault(enemy_id, set()).add(member_id)
+        for member_id in members_removed:
+            self._targets.pop(member_id, None)
+        for enemy_id in enemies_removed:
+            self._hunters.pop(enemy_id, None)
+
+        self._stats['recomputed'] += len(members_added | members_moved) + len(enemies_added | enemies_moved)
+
+        # New members, removed nations and freshly watched alliances aren't range changes
+        def reportable(pair: Tuple[str, str]) -> bool:
+            member_id, enemy_id = pair
+            enemy = self._enemy_info.get(enemy_id)
+            return (member_id not in members_added | members_removed and enemy_id not in enemies_removed
+                    and not (enemy and enemy.get('alliance_id') and int(enemy['alliance_id']) in new_alliances))
+
+        entered = {pair for pair in new_pairs - old_pairs if reportable(pair)}
+        left = {pair for pair in old_pairs - new_pairs if reportable(pair)}
+        return entered, left
+
+    def group_changes(self, entered: Set[Tuple[str, str]], left: Set[Tuple[str, str]]) -> List[Dict]:
+        """Changes per enemy: {'enemy', 'entered': [members], 'left': [members]}, most members first."""
+        changes: Dict[str, Dict] = {}
+        for kind, pairs in (('entered', entered), ('left', left)):
+            for member_id, enemy_id in pairs:
+                change = changes.setdefault(enemy_id, {'enemy': self._enemy_info.get(enemy_id, {'id': enemy_id}),
+                                                       'entered': [], 'left': []})
+                change[kind].append(self._member_info.get(member_id, {'id': member_id}))
+        return sorted(changes.values(), key=lambda change: -(len(change['entered']) + len(change['left'])))
+
+    async def refresh(self) -> List[Dict]:
+        """Refresh members and watched alliances from their snapshots and return range changes."""
+        started = time.perf_counter()
+        snapshot = await alliance_snapshot_service.get_snapshot(self.alliance_id)
+        if snapshot is None:
+            logger.warning("No alliance snapshot available for the range watchlist")
+            return []
+
+        enemies = []
+        loaded = set()
+        for alliance_id in list(self.alliance_ids):
+            enemy_snapshot = await alliance_snapshot_service.get_snapshot(alliance_id)
+            if enemy_snapshot is None:
+                # Keep the alliance's last known nations rather than reporting them all as gone
+                enemies.extend(nation for nation in self._enemy_info.values()
+                               if nation.get('alliance_id') and int(nation['alliance_id']) == alliance_id)
+                continue
+            enemies.extend(enemy_snapshot.members)
+            loaded.add(alliance_id)
+
+        members = [member for member in snapshot.members if not member.get('vmode')]
+        new_alliances = loaded - self._loaded_alliances
+        entered, left = self.update(members, enemies, new_alliances)
+        self._loaded_alliances = loaded | (self._loaded_alliances & set(self.alliance_ids))
+
+        self._stats['refreshes'] += 1
+        self._stats['entered'] += len(entered)
+        self._stats['left'] += len(left)
+        self._stats['last_refresh_ms'] = round((time.perf_counter() - started) * 1000, 1)
+        if entered or left:
+            logger.info(f"Range watchlist: {len(entered)} pairs entered range, {len(left)} left")
+        return self.group_changes(entered, left)
+
+    def set_notifier(self, notifier: Callable[[List[Dict]], Awaitable]) -> None:
+        """Set `await notifier(changes)`, called after each refresh with any range changes."""
+        self._notifier = notifier
+
+    async def run(self) -> None:
+        """Background task refreshing the watchlist while any alliance is watched."""
+        while True:
+            try:
+                if self.alliance_ids:
+                    changes = await self.refresh()
+                    if changes and self._notifier:
+                        await self._notifier(changes)
+            except Exception as e:
+                logger.error(f"Error in range watchlist task: {e}")
+            await asyncio.sleep(config.RANGE_WATCH_INTERVAL)
+
+    def get_targets(self, member_id) -> List[Dict]:
+        """Watched enemy nations currently in a member's range, highest score first."""
+        enemy_ids = self._targets.get(str(member_id), ())
+        return sorted((self._enemy_info[enemy_id] for enemy_id in enemy_ids),
+                      key=lambda enemy: -self._enemies.scores[str(enemy.get('id'))])
+
+    def get_stats(self) -> Dict:
+        """Get watchlist sizes and refresh counts."""
+        return {
+            'alliances': list(self.alliance_ids),
+            'members': len(self._members.scores),
+            'enemies': len(self._enemies.scores),
+            'pairs': sum(len(enemy_ids) for enemy_ids in self._targets.values()),
+            **self._stats
+        }
+
+# Global range watchlist service instance
+range_watchlist_service = RangeWatchlistService()
@@ -0,0 +1,138 @@
+"""
+In-memory registration store with write-through to registrations.json.
+"""
+
+import json
+import os
+import tempfile
+import threading
+import logging
+from datetime import datetime, timezone
+from typing import Dict, Optional, Any
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.settings import config
+
+logger = logging.getLogger('raiden_shogun')
+
+class RegistrationStore:
+    """Keeps discord_id -> registration and nation_id -> discord_id maps in memory.
+
+    The file is re-read only when its mtime changes (e.g. edited by hand), and
+    every write goes to a temp file that is atomically swapped in.
+    """
+
+    def __init__(self, path: str = None):
+        self.path = path or os.path.join(config.JSON_DIR, "registrations.json")
+        self._registrations = {}  # discord_id -> registration data
+        self._by_nation = {}  # nation_id (str) -> discord_id
+        self._mtime = None
+        self._lock = threading.RLock()
+
+    def _ensure_loaded(self) -> None:
+        """Reload from disk if the file changed since it was last read."""
+        try:
+            mtime = os.path.getmtime(self.path)
+        except OSError:
+            mtime = None
+
+        if mtime == self._mtime:
+            return
+
+        with self._lock:
+            if mtime == self._mtime:
+                return
+            registrations = {}
+            if mtime is not None:
+                try:
+                    with open(self.path, 'r', encoding='utf-8') as f:
+                        registrations = json.load(f)
+                except Exception as e:
+                    logger.error(f"Error loading registrations: {e}")
+                    # Keep serving the last good copy rather than dropping everyone
+                    return
+            self._set(registrations)
+            self._mtime = mtime
+
+    def _set(self, registrations: Dict[str, Dict]) -> None:
+        self._registrations = registrations
+        self._by_nation = {}
+        for discord_id, data in registrations.items():
+            nation_id = data.get('nation_id')
+            if nation_id is not None:
+                # First registration wins, matching the old linear scan
+                self._by_nation.setdefault(str(nation_id), discord_id)
+
+    def _write(self) -> None:
+        """Atomically write the current registrations to disk."""
+        directory = os.path.dirname(self.path) or '.'
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.registrations.', suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(self._registrations, f, indent=2)
+            os.replace(tmp_path, self.path)
+            self._mtime = os.path.getmtime(self.path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def get_all(self) -> Dict[str, Dict]:
+        """Get a copy of all registrations keyed by Discord ID."""
+        self._ensure_loaded()
+        return dict(self._registrations)
+
+    def get_by_discord(self, discord_id: str) -> Optional[Dict]:
+        """Get a registration by Discord ID."""
+        self._ensure_loaded()
+        return self._registrations.get(str(discord_id))
+
+    def get_nation_id(self, discord_id: str) -> Optional[int]:
+        """Get the nation ID registered to a Discord ID."""
+        data = self.get_by_discord(discord_id)
+        return data.get('nation_id') if data else None
+
+    def get_discord_id(self, nation_id: Any) -> Optional[str]:
+        """Get the Discord ID registered to a nation."""
+        self._ensure_loaded()
+        return self._by_nation.get(str(nation_id))
+
+    def get_by_nation(self, nation_id: Any) -> Optional[Dict]:
+        """Get a registration by nation ID."""
+        discord_id = self.get_discord_id(nation_id)
+        return self._registrations.get(discord_id) if discord_id else None
+
+    def get_discord_username(self, nation_id: Any) -> Optional[str]:
+        """Get the registered Discord username for a nation, or None if not registered."""
+        data = self.get_by_nation(nation_id)
+        if not data:
+            return None
+        # Prefer discord_username (exact username) over discord_name (display name)
+        return data.get('discord_username', data.get('discord_name', 'N/A'))
+
+    def register(self, discord_id: str, nation_id: int, discord_name: str, nation_name: str) -> None:
+        """Register a user with their nation and write through to disk."""
+        self._ensure_loaded()
+        with self._lock:
+            registrations = dict(self._registrations)
+            registrations[str(discord_id)] = {
+                'nation_id': nation_id,
+                'discord_name': discord_name,  # Keep for compatibility
+                'discord_username': discord_name,  # Exact username
+                'nation_name': nation_name,
+                'registered_at': datetime.now(timezone.utc).isoformat()
+            }
+            # Registrations are rare, so just rebuild the reverse index
+            self._set(registrations)
+            self._write()
+
+    def replace_all(self, registrations: Dict[str, Dict]) -> None:
+        """Replace every registration and write through to disk."""
+        with self._lock:
+            self._set(dict(registrations))
+            self._write()
+
+# Global registration store instance
+registration_store = RegistrationStore()
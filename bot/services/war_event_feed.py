@@ -0,0 +1,222 @@
+"""
+War event feed: new wars (and other war events) pushed from the game's subscription socket,
+with polling as the fallback when the socket is unavailable.
+"""
+
+import asyncio
+import json
+import time
+import logging
+from typing import Awaitable, Callable, Dict, List, Optional
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import aiohttp
+
+from api.politics_war_api import api
+from config.settings import config
+from utils.poll_scheduler import AdaptivePollScheduler
+
+logger = logging.getLogger('raiden_shogun')
+
+class FeedStream:
+    """One subscribed model (e.g. 'war'), its handler and how to poll it."""
+
+    def __init__(self, model: str, handler: Callable[[List[Dict]], Awaitable], poll: Callable[[int], Awaitable],
+                 cursor: Callable[[], int]):
+        self.model = model
+        self.handler = handler  # await handler(items) with new items, oldest first
+        self.poll = poll  # await poll(min_id) -> items with id >= min_id, or None on failure
+        self.cursor = cursor  # highest id already handled
+        self.behind = False  # the handler left the cursor below items it was given (e.g. alerts failed)
+
+class WarEventFeed:
+    """Delivers new items for each registered stream exactly once, in id order.
+
+    While the push socket is connected, items arrive as the game publishes them. When it
+    can't connect, the feed polls on an AdaptivePollScheduler (fast around turn changes and
+    blitzes, backing off while nothing happens, within a daily call budget) and retries
+    the socket with exponential backoff. Every (re)connect starts with a catch-up poll so
+    nothing declared while disconnected is missed.
+    """
+
+    def __init__(self):
+        self._streams: Dict[str, FeedStream] = {}
+        self.mode = 'idle'
+        self.scheduler = AdaptivePollScheduler(
+            min_interval=config.WAR_MONITOR_MIN_INTERVAL,
+            base_interval=config.WAR_MONITOR_INTERVAL,
+            max_interval=config.WAR_MONITOR_MAX_INTERVAL,
+            daily_budget=config.WAR_POLL_DAILY_BUDGET,
+            turn_window=config.WAR_POLL_TURN_WINDOW,
+            burst_window=config.WAR_POLL_BURST_WINDOW
+        )
+        self.poll_interval = config.WAR_MONITOR_INTERVAL
+        self.last_event_at: Optional[float] = None
+        self._stats = {'push_events': 0, 'polls': 0, 'push_connects': 0, 'push_failures': 0}
+
+    def register(self, model: str, handler: Callable[[List[Dict]], Awaitable], poll: Callable[[int], Awaitable],
+                 cursor: Callable[[], int]) -> None:
+        """Register a stream. Streams must be registered before run() starts."""
+        self._streams[model] = FeedStream(model, handler, poll, cursor)
+
+    async def _deliver(self, stream: FeedStream, items: List[Dict]) -> int:
+        """Pass items newer than the stream's cursor to its handler. Returns how many were new."""
+        cursor = stream.cursor()
+        fresh = {}
+        for item in items:
+            try:
+                item_id = int(item.get('id', 0))
+            except (TypeError, ValueError):
+                logger.warning(f"Ignoring {stream.model} event with invalid id: {item.get('id')}")
+                continue
+            if item_id > cursor:
+                fresh[item_id] = item
+        if not fresh:
+            return 0
+        self.last_event_at = time.time()
+        try:
+            await stream.handler([fresh[item_id] for item_id in sorted(fresh)])
+        except Exception as e:
+            logger.error(f"Error handling {stream.model} events: {e}")
+        stream.behind = stream.cursor() < max(fresh)
+        return len(fresh)
+
+    async def _deliver_pushed(self, stream: FeedStream, items: List[Dict]) -> int:
+        """Deliver pushed items, first re-polling from the cursor if the stream fell behind.
+
+        Otherwise a newer pushed item would carry the cursor past the items the handler held
+        back. If that poll fails nothing is delivered; the next catch-up covers these items too.
+        """
+        if stream.behind:
+            polled = await stream.poll(stream.cursor() + 1)
+            self._stats['polls'] += 1
+            if polled is None:
+                logger.warning(f"Catch-up poll for {stream.model} events failed, holding pushed events")
+                return 0
+            items = list(polled) + list(items)
+        return await self._deliver(stream, items)
+
+    async def poll_once(self) -> int:
+        """Poll every stream from its cursor. Returns how many new items were delivered."""
+        delivered = 0
+        for stream in self._streams.values():
+            items = await stream.poll(stream.cursor() + 1)
+            self._stats['polls'] += 1
+            if items:
+                delivered += await self._deliver(stream, items)
+        self.scheduler.record_poll(delivered, calls=len(self._streams))
+        return delivered
+
+    async def _poll_until(self, deadline: float) -> None:
+        """Poll until the deadline at the scheduler's interval."""
+        while time.monotonic() < deadline:
+            try:
+                await self.poll_once()
+            except Exception as e:
+                logger.error(f"Error polling war feed: {e}")
+            self.poll_interval = round(self.scheduler.next_interval(calls_per_poll=len(self._streams)), 1)
+            await asyncio.sleep(min(self.poll_interval, max(deadline - time.monotonic(), 0)))
+
+    async def _run_push(self) -> None:
+        """Connect to the push socket, subscribe every stream and deliver events until the socket drops."""
+        timeout = aiohttp.ClientTimeout(total=None, sock_connect=30)
+        async with aiohttp.ClientSession(timeout=timeout) as session:
+            async with session.ws_connect(config.WAR_FEED_SOCKET_URL) as ws:
+                established = await ws.receive_json(timeout=30)
+                if established.get('event') != 'pusher:connection_established':
+                    raise ConnectionError(f"Unexpected handshake: {established.get('event')}")
+                socket_id = json.loads(established['data'])['socket_id']
+
+                channels = {}
+                for stream in self._streams.values():
+                    channel = await api.subscribe_channel(stream.model)
+                    auth = await api.authorize_channel(socket_id, channel) if channel else None
+                    if not channel or not auth:
+                        raise ConnectionError(f"Could not subscribe to {stream.model} events")
+                    await ws.send_json({'event': 'pusher:subscribe', 'data': {'channel': channel, 'auth': auth}})
+                    channels[channel] = stream
+
+                self.mode = 'push'
+                self._stats['push_connects'] += 1
+                logger.info(f"War feed connected to push socket ({', '.join(self._streams)})")
+
+                # Cover anything published while we weren't subscribed
+                await self.poll_once()
+
+                awaiting_pong = False
+                while True:
+                    try:
+                        msg = await ws.receive(timeout=config.WAR_FEED_ACTIVITY_TIMEOUT)
+                    except asyncio.TimeoutError:
+                        # Quiet socket: ping once, reconnect if it stays silent
+                        if awaiting_pong:
+                            raise ConnectionError("Push socket stopped responding")
+                        awaiting_pong = True
+                        await ws.send_json({'event': 'pusher:ping', 'data': {}})
+                        continue
+                    awaiting_pong = False
+                    if msg.type != aiohttp.WSMsgType.TEXT:
+                        raise ConnectionError(f"Push socket closed ({msg.type})")
+                    payload = json.loads(msg.data)
+                    event = payload.get('event', '')
+                    if event == 'pusher:ping':
+                        await ws.send_json({'event': 'pusher:pong', 'data': {}})
+                        continue
+                    if event == 'pusher:error':
+                        raise ConnectionError(f"Push socket error: {payload.get('data')}")
+                    stream = channels.get(payload.get('channel'))
+                    if stream is None or event.startswith('pusher'):
+                        continue
+
+                    data = payload.get('data')
+                    if isinstance(data, str):
+                        data = json.loads(data)
+                    # BULK_ events carry a list, the rest a single item
+                    items = data if isinstance(data, list) else [data]
+                    self._stats['push_events'] += len(items)
+                    await self._deliver_pushed(stream, items)
+
+    async def run(self) -> None:
+        """Background task: push when possible, poll otherwise."""
+        if not self._streams:
+            logger.info("No war feed streams registered, war feed not started")
+            return
+
+        retry_delay = config.WAR_MONITOR_INTERVAL
+        while True:
+            if config.WAR_FEED_PUSH_ENABLED:
+                started = time.monotonic()
+                try:
+                    await self._run_push()
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    self._stats['push_failures'] += 1
+                    logger.warning(f"War feed push unavailable, polling instead: {e}")
+                # A connection that stayed up a while resets the backoff
+                if time.monotonic() - started > config.WAR_FEED_RETRY_MAX:
+                    retry_delay = config.WAR_MONITOR_INTERVAL
+                else:
+                    retry_delay = min(retry_delay * 2, config.WAR_FEED_RETRY_MAX)
+                poll_for = retry_delay
+            else:
+                poll_for = config.WAR_FEED_RETRY_MAX
+
+            self.mode = 'poll'
+            await self._poll_until(time.monotonic() + poll_for)
+
+    def get_stats(self) -> Dict:
+        """Get feed mode and counters."""
+        return {
+            'mode': self.mode,
+            'poll_interval': self.poll_interval,
+            'last_event_at': self.last_event_at,
+            'streams': list(self._streams),
+            'scheduler': self.scheduler.get_stats(),
+            **self._stats
+        }
+
+# Global war event feed instance
+war_event_feed = WarEventFeed()
@@ -0,0 +1,239 @@
+"""
+Persistent war history in SQLite, fed by the war monitor, the war state tracker and the wars CSV.
+"""
+
+import csv
+import io
+import json
+import os
+import sqlite3
+import threading
+import logging
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.settings import config
+
+logger = logging.getLogger('raiden_shogun')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS wars (
+    id INTEGER PRIMARY KEY,
+    date TEXT,
+    att_id INTEGER,
+    def_id INTEGER,
+    att_alliance_id INTEGER,
+    def_alliance_id INTEGER,
+    war_type TEXT,
+    reason TEXT,
+    winner_id INTEGER,
+    ended TEXT,
+    loot_money REAL,
+    loot TEXT
+);
+CREATE INDEX IF NOT EXISTS wars_att_id ON wars (att_id, date);
+CREATE INDEX IF NOT EXISTS wars_def_id ON wars (def_id, date);
+CREATE INDEX IF NOT EXISTS wars_att_alliance ON wars (att_alliance_id, date);
+CREATE INDEX IF NOT EXISTS wars_def_alliance ON wars (def_alliance_id, date);
+CREATE INDEX IF NOT EXISTS wars_date ON wars (date);
+CREATE TABLE IF NOT EXISTS imports (
+    name TEXT PRIMARY KEY,
+    rows INTEGER
+);
+"""
+
+# Known values win over NULLs, so partial sources (a declaration, a result) never blank a row
+UPSERT = """
+INSERT INTO wars (id, date, att_id, def_id, att_alliance_id, def_alliance_id, war_type, reason,
+                  winner_id, ended, loot_money, loot)
+VALUES (:id, :date, :att_id, :def_id, :att_alliance_id, :def_alliance_id, :war_type, :reason,
+        :winner_id, :ended, :loot_money, :loot)
+ON CONFLICT(id) DO UPDATE SET
+    date = COALESCE(excluded.date, date),
+    att_id = COALESCE(excluded.att_id, att_id),
+    def_id = COALESCE(excluded.def_id, def_id),
+    att_alliance_id = COALESCE(excluded.att_alliance_id, att_alliance_id),
+    def_alliance_id = COALESCE(excluded.def_alliance_id, def_alliance_id),
+    war_type = COALESCE(excluded.war_type, war_type),
+    reason = COALESCE(excluded.reason, reason),
+    winner_id = COALESCE(excluded.winner_id, winner_id),
+    ended = COALESCE(excluded.ended, ended),
+    loot_money = COALESCE(excluded.loot_money, loot_money),
+    loot = COALESCE(excluded.loot, loot)
+"""
+
+# Column names used by the API and by the wars CSV for each stored field
+FIELD_SOURCES = {
+    'id': ('id', 'war_id'),
+    'date': ('date', 'date_created'),
+    'att_id': ('att_id', 'aggressor_nation_id', 'attacker_id'),
+    'def_id': ('def_id', 'defender_nation_id', 'defender_id'),
+    'att_alliance_id': ('att_alliance_id', 'aggressor_alliance_id'),
+    'def_alliance_id': ('def_alliance_id', 'defender_alliance_id'),
+    'war_type': ('war_type',),
+    'reason': ('reason', 'war_reason'),
+    'winner_id': ('winner_id', 'winner'),
+}
+INTEGER_FIELDS = {'id', 'att_id', 'def_id', 'att_alliance_id', 'def_alliance_id', 'winner_id'}
+
+def _normalize_date(value: Optional[str]) -> Optional[str]:
+    """'YYYY-MM-DD HH:MM:SS' from the API's ISO timestamps or the CSV's dates, so ranges compare as text."""
+    if not value:
+        return None
+    return str(value)[:19].replace('T', ' ')
+
+def _war_row(war: Dict) -> Optional[Dict[str, Any]]:
+    """Stored row for a war from the API or the CSV, None if it has no usable ID."""
+    row = {}
+    for field, sources in FIELD_SOURCES.items():
+        value = next((war[key] for key in sources if war.get(key) not in (None, '')), None)
+        if value is not None and field in INTEGER_FIELDS:
+            try:
+                value = int(value)
+            except (TypeError, ValueError):
+                value = None
+        row[field] = value
+    if not row['id']:
+        return None
+    row['date'] = _normalize_date(row['date'])
+    row.update(ended=None, loot_money=None, loot=None)
+    return row
+
+class WarHistoryStore:
+    """Every war the bot has seen, in data/war_history.db.
+
+    Wars are indexed by attacker, defender, both alliances and declaration date. Results
+    (winner, end date and what the winner looted) are added when the war ends.
+    """
+
+    def __init__(self, path: str = None):
+        self.path = path or config.WAR_HISTORY_DB
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+            self._conn = conn
+        return self._conn
+
+    def _write(self, sql: str, rows: List[Dict]) -> int:
+        if not rows:
+            return 0
+        try:
+            with self._lock:
+                conn = self._connect()
+                with conn:
+                    conn.executemany(sql, rows)
+            return len(rows)
+        except Exception as e:
+            logger.error(f"Error writing war history: {e}")
+            return 0
+
+    def _query(self, sql: str, params=()) -> List[sqlite3.Row]:
+        try:
+            with self._lock:
+                return self._connect().execute(sql, params).fetchall()
+        except Exception as e:
+            logger.error(f"Error querying war history: {e}")
+            return []
+
+    def record_wars(self, wars: Iterable[Dict]) -> int:
+        """Store wars from the API or the wars CSV. Returns how many rows were written."""
+        rows = [row for row in map(_war_row, wars) if row]
+        return self._write(UPSERT, rows)
+
+    def import_wars_csv(self, date: str, csv_content: str) -> int:
+        """Store every war in the daily wars CSV dump for `date`, once per dump. Returns how many rows were written."""
+        name = f"wars-{date}"
+        if self._query("SELECT 1 FROM imports WHERE name = ?", (name,)):
+            return 0
+        if csv_content.startswith('\ufeff'):
+            csv_content = csv_content[1:]
+        written = self.record_wars(csv.DictReader(io.StringIO(csv_content)))
+        if written:
+            self._write("INSERT OR REPLACE INTO imports (name, rows) VALUES (:name, :rows)", [{'name': name, 'rows': written}])
+            logger.info(f"Imported {written} wars from {name} into the war history")
+        return written
+
+    def record_results(self, results: Iterable[Tuple[int, int, Dict[str, float], Optional[str]]]) -> int:
+        """Store how wars ended as (war ID, winner ID, loot, end date) tuples, winner 0 = peace or expiry.
+
+        Loot is what the winner looted. Returns how many rows were written.
+        """
+        rows = []
+        for war_id, winner_id, loot, ended in results:
+            loot = {resource: amount for resource, amount in (loot or {}).items() if amount}
+            rows.append({
+                'id': int(war_id), 'date': None, 'att_id': None, 'def_id': None, 'att_alliance_id': None,
+                'def_alliance_id': None, 'war_type': None, 'reason': None, 'winner_id': int(winner_id or 0),
+                'ended': _normalize_date(ended), 'loot_money': loot.get('money', 0.0), 'loot': json.dumps(loot)
+            })
+        return self._write(UPSERT, rows)
+
+    def _record(self, side: str, where: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        """Win/loss and loot aggregates over wars matching `where`, from the side where `side` is true on offense."""
+        rows = self._query(f"""
+            SELECT
+                COUNT(*) AS wars,
+                SUM(is_att) AS offensive,
+                SUM(1 - is_att) AS defensive,
+                SUM(won) AS wins,
+                SUM(lost) AS losses,
+                SUM(CASE WHEN won THEN loot_money ELSE 0 END) AS loot_gained,
+                SUM(CASE WHEN lost THEN loot_money ELSE 0 END) AS loot_lost
+            FROM (
+                SELECT
+                    is_att,
+                    winner_id > 0 AND winner_id = CASE WHEN is_att THEN att_id ELSE def_id END AS won,
+                    winner_id > 0 AND winner_id = CASE WHEN is_att THEN def_id ELSE att_id END AS lost,
+                    COALESCE(loot_money, 0) AS loot_money
+                FROM (SELECT *, ({side}) AS is_att FROM wars WHERE {where})
+            )
+        """, params)
+        record = {key: value or 0 for key, value in dict(rows[0]).items()} if rows else {}
+        decided = record.get('wins', 0) + record.get('losses', 0)
+        record['win_rate'] = record['wins'] / decided if decided else None
+        record['loot_per_win'] = record['loot_gained'] / record['wins'] if record.get('wins') else 0.0
+        return record
+
+    def get_nation_record(self, nation_id: int, since: str = None) -> Dict[str, Any]:
+        """Wars, wins, losses, win rate and loot for a nation, optionally only wars declared since `since`."""
+        where = "(att_id = :id OR def_id = :id)"
+        if since:
+            where += " AND date >= :since"
+        return self._record("att_id = :id", where, {'id': int(nation_id), 'since': _normalize_date(since)})
+
+    def get_alliance_record(self, alliance_id: int, vs_alliance_id: int = None, since: str = None) -> Dict[str, Any]:
+        """Wars, wins, losses, win rate and loot for an alliance, optionally only against another alliance."""
+        if vs_alliance_id:
+            where = ("((att_alliance_id = :id AND def_alliance_id = :vs)"
+                     " OR (def_alliance_id = :id AND att_alliance_id = :vs))")
+        else:
+            where = "(att_alliance_id = :id OR def_alliance_id = :id)"
+        if since:
+            where += " AND date >= :since"
+        params = {'id': int(alliance_id), 'vs': int(vs_alliance_id or 0), 'since': _normalize_date(since)}
+        return self._record("att_alliance_id = :id", where, params)
+
+    def get_loot_lost(self, nation_id: int, limit: int = 20) -> List[float]:
+        """Money looted from a nation in its most recent lost wars, newest first."""
+        rows = self._query("""
+            SELECT loot_money FROM wars
+            WHERE (att_id = :id OR def_id = :id) AND winner_id > 0 AND winner_id != :id AND loot_money IS NOT NULL
+            ORDER BY id DESC LIMIT :limit
+        """, {'id': int(nation_id), 'limit': int(limit)})
+        return [row['loot_money'] for row in rows]
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get stored war counts."""
+        rows = self._query("SELECT COUNT(*) AS wars, SUM(winner_id IS NOT NULL) AS resolved, MAX(id) AS highest_id FROM wars")
+        return {key: value or 0 for key, value in dict(rows[0]).items()} if rows else {}
+
+# Global war history store instance
+war_history_store = WarHistoryStore()
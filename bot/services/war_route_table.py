@@ -0,0 +1,131 @@
+"""
+Routing table for war alerts: which guild channels (and roles) follow which alliances.
+"""
+
+import json
+import os
+import tempfile
+import logging
+from typing import Dict, List, Optional, Tuple
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.settings import config
+
+logger = logging.getLogger('raiden_shogun')
+
+def _alliance_id(war: Dict, field: str, side: str) -> Optional[int]:
+    # Polled wars carry both the ID and the nation's alliance, pushed wars only the ID
+    value = war.get(field) or ((war.get(side) or {}).get('alliance') or {}).get('id')
+    try:
+        return int(value) if value else None
+    except (TypeError, ValueError):
+        return None
+
+def war_alliance_ids(war: Dict) -> Tuple[Optional[int], Optional[int]]:
+    """(attacker alliance ID, defender alliance ID) of a polled or pushed war, None for no alliance."""
+    return _alliance_id(war, 'att_alliance_id', 'attacker'), _alliance_id(war, 'def_alliance_id', 'defender')
+
+class WarRouteTable:
+    """Routes are {'alliance_id', 'guild_id', 'channel_id', 'role_id'} dicts, indexed by alliance ID.
+
+    The war monitor fetches the global war feed once and looks up each war's attacker and
+    defender alliances here, so serving more alliances or guilds adds no API calls. Routes are
+    stored in data/war_routes.json; until that file exists the table holds a single route built
+    from ALLIANCE_ID, WAR_MONITOR_CHANNEL_ID and WAR_ALERT_ROLE_ID.
+    """
+
+    def __init__(self, path: str = None):
+        self.path = path or os.path.join(config.JSON_DIR, "war_routes.json")
+        self.routes: List[Dict[str, int]] = self._load()
+        self._index: Dict[int, List[Dict[str, int]]] = {}
+        self._rebuild()
+
+    def _default_routes(self) -> List[Dict[str, int]]:
+        if not config.WAR_MONITOR_CHANNEL_ID:
+            return []
+        return [{
+            'alliance_id': config.ALLIANCE_ID,
+            'guild_id': config.GUILD_ID,
+            'channel_id': config.WAR_MONITOR_CHANNEL_ID,
+            'role_id': config.WAR_ALERT_ROLE_ID
+        }]
+
+    def _load(self) -> List[Dict[str, int]]:
+        try:
+            if os.path.exists(self.path):
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    return [{key: int(route.get(key) or 0) for key in ('alliance_id', 'guild_id', 'channel_id', 'role_id')}
+                            for route in json.load(f).get('routes', [])]
+        except Exception as e:
+            logger.error(f"Error loading war routes: {e}")
+        return self._default_routes()
+
+    def _save(self) -> None:
+        """Atomically write the routes to disk."""
+        try:
+            directory = os.path.dirname(self.path) or '.'
+            os.makedirs(directory, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.war_routes.', suffix='.tmp')
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump({'routes': self.routes}, f, indent=2)
+            os.replace(tmp_path, self.path)
+        except Exception as e:
+            logger.error(f"Error saving war routes: {e}")
+
+    def _rebuild(self) -> None:
+        index = {}
+        for route in self.routes:
+            index.setdefault(route['alliance_id'], []).append(route)
+        self._index = index
+
+    @property
+    def alliance_ids(self) -> frozenset:
+        """Alliances with at least one route."""
+        return frozenset(self._index)
+
+    def add(self, alliance_id: int, guild_id: int, channel_id: int, role_id: int = 0) -> bool:
+        """Route an alliance's wars to a channel (updating the role if the route exists). Returns whether it is new."""
+        for route in self.routes:
+            if route['alliance_id'] == alliance_id and route['channel_id'] == channel_id:
+                route.update(guild_id=guild_id, role_id=role_id)
+                self._save()
+                return False
+        self.routes.append({'alliance_id': alliance_id, 'guild_id': guild_id, 'channel_id': channel_id, 'role_id': role_id})
+        self._rebuild()
+        self._save()
+        return True
+
+    def remove(self, alliance_id: int, guild_id: int, channel_id: int = None) -> int:
+        """Remove an alliance's routes in one guild, optionally only the one to `channel_id`. Returns how many were removed."""
+        kept = [route for route in self.routes
+                if not (route['alliance_id'] == alliance_id and route['guild_id'] == guild_id
+                        and channel_id in (None, route['channel_id']))]
+        removed = len(self.routes) - len(kept)
+        if removed:
+            self.routes = kept
+            self._rebuild()
+            self._save()
+        return removed
+
+    def get_guild_routes(self, guild_id: int) -> List[Dict[str, int]]:
+        """Routes posting into one guild."""
+        return [route for route in self.routes if route['guild_id'] == guild_id]
+
+    def match(self, war: Dict) -> List[Tuple[Dict[str, int], bool]]:
+        """(route, is_defensive) for every channel interested in a war, one entry per channel.
+
+        A channel following both sides gets the defensive alert.
+        """
+        att_alliance_id, def_alliance_id = war_alliance_ids(war)
+        matches = []
+        channels = set()
+        for alliance_id, is_defensive in ((def_alliance_id, True), (att_alliance_id, False)):
+            for route in self._index.get(alliance_id, ()):
+                if route['channel_id'] not in channels:
+                    channels.add(route['channel_id'])
+                    matches.append((route, is_defensive))
+        return matches
+
+# Global war route table instance
+war_route_table = WarRouteTable()
@@ -0,0 +1,325 @@
+"""
+Live state of every war involving alliance members, kept up to date from the war attack feed.
+"""
+
+import asyncio
+import time
+import logging
+from datetime import datetime
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from api.politics_war_api import api
+from config.settings import config
+from services.alliance_snapshot_service import alliance_snapshot_service
+from services.war_history_store import war_history_store
+
+logger = logging.getLogger('raiden_shogun')
+
+TURN_SECONDS = 7200
+MAX_MAPS = 12
+IMMENSE_TRIUMPH = 3
+LOOT_RESOURCES = ['money', 'food', 'coal', 'oil', 'uranium', 'lead', 'iron', 'bauxite',
+                  'gasoline', 'munitions', 'steel', 'aluminum']
+
+# MAPs spent per attack type, matched on prefix (AIRVINFRA, NAVALVSHIPS, MISSILEFAIL, ...)
+MAP_COSTS = (('GROUND', 3), ('AIRV', 4), ('NAVAL', 4), ('MISSILE', 8), ('NUKE', 12), ('FORTIFY', 3))
+# Attacks that end the war
+ENDING_ATTACKS = {'VICTORY', 'PEACE'}
+# Attack types that win each kind of control on an immense triumph
+CONTROL_ATTACKS = (('GROUND', 'groundcontrol'), ('AIRV', 'airsuperiority'), ('NAVAL', 'navalblockade'))
+
+def current_turn(timestamp: float = None) -> int:
+    """Game turn number (turns change every two hours on the UTC clock)."""
+    return int((timestamp or time.time()) // TURN_SECONDS)
+
+def map_cost(attack_type: str) -> int:
+    """MAPs an attack of this type costs."""
+    for prefix, cost in MAP_COSTS:
+        if attack_type.startswith(prefix):
+            return cost
+    return 0
+
+def attack_loot(attack: Dict) -> Dict[str, float]:
+    """Resources the attacking nation looted in an attack."""
+    loot = {}
+    for resource in LOOT_RESOURCES:
+        amount = float(attack.get(f'{resource}_looted') or 0)
+        if amount:
+            loot[resource] = amount
+    return loot
+
+def war_result(attack: Dict) -> Tuple[int, int, Dict[str, float], Optional[str]]:
+    """War history result (war ID, winner ID, loot, end date) of a war-ending attack."""
+    winner_id = attack.get('att_id') if attack.get('type') == 'VICTORY' else 0
+    return int(attack['war_id']), int(winner_id or 0), attack_loot(attack), attack.get('date')
+
+def _attack_turn(attack: Dict) -> int:
+    try:
+        return current_turn(datetime.fromisoformat(attack['date'].replace("Z", "+00:00")).timestamp())
+    except (AttributeError, KeyError, TypeError, ValueError):
+        return current_turn()
+
+class WarStateTracker:
+    """In-memory state of the active wars involving alliance members.
+
+    Wars are seeded from the wars API, then every war attack is applied in ID order: resistance,
+    ground/air/naval control, fortification, MAPs spent and loot taken by each side. MAPs regain
+    one per turn locally, and a periodic re-sync with the API picks up what attacks don't show
+    (new wars nobody has attacked in yet, expiry, peace). Loot is counted from when a war is first
+    tracked.
+    """
+
+    def __init__(self, alliance_id: int = None):
+        self.alliance_id = alliance_id or config.ALLIANCE_ID
+        self.highest_attack_id = 0
+        self.synced_at: Optional[float] = None
+        self._wars: Dict[int, Dict] = {}
+        self._by_nation: Dict[str, Set[int]] = {}
+        self._members: Dict[str, str] = {}  # nation ID -> nation name
+        self._loot = {'gained': dict.fromkeys(LOOT_RESOURCES, 0.0), 'lost': dict.fromkeys(LOOT_RESOURCES, 0.0)}
+        self._lock = asyncio.Lock()
+        self._stats = {'attacks': 0, 'applied': 0, 'syncs': 0, 'wars_fetched': 0}
+        self._war_end_subscribers: List[Callable[[Dict], None]] = []
+
+    def _state_from_row(self, row: Dict, previous: Dict = None) -> Dict:
+        """Tracked state for a war row from the API, keeping loot already counted."""
+        war = dict(row)
+        war['id'] = int(row['id'])
+        for field in ('turns_left', 'att_points', 'def_points', 'att_resistance', 'def_resistance'):
+            war[field] = int(row.get(field) or 0)
+        for field in ('att_id', 'def_id', 'groundcontrol', 'airsuperiority', 'navalblockade'):
+            war[field] = str(row.get(field) or 0)
+        war['loot'] = previous['loot'] if previous else {'att': {}, 'def': {}}
+        war['turn'] = current_turn()
+        return war
+
+    def _add(self, war: Dict) -> None:
+        self._wars[war['id']] = war
+        for nation_id in (war['att_id'], war['def_id']):
+            self._by_nation.setdefault(nation_id, set()).add(war['id'])
+
+    def _remove(self, war_id: int) -> None:
+        war = self._wars.pop(war_id, None)
+        if not war:
+            return
+        for nation_id in (war['att_id'], war['def_id']):
+            wars = self._by_nation.get(nation_id)
+            if wars is not None:
+                wars.discard(war_id)
+                if not wars:
+                    del self._by_nation[nation_id]
+
+    def _advance(self, war: Dict, turn: int) -> None:
+        """Roll a war forward to `turn`: one MAP per side per turn, one turn off the clock."""
+        elapsed = turn - war['turn']
+        if elapsed <= 0:
+            return
+        war['att_points'] = min(war['att_points'] + elapsed, MAX_MAPS)
+        war['def_points'] = min(war['def_points'] + elapsed, MAX_MAPS)
+        war['turns_left'] = max(war['turns_left'] - elapsed, 0)
+        war['turn'] = turn
+
+    def apply_attack(self, attack: Dict) -> bool:
+        """Apply one attack to its war. Returns False if the war isn't tracked."""
+        war = self._wars.get(int(attack.get('war_id') or 0))
+        if war is None:
+            return False
+        self._advance(war, _attack_turn(attack))
+
+        attacker_id = str(attack.get('att_id'))
+        side, other = ('att', 'def') if attacker_id == war['att_id'] else ('def', 'att')
+        attack_type = attack.get('type') or ''
+
+        # Loot goes to whoever made the attack (the winner, for VICTORY)
+        for resource, amount in attack_loot(attack).items():
+            war['loot'][side][resource] = war['loot'][side].get(resource, 0) + amount
+            if attacker_id in self._members:
+                self._loot['gained'][resource] += amount
+            elif str(attack.get('def_id')) in self._members:
+                self._loot['lost'][resource] += amount
+
+        if attack_type in ENDING_ATTACKS:
+            self._remove(war['id'])
+            return True
+
+        war[f'{side}_points'] = max(war[f'{side}_points'] - map_cost(attack_type), 0)
+        war[f'{side}_fortify'] = attack_type == 'FORTIFY'
+        war[f'{other}_resistance'] = max(war[f'{other}_resistance'] - int(attack.get('resistance_eliminated') or 0), 0)
+        if int(attack.get('success') or 0) == IMMENSE_TRIUMPH:
+            for prefix, field in CONTROL_ATTACKS:
+                if attack_type.startswith(prefix):
+                    war[field] = attacker_id
+        war['last_attack_id'] = int(attack['id'])
+        return True
+
+    async def handle_attacks(self, attacks: List[Dict]) -> None:
+        """Feed handler: apply new attacks and start tracking member wars seen for the first time."""
+        untracked = set()
+        results = []
+        async with self._lock:
+            highest_id = self.highest_attack_id
+            for attack in attacks:
+                attack_id = int(attack['id'])
+                if attack_id <= highest_id:
+                    continue
+                highest_id = attack_id
+                self._stats['attacks'] += 1
+                # Every war's result goes to the history, tracked or not
+                if attack.get('type') in ENDING_ATTACKS:
+                    results.append(war_result(attack))
+                    self._notify_war_end(attack)
+                if self.apply_attack(attack):
+                    self._stats['applied'] += 1
+                elif attack.get('type') not in ENDING_ATTACKS and (
+                        str(attack.get('att_id')) in self._members or str(attack.get('def_id')) in self._members):
+                    untracked.add(int(attack['war_id']))
+            self.highest_attack_id = highest_id
+
+        # One write for the whole batch, off the event loop
+        if results:
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(None, war_history_store.record_results, results)
+
+        # Fetched state already includes these attacks, so they aren't applied again
+        if untracked:
+            await self.track_wars(untracked)
+
+    async def poll_attacks(self, min_id: int) -> Optional[List[Dict]]:
+        """Fetch attacks from `min_id` onwards, oldest first, or None on failure (the feed's polling fallback)."""
+        # Live state comes from the wars API, so tracking starts at the newest attack
+        if not self.highest_attack_id:
+            latest_id = await api.get_latest_war_attack_id()
+            if latest_id:
+                self.highest_attack_id = latest_id
+                logger.info(f"War state tracker starting from attack ID {latest_id}")
+            return []
+
+        return await api.get_war_attacks_since(min_id, config.WAR_ATTACK_PAGE_SIZE)
+
+    async def track_wars(self, war_ids: Iterable[int]) -> int:
+        """Fetch and start tracking specific wars (e.g. just declared). Returns how many are active."""
+        rows = await api.get_active_wars(war_ids=sorted(war_ids))
+        if not rows:
+            return 0
+        async with self._lock:
+            added = 0
+            for row in rows:
+                if int(row.get('turns_left') or 0) <= 0:
+                    continue
+                self._add(self._state_from_row(row, self._wars.get(int(row['id']))))
+                added += 1
+        self._stats['wars_fetched'] += added
+        return added
+
+    async def sync(self) -> bool:
+        """Replace tracked state with the alliance's active wars from the API."""
+        members = await alliance_snapshot_service.get_members(self.alliance_id)
+        rows = await api.get_active_wars(alliance_id=self.alliance_id)
+        if rows is None:
+            return False
+
+        async with self._lock:
+            previous = self._wars
+            self._wars = {}
+            self._by_nation = {}
+            for row in rows:
+                self._add(self._state_from_row(row, previous.get(int(row['id']))))
+            if members:
+                self._members = {str(member.get('id')): member.get('nation_name', 'Unknown') for member in members}
+            self.synced_at = time.time()
+        self._stats['syncs'] += 1
+        logger.info(f"War state synced: {len(self._wars)} active wars")
+        return True
+
+    def is_ready(self) -> bool:
+        """Whether tracked state can answer queries."""
+        return self.synced_at is not None
+
+    def get_war(self, war_id: int) -> Optional[Dict]:
+        """Current state of a tracked war (a copy), or None."""
+        war = self._wars.get(int(war_id))
+        if war is None:
+            return None
+        self._advance(war, current_turn())
+        return dict(war) if war['turns_left'] > 0 else None
+
+    def get_wars(self) -> List[Dict]:
+        """Current state of every tracked war."""
+        wars = (self.get_war(war_id) for war_id in list(self._wars))
+        return [war for war in wars if war]
+
+    def get_nation_wars(self, nation_id) -> Optional[Dict]:
+        """Offensive and defensive wars of a member nation, or None if the nation isn't tracked."""
+        nation_id = str(nation_id)
+        if not self.is_ready() or (nation_id not in self._members and nation_id not in self._by_nation):
+            return None
+        wars = (self.get_war(war_id) for war_id in sorted(self._by_nation.get(nation_id, ())))
+        wars = [war for war in wars if war]
+
+        nation_name = self._members.get(nation_id)
+        if not nation_name and wars:
+            nation = wars[0]['attacker'] if wars[0]['att_id'] == nation_id else wars[0]['defender']
+            nation_name = (nation or {}).get('nation_name')
+        return {
+            'id': nation_id,
+            'nation_name': nation_name or 'Unknown',
+            'offensive_wars': [war for war in wars if war['att_id'] == nation_id],
+            'defensive_wars': [war for war in wars if war['def_id'] == nation_id]
+        }
+
+    def get_opponent_ids(self, nation_id) -> Set[str]:
+        """Nations a tracked nation is currently at war with."""
+        nation_id = str(nation_id)
+        opponents = set()
+        for war_id in self._by_nation.get(nation_id, ()):
+            war = self._wars[war_id]
+            opponents.add(war['def_id'] if war['att_id'] == nation_id else war['att_id'])
+        return opponents
+
+    def get_member_ids(self) -> Set[str]:
+        """Member nation IDs as of the last sync."""
+        return set(self._members)
+
+    def get_loot_totals(self) -> Dict[str, Dict[str, float]]:
+        """Loot members took ('gained') and lost in tracked wars since startup."""
+        return {kind: dict(totals) for kind, totals in self._loot.items()}
+
+    def subscribe_war_end(self, callback: Callable[[Dict], None]) -> None:
+        """Register `callback(attack)` for every war-ending (VICTORY/PEACE) attack, tracked war or not."""
+        if callback not in self._war_end_subscribers:
+            self._war_end_subscribers.append(callback)
+
+    def _notify_war_end(self, attack: Dict) -> None:
+        for callback in self._war_end_subscribers:
+            try:
+                callback(attack)
+            except Exception as e:
+                logger.error(f"Error in war end subscriber: {e}")
+
+    def register(self, feed) -> None:
+        """Subscribe to war attacks on the war event feed."""
+        feed.register('warattack', self.handle_attacks, self.poll_attacks, lambda: self.highest_attack_id)
+
+    async def sync_task(self) -> None:
+        """Background task re-syncing tracked wars every WAR_STATE_RECONCILE_INTERVAL seconds."""
+        while True:
+            try:
+                await self.sync()
+            except Exception as e:
+                logger.error(f"Error syncing war state: {e}")
+            await asyncio.sleep(config.WAR_STATE_RECONCILE_INTERVAL)
+
+    def get_stats(self) -> Dict:
+        """Get tracked war counts and ingest counters."""
+        return {
+            'wars': len(self._wars),
+            'highest_attack_id': self.highest_attack_id,
+            'synced_at': self.synced_at,
+            **self._stats
+        }
+
+# Global war state tracker instance
+war_state_tracker = WarStateTracker()
@@ -13,53 +13,55 @@ from utils.logging import get_logger
 
 logger = get_logger('warchest_service')
 
+# City fields read by the warchest kernel, in row order (the founding date is appended last)
+CITY_COLUMNS = (
+    'infrastructure', 'land', 'coalpower', 'oilpower', 'nuclearpower',
+    'steel_mill', 'aluminum_refinery', 'oil_refinery', 'munitions_factory', 'farm',
+    'barracks', 'factory', 'hangar', 'drydock',
+    'coal_mine', 'oil_well', 'uranium_mine', 'iron_mine', 'bauxite_mine', 'lead_mine', 'population'
+)
+
+def _city_rows(cities_data: List[Dict]) -> List[Tuple]:
+    """One CITY_COLUMNS row (plus the founding date) per city dict."""
+    return [
+        tuple(city.get(column, 0) for column in CITY_COLUMNS) + (city.get("date", "2025-01-01"),)
+        for city in cities_data if isinstance(city, dict)
+    ]
+
 class WarchestService:
     """Service for warchest calculations using simple city-based formula."""
     
     def calculate_unit_purchase_costs(self, cities_data: List[Dict], nation_info: Dict) -> float:
         """Calculate money required for 2 days of unit purchases based on improvements and military research."""
-        try:
-            # Check if nation has Propaganda Bureau project (10% bonus to recruitment)
-            has_propaganda_bureau = nation_info.get("propaganda_bureau", False)
-            recruitment_bonus = 1.1 if has_propaganda_bureau else 1.0
-            
-            total_cost = 0
-            
-            for city in cities_data:
-                if not isinstance(city, dict):
-                    continue
-                    
-                # Barracks: 1,000 soldiers per day per barracks (max 3,000 per barracks)
-                barracks = city.get("barracks", 0)
-                soldiers_per_day = min(barracks * 1000, barracks * 3000) * recruitment_bonus
-                soldier_cost = soldiers_per_day * 1.25  # $1.25 per soldier
-                
-                # Factories: 50 tanks per day per factory (max 250 per factory)
-                factories = city.get("factory", 0)
-                tanks_per_day = min(factories * 50, factories * 250) * recruitment_bonus
-                tank_cost = tanks_per_day * 50  # $50 per tank
-                
-                # Hangars: 3 aircraft per day per hangar (max 15 per hangar)
-                hangars = city.get("hangar", 0)
-                aircraft_per_day = min(hangars * 3, hangars * 15) * recruitment_bonus
-                aircraft_cost = aircraft_per_day * 500  # $500 per aircraft
-                
-                # Drydocks: 1 ship per day per drydock (max 5 per drydock)
-                drydocks = city.get("drydock", 0)
-                ships_per_day = min(drydocks * 1, drydocks * 5) * recruitment_bonus
-                ship_cost = ships_per_day * 3375  # $3,375 per ship
-                
-                # Add costs for this city
-                total_cost += (soldier_cost + tank_cost + aircraft_cost + ship_cost) * 2  # 2 days worth
-            
-            return total_cost
-            
-        except Exception as e:
-            logger.error(f"Error calculating unit purchase costs: {e}")
-            return 0
+        return self._unit_purchase_costs_from_rows(_city_rows(cities_data), nation_info)
     
     def calculate_warchest(self, nation_info: Dict[str, Any]) -> Tuple[Optional[Dict], Optional[Dict], Optional[Dict]]:
         """Calculate warchest requirements for a nation using simple city-based formula."""
+        return self._calculate_warchest(nation_info, datetime.now(timezone.utc), {})
+    
+    def calculate_warchest_batch(self, nations_info: List[Dict[str, Any]]) -> List[Tuple[Optional[Dict], Optional[Dict], Optional[Dict]]]:
+        """Calculate warchest requirements for many nations in one pass.
+        
+        Results are identical to calling calculate_warchest per nation, but the current time is taken
+        once and each distinct city founding date is parsed once for the whole batch.
+        """
+        now = datetime.now(timezone.utc)
+        age_modifiers = {}
+        return [self._calculate_warchest(nation_info, now, age_modifiers) for nation_info in nations_info]
+    
+    def _city_age_modifier(self, date: str, now: datetime, age_modifiers: Dict[str, float]) -> float:
+        """Population age modifier for a city founding date, memoized per date string."""
+        modifier = age_modifiers.get(date)
+        if modifier is None:
+            founded = datetime.strptime(date, "%Y-%m-%d").replace(tzinfo=timezone.utc)
+            age = (now - founded).days
+            modifier = 1 + max(math.log(max(age, 1)) / 15, 0)
+            age_modifiers[date] = modifier
+        return modifier
+    
+    def _calculate_warchest(self, nation_info: Dict[str, Any], now: datetime,
+                            age_modifiers: Dict[str, float]) -> Tuple[Optional[Dict], Optional[Dict], Optional[Dict]]:
+        """Warchest kernel shared by the single and batch entry points."""
         try:
             # Get cities data - could be a list of cities or just a count
             cities_data = nation_info.get("cities", [])
@@ -122,6 +124,12 @@ class WarchestService:
                 logger.warning(f"cities_data is not a list: {type(cities_data)} = {cities_data}")
                 cities_data = []
             
+            # Read every city once into a row of CITY_COLUMNS
+            city_rows = _city_rows(cities_data)
+            for city in cities_data:
+                if not isinstance(city, dict):
+                    logger.warning(f"City data is not a dict: {type(city)} = {city}")
+            
             # Initialize totals
             total_coal_consumption = 0
             total_oil_consumption = 0
@@ -137,38 +145,22 @@ class WarchestService:
             total_money_consumption = 0
             
             # Calculate consumption for each city
-            for city in cities_data:
+            for (infrastructure, land, coal_power, oil_power, nuclear_power,
+                 steel_mills, aluminum_refineries, oil_refineries, munitions_factories, farms,
+                 _barracks, _factories, _hangars, _drydocks,
+                 _coal_mines, _oil_wells, _uranium_mines, _iron_mines, _bauxite_mines, _lead_mines,
+                 _population, date) in city_rows:
                 try:
-                    # Ensure city is a dictionary
-                    if not isinstance(city, dict):
-                        logger.warning(f"City data is not a dict: {type(city)} = {city}")
-                        continue
-                        
-                    infrastructure = city.get("infrastructure", 0)
-                    land = city.get("land", 0)
                     # Calculate population from infrastructure (API doesn't provide population)
                     # Use the same formula as the old warchest
                     base_population = int(infrastructure * 100)
                     
-                    # Calculate city age in days
-                    from datetime import datetime, timezone
-                    import math
-                    
-                    date_format = "%Y-%m-%d"
-                    date1 = datetime.now(timezone.utc)
-                    date2 = datetime.strptime(city.get("date", "2025-01-01"), date_format).replace(tzinfo=timezone.utc)
-                    age = (date1 - date2).days
-                    
-                    city_age_modifier = 1 + max(math.log(max(age, 1)) / 15, 0)
+                    # City age in days, parsed once per distinct founding date
+                    city_age_modifier = self._city_age_modifier(date, now, age_modifiers)
                     
                     # EXACT formula from old warchest
                     population = ((base_population ** 2) / 125_000_000) + ((base_population * city_age_modifier - base_population) / 850)
                     
-                    # Power plant consumption
-                    coal_power = city.get("coalpower", 0)
-                    oil_power = city.get("oilpower", 0)
-                    nuclear_power = city.get("nuclearpower", 0)
-                    
                     # Coal power: 1.2 tons per day per 100 infrastructure
                     total_coal_consumption += coal_power * (infrastructure / 100) * 1.2
                     
@@ -178,12 +170,6 @@ class WarchestService:
                     # Nuclear power: 2.4 tons per day per 1000 infrastructure
                     total_uranium_consumption += nuclear_power * (infrastructure / 1000) * 2.4
                     
-                    # Manufacturing consumption
-                    steel_mills = city.get("steel_mill", 0)
-                    aluminum_refineries = city.get("aluminum_refinery", 0)
-                    oil_refineries = city.get("oil_refinery", 0)
-                    munitions_factories = city.get("munitions_factory", 0)
-                    
                     # Steel mills: 3 tons iron + 3 tons coal = 9 tons steel per day
                     total_iron_consumption += steel_mills * 3
                     total_coal_consumption += steel_mills * 3
@@ -201,12 +187,9 @@ class WarchestService:
                     total_lead_consumption += munitions_factories * 6
                     total_munitions_consumption -= munitions_factories * 18  # Munitions production
                     
-                    # Food consumption based on population
                     # Each person consumes 0.1 food per day
                     total_food_consumption += population * 0.1
                     
-                    # Food production from farms
-                    farms = city.get("farm", 0)
                     # Farms produce: Land Area / 500 tons per farm per day
                     total_food_consumption -= farms * (land / 500)
                     
@@ -216,7 +199,7 @@ class WarchestService:
             
             # Calculate money required for 2 days of unit purchases (not upkeep)
             # Based on references.md unit production rates and costs
-            money_for_unit_purchases = self.calculate_unit_purchase_costs(cities_data, nation_info)
+            money_for_unit_purchases = self._unit_purchase_costs_from_rows(city_rows, nation_info)
             total_money_consumption = money_for_unit_purchases
             
             # City count-based resource requirements
@@ -256,7 +239,7 @@ class WarchestService:
             food_required = total_food_consumption * food_uranium_days
             
             # Calculate production over the warchest period and subtract from requirements
-            production = self.calculate_production(nation_info, cities_data, warchest_days)
+            production = self._production_from_rows(city_rows, warchest_days)
             
             # Adjust requirements based on production
             money_required = max(money_required - production.get('money', 0), 0)
@@ -365,6 +348,74 @@ class WarchestService:
             logger.error(f"Error in warchest calculation: {e}")
             return None, None, None
     
+    def _unit_purchase_costs_from_rows(self, city_rows: List[Tuple], nation_info: Dict) -> float:
+        """Money for 2 days of unit purchases over CITY_COLUMNS rows (the one copy of this formula)."""
+        try:
+            # Check if nation has Propaganda Bureau project (10% bonus to recruitment)
+            has_propaganda_bureau = nation_info.get("propaganda_bureau", False)
+            recruitment_bonus = 1.1 if has_propaganda_bureau else 1.0
+            
+            total_cost = 0
+            
+            for row in city_rows:
+                barracks, factories, hangars, drydocks = row[10:14]
+                soldiers_per_day = min(barracks * 1000, barracks * 3000) * recruitment_bonus
+                soldier_cost = soldiers_per_day * 1.25  # $1.25 per soldier
+                tanks_per_day = min(factories * 50, factories * 250) * recruitment_bonus
+                tank_cost = tanks_per_day * 50  # $50 per tank
+                aircraft_per_day = min(hangars * 3, hangars * 15) * recruitment_bonus
+                aircraft_cost = aircraft_per_day * 500  # $500 per aircraft
+                ships_per_day = min(drydocks * 1, drydocks * 5) * recruitment_bonus
+                ship_cost = ships_per_day * 3375  # $3,375 per ship
+                
+                total_cost += (soldier_cost + tank_cost + aircraft_cost + ship_cost) * 2  # 2 days worth
+            
+            return total_cost
+            
+        except Exception as e:
+            logger.error(f"Error calculating unit purchase costs: {e}")
+            return 0
+    
+    def _production_from_rows(self, city_rows: List[Tuple], days: int) -> dict:
+        """Resource production over `days` from CITY_COLUMNS rows (the one copy of this formula)."""
+        production = {
+            'money': 0,
+            'coal': 0,
+            'oil': 0,
+            'uranium': 0,
+            'iron': 0,
+            'bauxite': 0,
+            'lead': 0,
+            'gasoline': 0,
+            'munitions': 0,
+            'steel': 0,
+            'aluminum': 0,
+            'food': 0
+        }
+        
+        try:
+            for row in city_rows:
+                (steel_mills, aluminum_refineries, oil_refineries, munitions_factories, farms) = row[5:10]
+                (coal_mines, oil_wells, uranium_mines, iron_mines, bauxite_mines, lead_mines, population) = row[14:21]
+                
+                production['money'] += population * 0.01 * days  # $0.01 per population per day
+                production['coal'] += coal_mines * 2.5 * days
+                production['oil'] += oil_wells * 2.5 * days
+                production['uranium'] += uranium_mines * 0.5 * days
+                production['iron'] += iron_mines * 2.5 * days
+                production['bauxite'] += bauxite_mines * 2.5 * days
+                production['lead'] += lead_mines * 2.5 * days
+                production['food'] += farms * 2.5 * days
+                production['munitions'] += munitions_factories * 2.5 * days
+                production['steel'] += steel_mills * 2.5 * days
+                production['aluminum'] += aluminum_refineries * 2.5 * days
+                production['gasoline'] += oil_refineries * 2.5 * days
+                
+        except Exception as e:
+            logger.error(f"Error calculating production: {e}")
+            
+        return production
+    
     def calculate_warchest_old_format(self, member: Dict[str, Any]) -> Optional[Dict]:
         """Calculate warchest using the old format for audit compatibility."""
         try:
@@ -439,79 +490,4 @@ class WarchestService:
     
     def calculate_production(self, nation_info: dict, cities_data: list, days: int) -> dict:
         """Calculate resource production over the specified number of days."""
-        production = {
-            'money': 0,
-            'coal': 0,
-            'oil': 0,
-            'uranium': 0,
-            'iron': 0,
-            'bauxite': 0,
-            'lead': 0,
-            'gasoline': 0,
-            'munitions': 0,
-            'steel': 0,
-            'aluminum': 0,
-            'food': 0
-        }
-        
-        try:
-            # Calculate daily production from cities
-            for city in cities_data:
-                if not isinstance(city, dict):
-                    continue
-                    
-                # Money production (from population and improvements)
-                population = city.get('population', 0)
-                money_daily = population * 0.01  # $0.01 per population per day
-                production['money'] += money_daily * days
-                
-                # Resource production from improvements
-                # Coal mines
-                coal_mines = city.get('coal_mine', 0)
-                production['coal'] += coal_mines * 2.5 * days  # 2.5 coal per mine per day
-                
-                # Oil wells
-                oil_wells = city.get('oil_well', 0)
-                production['oil'] += oil_wells * 2.5 * days  # 2.5 oil per well per day
-                
-                # Uranium mines
-                uranium_mines = city.get('uranium_mine', 0)
-                production['uranium'] += uranium_mines * 0.5 * days  # 0.5 uranium per mine per day
-                
-                # Iron mines
-                iron_mines = city.get('iron_mine', 0)
-                production['iron'] += iron_mines * 2.5 * days  # 2.5 iron per mine per day
-                
-                # Bauxite mines
-                bauxite_mines = city.get('bauxite_mine', 0)
-                production['bauxite'] += bauxite_mines * 2.5 * days  # 2.5 bauxite per mine per day
-                
-                # Lead mines
-                lead_mines = city.get('lead_mine', 0)
-                production['lead'] += lead_mines * 2.5 * days  # 2.5 lead per mine per day
-                
-                # Farms (food production)
-                farms = city.get('farm', 0)
-                production['food'] += farms * 2.5 * days  # 2.5 food per farm per day
-                
-                # Manufacturing improvements
-                # Munitions factories
-                munitions_factories = city.get('munitions_factory', 0)
-                production['munitions'] += munitions_factories * 2.5 * days  # 2.5 munitions per factory per day
-                
-                # Steel mills
-                steel_mills = city.get('steel_mill', 0)
-                production['steel'] += steel_mills * 2.5 * days  # 2.5 steel per mill per day
-                
-                # Aluminum refineries
-                aluminum_refineries = city.get('aluminum_refinery', 0)
-                production['aluminum'] += aluminum_refineries * 2.5 * days  # 2.5 aluminum per refinery per day
-                
-                # Oil refineries (gasoline production)
-                oil_refineries = city.get('oil_refinery', 0)
-                production['gasoline'] += oil_refineries * 2.5 * days  # 2.5 gasoline per refinery per day
-                
-        except Exception as e:
-            logger.error(f"Error calculating production: {e}")
-            
-        return production
\ No newline at end of file
+        return self._production_from_rows(_city_rows(cities_data), days)
@@ -0,0 +1,100 @@
+"""
+Scheduled background audits.
+"""
+
+import asyncio
+import logging
+from typing import Dict, List, Tuple
+
+from config.settings import config
+from services.alliance_service import AllianceService
+from services.nation_service import NationService
+from services.cache_service import CacheService
+from services.audit_result_store import audit_result_store
+
+logger = logging.getLogger('raiden_shogun')
+
+def format_audit_changes(changes: Dict[str, Tuple[List[Dict], List[Dict]]], limit: int = 1900) -> List[str]:
+    """Format members who entered or left violation, split to stay under Discord's message limit."""
+    from cogs.audit.all import AUDIT_REGISTRY
+
+    sections = []
+    for key, label, *_ in AUDIT_REGISTRY:
+        if key not in changes:
+            continue
+        entered, left = changes[key]
+        if not entered and not left:
+            continue
+        lines = [f"**{label} Audit**"]
+        if entered:
+            lines.append("🔴 New: " + " ".join(f"@{entry['username']}" for entry in entered))
+        if left:
+            lines.append("🟢 Resolved: " + " ".join(f"@{entry['username']}" for entry in left))
+        sections.append("\n".join(lines))
+
+    messages = []
+    current = ""
+    for section in sections:
+        if current and len(current) + len(section) + 2 > limit:
+            messages.append(current)
+            current = ""
+        current = f"{current}\n\n{section}" if current else section
+    if current:
+        messages.append(current)
+    return messages
+
+async def post_audit_changes(bot, changes: Dict[str, Tuple[List[Dict], List[Dict]]]):
+    """Post only the members whose audit status changed since the previous run."""
+    if not config.AUDIT_NOTIFY_CHANNEL_ID:
+        return
+
+    messages = format_audit_changes(changes)
+    if not messages:
+        return
+
+    channel = bot.get_channel(config.AUDIT_NOTIFY_CHANNEL_ID)
+    if not channel:
+        logger.error(f"Could not find audit notification channel {config.AUDIT_NOTIFY_CHANNEL_ID}")
+        return
+
+    for message in messages:
+        await channel.send(message)
+
+async def run_scheduled_audits(bot, alliance_service, nation_service, cache_service) -> bool:
+    """Run the configured audits once, store the results and post changes."""
+    from cogs.audit.all import collect_audit_results
+
+    collected = await collect_audit_results(alliance_service, nation_service, cache_service, config.SCHEDULED_AUDIT_TYPES)
+    if collected is None:
+        logger.warning("Scheduled audit skipped: could not fetch alliance members")
+        return False
+    results, failed = collected
+    if failed:
+        # Storing a partial run would report the missing members' violations as resolved
+        logger.warning(f"Scheduled audit discarded: details for {failed} members could not be fetched")
+        return False
+
+    changes = audit_result_store.put_many(results)
+    logger.info("Scheduled audit completed: " + ", ".join(f"{key}={len(entries)}" for key, entries in results.items()))
+    await post_audit_changes(bot, changes)
+    return True
+
+async def scheduled_audit_task(bot):
+    """Background task to run the scheduled audits every AUDIT_SCHEDULE_INTERVAL seconds."""
+    if not config.SCHEDULED_AUDIT_TYPES:
+        logger.info("No scheduled audit types configured, audit task not started")
+        return
+
+    await bot.wait_until_ready()
+
+    alliance_service = AllianceService()
+    nation_service = NationService()
+    cache_service = CacheService()
+
+    while True:
+        try:
+            await run_scheduled_audits(bot, alliance_service, nation_service, cache_service)
+        except Exception as e:
+            logger.error(f"Error in scheduled audit task: {e}")
+
+        await asyncio.sleep(config.AUDIT_SCHEDULE_INTERVAL)
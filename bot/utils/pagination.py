@@ -14,22 +14,45 @@ from datetime import datetime, timezone
 class ActivityPaginator(discord.ui.View):
     """A paginator for displaying activity results."""
     
-    def __init__(self, results: List[str], timeout: int = 120):
+    def __init__(self, results: List[str], timeout: int = 120, status: Optional[str] = None):
         super().__init__(timeout=timeout)
-        self.results = results
+        self.results = list(results)
         self.current_page = 0
         self.items_per_page = 4
         self.pages = []
+        # While an audit is still streaming in, status is shown under the description
+        self.status = status
         self.create_pages()
     
     def create_pages(self) -> None:
         """Split results into pages."""
+        self.pages = []
         for i in range(0, len(self.results), self.items_per_page):
             page = self.results[i:i + self.items_per_page]
             self.pages.append(page)
         
         if not self.pages:
-            self.pages.append(["**All Good!** No inactive members found."])
+            self.pages.append(["⏳ Evaluating members..." if self.status else "**All Good!** No inactive members found."])
+        
+        # Keep the viewer on a valid page when pages are rebuilt
+        self.current_page = min(self.current_page, len(self.pages) - 1)
+    
+    def add_results(self, results: List[str]) -> None:
+        """Append results from a streaming audit and rebuild pages."""
+        self.results.extend(results)
+        self.create_pages()
+    
+    def finalize(self, results: Optional[List[str]] = None) -> None:
+        """Mark the audit complete, optionally replacing results with their final order."""
+        if results is not None:
+            self.results = list(results)
+        self.status = None
+        self.create_pages()
+    
+    @property
+    def first_page_full(self) -> bool:
+        """Whether the first page has filled up."""
+        return len(self.results) >= self.items_per_page
     
     def get_embed(self) -> discord.Embed:
         """Get the current page's embed."""
@@ -49,9 +72,13 @@ class ActivityPaginator(discord.ui.View):
                 "inline": True
             })
         
+        description = "Below is a grid view of alliance members Violating the audit ran.\nUse the buttons below to navigate through pages."
+        if self.status:
+            description += f"\n\n⏳ **{self.status}**"
+        
         embed = discord.Embed(
             title="**Audit Results**",
-            description="Below is a grid view of alliance members Violating the audit ran.\nUse the buttons below to navigate through pages.",
+            description=description,
             color=discord.Color.purple(),
             timestamp=datetime.now(timezone.utc)
         )
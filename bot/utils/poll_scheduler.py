@@ -0,0 +1,92 @@
+"""
+Adaptive polling interval for the war feed's polling fallback.
+"""
+
+import time
+from typing import Optional
+
+class AdaptivePollScheduler:
+    """Chooses the delay before the next poll.
+
+    Polls at `min_interval` around turn changes (when blitzes are declared) and for a while
+    after anything was found, then doubles the delay from `base_interval` up to `max_interval`
+    for each quiet poll. Calls may run ahead of an even spread of `daily_budget` over the UTC day
+    by `burst_reserve` calls (quiet periods bank the rest); past that, polls are paced so the day
+    ends within budget.
+    """
+
+    def __init__(self, min_interval: float, base_interval: float, max_interval: float, daily_budget: int,
+                 turn_hours: int = 2, turn_window: float = 120, burst_window: float = 300,
+                 burst_reserve: int = None):
+        self.min_interval = min_interval
+        self.base_interval = base_interval
+        self.max_interval = max_interval
+        self.daily_budget = daily_budget
+        self.turn_seconds = turn_hours * 3600
+        self.turn_window = turn_window
+        self.burst_window = burst_window
+        self.burst_reserve = burst_reserve if burst_reserve is not None else daily_budget // 20
+        self.quiet_polls = 0
+        self.last_activity: Optional[float] = None
+        self._day = None
+        self._calls_today = 0
+
+    def _roll_day(self, now: float) -> None:
+        day = int(now // 86400)
+        if day != self._day:
+            self._day = day
+            self._calls_today = 0
+
+    def record_poll(self, found: int, calls: int = 1, now: float = None) -> None:
+        """Record a poll that used `calls` API calls and found `found` new items."""
+        now = now or time.time()
+        self._roll_day(now)
+        self._calls_today += calls
+        if found:
+            self.quiet_polls = 0
+            self.last_activity = now
+        else:
+            self.quiet_polls += 1
+
+    def near_turn_change(self, now: float) -> bool:
+        """Whether `now` is within the window either side of a turn change."""
+        offset = now % self.turn_seconds
+        return min(offset, self.turn_seconds - offset) <= self.turn_window
+
+    def budget_floor(self, now: float, calls_per_poll: int = 1) -> float:
+        """Shortest interval the daily budget allows right now (0 while under the allowance)."""
+        self._roll_day(now)
+        elapsed = now % 86400
+        allowance = min(self.daily_budget, self.daily_budget * elapsed / 86400 + self.burst_reserve)
+        if self._calls_today < allowance:
+            return 0.0
+        remaining_seconds = 86400 - elapsed
+        remaining_polls = (self.daily_budget - self._calls_today) / max(calls_per_poll, 1)
+        if remaining_polls < 1:
+            return remaining_seconds
+        return remaining_seconds / remaining_polls
+
+    def next_interval(self, calls_per_poll: int = 1, now: float = None) -> float:
+        """Seconds to wait before the next poll."""
+        now = now or time.time()
+        recently_active = self.last_activity is not None and now - self.last_activity < self.burst_window
+        if recently_active or self.near_turn_change(now):
+            interval = self.min_interval
+        else:
+            interval = min(self.base_interval * 2 ** max(self.quiet_polls - 1, 0), self.max_interval)
+
+        interval = max(interval, self.budget_floor(now, calls_per_poll))
+        # Don't sleep through the start of the next turn change
+        until_window = self.turn_seconds - now % self.turn_seconds - self.turn_window
+        if 0 < until_window < interval:
+            interval = max(until_window, self.budget_floor(now, calls_per_poll))
+        return interval
+
+    def get_stats(self) -> dict:
+        """Get calls used today and the current backoff state."""
+        return {
+            'calls_today': self._calls_today,
+            'daily_budget': self.daily_budget,
+            'quiet_polls': self.quiet_polls,
+            'last_activity': self.last_activity
+        }
@@ -1,31 +1,67 @@
 import discord
 from datetime import datetime, timezone
-from typing import List, Dict
+from typing import List, Dict, Optional
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.top_k import TopKHeap
 
 class RaidPaginator(discord.ui.View):
     """Paginator for raid results with 3x2 grid layout."""
     
-    def __init__(self, targets: List[Dict], timeout: int = 300):
+    def __init__(self, targets: List[Dict], timeout: int = 300, max_targets: Optional[int] = None):
         super().__init__(timeout=timeout)
-        self.targets = targets
         self.current_page = 0
         self.items_per_page = 6  # 3x2 grid
+        self.status = None  # Shown while results are still streaming in
+        self._heap = TopKHeap(key=lambda t: t['profit_score'], limit=max_targets)
+        self._heap.extend(targets)
+        self.targets = []
         self.pages = []
         self.create_pages()
     
     def create_pages(self) -> None:
         """Split targets into pages."""
+        self.targets = self._heap.sorted()
+        self.pages = []
         for i in range(0, len(self.targets), self.items_per_page):
             page = self.targets[i:i + self.items_per_page]
             self.pages.append(page)
+        
+        # Keep the current page valid as pages are rebuilt
+        self.current_page = min(self.current_page, max(len(self.pages) - 1, 0))
+    
+    def add_targets(self, targets: List[Dict]) -> None:
+        """Merge a batch of newly scored targets and rebuild pages in place."""
+        self._heap.extend(targets)
+        self.create_pages()
+    
+    def finalize(self) -> None:
+        """Mark the search as finished and do the final re-sort."""
+        self.status = None
+        self.create_pages()
+    
+    @property
+    def total_found(self) -> int:
+        """Total targets found, including any beyond the kept limit."""
+        return self._heap.total_seen
     
     def get_embed(self) -> discord.Embed:
         """Get current page's embed."""
-        page_targets = self.pages[self.current_page]
+        page_targets = self.pages[self.current_page] if self.pages else []
+        
+        description = f"**Page {self.current_page + 1}/{max(len(self.pages), 1)}** • "
+        if self.total_found > len(self.targets):
+            description += f"Top {len(self.targets)} of {self.total_found:,} targets"
+        else:
+            description += f"{len(self.targets)} total targets"
+        if self.status:
+            description += f"\n⏳ *{self.status}* - more targets may still appear"
         
         embed = discord.Embed(
             title="**Raid Targets Found**",
-            description=f"**Page {self.current_page + 1}/{len(self.pages)}** • {len(self.targets)} total targets",
+            description=description,
             color=discord.Color.red(),
             timestamp=datetime.now(timezone.utc)
         )
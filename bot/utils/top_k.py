@@ -0,0 +1,55 @@
+"""
+Bounded best-first selection utilities.
+"""
+
+import heapq
+import itertools
+from typing import Any, Callable, Iterable, List, Optional
+
+
+class TopKHeap:
+    """Keep the best items by a numeric key, optionally bounded to `limit` entries."""
+
+    def __init__(self, key: Callable[[Any], float], limit: Optional[int] = None):
+        self.key = key
+        self.limit = limit if limit and limit > 0 else None
+        self.dropped = 0
+        self._heap = []
+        # Tie-breaker so items themselves are never compared
+        self._counter = itertools.count()
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    @property
+    def total_seen(self) -> int:
+        """Number of items pushed, including those that were dropped."""
+        return len(self._heap) + self.dropped
+
+    def is_full(self) -> bool:
+        """Whether the heap has reached its limit."""
+        return self.limit is not None and len(self._heap) >= self.limit
+
+    def push(self, item: Any) -> bool:
+        """Add an item, evicting the lowest one if full. Returns True if kept."""
+        entry = (self.key(item), next(self._counter), item)
+
+        if not self.is_full():
+            heapq.heappush(self._heap, entry)
+            return True
+
+        # Either the new item or the evicted one is dropped
+        self.dropped += 1
+        if entry[0] > self._heap[0][0]:
+            heapq.heapreplace(self._heap, entry)
+            return True
+        return False
+
+    def extend(self, items: Iterable[Any]) -> None:
+        """Add several items."""
+        for item in items:
+            self.push(item)
+
+    def sorted(self) -> List[Any]:
+        """Kept items ordered best first."""
+        return [entry[2] for entry in sorted(self._heap, key=lambda e: (-e[0], e[1]))]
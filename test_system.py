@@ -257,6 +257,139 @@ def test_utils():
         print(f"❌ Utility error: {e}")
         return False
 
+async def _start_pusher_stand_in(events):
+    """Serve the subscription, auth and Pusher socket endpoints locally; the socket pushes `events` once subscribed."""
+    import json
+    from aiohttp import web
+    
+    async def subscribe(request):
+        return web.json_response({'channel': f"private-{request.match_info['model']}"})
+    
+    async def auth(request):
+        return web.json_response({'auth': 'stand-in:signature'})
+    
+    async def socket(request):
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        await ws.send_json({'event': 'pusher:connection_established', 'data': json.dumps({'socket_id': '1.1'})})
+        async for msg in ws:
+            payload = json.loads(msg.data)
+            if payload.get('event') == 'pusher:subscribe':
+                channel = payload['data']['channel']
+                for event, data in events:
+                    await ws.send_json({'event': event, 'channel': channel, 'data': json.dumps(data)})
+        return ws
+    
+    app = web.Application()
+    app.router.add_get('/subscribe/{model}/{event}', subscribe)
+    app.router.add_post('/auth', auth)
+    app.router.add_get('/app', socket)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, '127.0.0.1', 0)
+    await site.start()
+    port = runner.addresses[0][1]
+    return runner, f"http://127.0.0.1:{port}"
+
+async def _run_war_event_feed(feed, done):
+    """Run the feed until `done()` is true (or five seconds pass)."""
+    import asyncio
+    
+    task = asyncio.create_task(feed.run())
+    try:
+        for _ in range(100):
+            if done():
+                break
+            await asyncio.sleep(0.05)
+    finally:
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+
+async def _check_war_event_feed():
+    from api import politics_war_api
+    from services import war_event_feed
+    from services.war_event_feed import WarEventFeed
+    
+    # test_utils reloads config.settings, so the feed and the API may hold different instances
+    configs = list({id(module.config): module.config for module in (war_event_feed, politics_war_api)}.values())
+    overrides = {
+        'WAR_FEED_PUSH_ENABLED': True,
+        'WAR_MONITOR_INTERVAL': 0.05,
+        'WAR_MONITOR_MIN_INTERVAL': 0.05,
+        'WAR_MONITOR_MAX_INTERVAL': 0.1,
+        'WAR_FEED_RETRY_MAX': 0.5
+    }
+    names = list(overrides) + ['WAR_FEED_SOCKET_URL', 'WAR_FEED_SUBSCRIBE_URL', 'WAR_FEED_AUTH_URL']
+    original = [{name: getattr(instance, name) for name in names} for instance in configs]
+    
+    def configure(**values):
+        for instance in configs:
+            for name, value in values.items():
+                setattr(instance, name, value)
+    
+    configure(**overrides)
+    
+    def make_feed(polled):
+        received = []
+        async def handle(items):
+            received.extend(items)
+        async def poll(min_id):
+            return [war for war in polled if war['id'] >= min_id]
+        feed = WarEventFeed()
+        feed.register('war', handle, poll, lambda: received[-1]['id'] if received else 0)
+        return feed, received
+    
+    runner = None
+    try:
+        # Push: a single event, a bulk event and a repeat of an ID already delivered
+        events = [('CREATE', {'id': 1}), ('BULK_CREATE', [{'id': 2}, {'id': 3}]), ('CREATE', {'id': 2})]
+        runner, base_url = await _start_pusher_stand_in(events)
+        configure(WAR_FEED_SOCKET_URL=base_url.replace('http', 'ws') + '/app',
+                  WAR_FEED_SUBSCRIBE_URL=base_url + '/subscribe',
+                  WAR_FEED_AUTH_URL=base_url + '/auth')
+        feed, received = make_feed([])
+        await _run_war_event_feed(feed, lambda: feed.get_stats()['push_events'] == 4)
+        assert [war['id'] for war in received] == [1, 2, 3], f"push delivered {[war['id'] for war in received]}"
+        assert feed.get_stats()['push_connects'] == 1
+        print("✅ Push mode delivered socket events once, in order")
+        
+        # Fallback: with the socket gone the feed polls instead
+        await runner.cleanup()
+        runner = None
+        feed, received = make_feed([{'id': 4}, {'id': 5}])
+        await _run_war_event_feed(feed, lambda: len(received) == 2)
+        stats = feed.get_stats()
+        assert [war['id'] for war in received] == [4, 5], f"polling delivered {[war['id'] for war in received]}"
+        assert stats['mode'] == 'poll' and stats['push_failures'] >= 1 and stats['polls'] >= 1
+        print("✅ Polling fallback delivered wars while the socket was down")
+    finally:
+        if runner:
+            await runner.cleanup()
+        for instance, values in zip(configs, original):
+            for name, value in values.items():
+                setattr(instance, name, value)
+
+def test_war_event_feed():
+    """Test the war event feed against a local Pusher-style socket and its polling fallback."""
+    print("\nTesting war event feed...")
+    
+    try:
+        # Set environment variables for testing
+        os.environ['BOT_TOKEN'] = 'test_token'
+        os.environ['GUILD_ID'] = '123456789'
+        os.environ['ADMIN_USER_ID'] = '987654321'
+        
+        import asyncio
+        asyncio.run(_check_war_event_feed())
+        return True
+        
+    except Exception as e:
+        print(f"❌ War event feed error: {e!r}")
+        return False
+
 def main():
     """Run all tests."""
     print("🧪 Testing Raiden Shogun Bot System")
@@ -267,7 +400,8 @@ def main():
         test_config,
         test_models,
         test_services,
-        test_utils
+        test_utils,
+        test_war_event_feed
     ]
     
     passed = 0